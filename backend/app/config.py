@@ -27,6 +27,12 @@ class AppConfig:
     longport_trade_ws_url: Optional[str] = None
     paper_credentials: Optional[LongPortCredentials] = None
     live_credentials: Optional[LongPortCredentials] = None
+    backtest_workers: int = field(default=0)
+    backtest_cache_max_bytes: int = field(default=256 * 1024 * 1024)
+    indicator_cache_max_bytes: int = field(default=128 * 1024 * 1024)
+    signal_store_max_bytes: int = field(default=256 * 1024 * 1024)
+    bar_cache_max_bytes: int = field(default=64 * 1024 * 1024)
+    series_format: str = field(default="csv")
 
 
 def _load_credentials(prefix: str) -> Optional[LongPortCredentials]:
@@ -67,6 +73,12 @@ def load_config(env_path: Path | None = None) -> AppConfig:
         longport_trade_ws_url=os.getenv("LONGPORT_TRADE_WS_URL"),
         paper_credentials=_load_credentials("LONGPORT_PAPER"),
         live_credentials=_load_credentials("LONGPORT_LIVE"),
+        backtest_workers=max(int(os.getenv("BACKTEST_WORKERS", "0").strip() or "0"), 0),
+        backtest_cache_max_bytes=max(int(os.getenv("BACKTEST_CACHE_MAX_MB", "256")), 0) * 1024 * 1024,
+        indicator_cache_max_bytes=max(int(os.getenv("INDICATOR_CACHE_MAX_MB", "128")), 0) * 1024 * 1024,
+        signal_store_max_bytes=max(int(os.getenv("SIGNAL_STORE_MAX_MB", "256")), 0) * 1024 * 1024,
+        bar_cache_max_bytes=max(int(os.getenv("BAR_CACHE_MAX_MB", "64")), 0) * 1024 * 1024,
+        series_format=os.getenv("SERIES_FORMAT", "csv").strip().lower() or "csv",
     )
 
 
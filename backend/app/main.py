@@ -7,6 +7,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import CONFIG
 from app.routers import accounts, backtests, data, quant, strategies
+from app.services.backtest_cache import BACKTEST_CACHE
+from app.services.backtest_workers import BACKTEST_POOL
 from app.services.longport_client import LONGPORT_CLIENT
 
 logging.basicConfig(level=logging.INFO if CONFIG.debug else logging.WARNING)
@@ -35,6 +37,8 @@ async def init_longport_contexts() -> None:
 @app.on_event("shutdown")
 async def shutdown_longport_contexts() -> None:
     LONGPORT_CLIENT.shutdown()
+    BACKTEST_POOL.shutdown()
+    BACKTEST_CACHE.close()
 
 
 @app.get("/health")
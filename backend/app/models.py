@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field, root_validator, validator
 
@@ -31,6 +31,9 @@ class SimulatedDataRequest(BaseModel):
     noise: float = Field(default=0.5, ge=0.0)
     uncertainty: float = Field(default=0.1, ge=0.0, le=1.0)
     seed: Optional[int] = None
+    storage_format: Optional[str] = Field(
+        default=None, pattern="^(csv|columnar)$", description="Storage format; defaults to SERIES_FORMAT"
+    )
 
     @validator("mean_price")
     def validate_mean(cls, value: float, values: Dict[str, Any]) -> float:
@@ -49,6 +52,8 @@ class DataSeriesInfo(BaseModel):
     path: str
     config: Dict[str, Any]
     data_points: Optional[int] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
 
 
 class DataSeriesDetail(DataSeriesInfo):
@@ -96,6 +101,9 @@ class LiveDataTaskInfo(BaseModel):
 class LiveSnapshotRequest(BaseModel):
     start_index: Optional[int] = Field(default=None, ge=0)
     end_index: Optional[int] = Field(default=None, ge=0)
+    storage_format: Optional[str] = Field(
+        default=None, pattern="^(csv|columnar)$", description="Storage format; defaults to SERIES_FORMAT"
+    )
 
     @root_validator(skip_on_failure=True)
     def validate_range(cls, values: Dict[str, Optional[int]]) -> Dict[str, Optional[int]]:
@@ -132,6 +140,16 @@ class StrategyMetadata(BaseModel):
     name: str
     description: str
     parameters: List[StrategyParameter]
+    rules: Optional[str] = None
+
+
+class RuleStrategyRequest(BaseModel):
+    strategy_id: str = Field(..., pattern="^[a-z][a-z0-9_]{0,63}$")
+    name: str
+    description: str = ""
+    rules: str = Field(
+        ..., description="One rule per line, e.g. 'buy when sma(5) crosses_above sma(20) and rsi(14) < 70'"
+    )
 
 
 class CommissionType(str, Enum):
@@ -139,6 +157,11 @@ class CommissionType(str, Enum):
     RATIO = "ratio"
 
 
+class BacktestEngine(str, Enum):
+    LOOP = "loop"
+    VECTORIZED = "vectorized"
+
+
 class BacktestRequest(BaseModel):
     data_id: str
     strategy_id: str
@@ -152,9 +175,13 @@ class BacktestRequest(BaseModel):
     commission_type: CommissionType = Field(default=CommissionType.FIXED)
     commission_value: float = Field(default=0.0, ge=0)
     commission_max: Optional[float] = Field(default=None, ge=0)
+    engine: BacktestEngine = Field(default=BacktestEngine.LOOP)
+    signal_log_interval: int = Field(
+        default=1, ge=0, description="Write every Nth tick to the signal log; 0 disables it"
+    )
 
 
-class BacktestTaskInfo(BaseModel):
+class BacktestTaskSummary(BaseModel):
     task_id: str
     status: str
     created_at: datetime
@@ -162,9 +189,120 @@ class BacktestTaskInfo(BaseModel):
     finished_at: Optional[datetime]
     config: Dict[str, Any]
     metrics: Optional[Dict[str, Any]]
+    message: Optional[str]
+    progress: Optional[float] = None
+
+
+class BacktestTaskInfo(BacktestTaskSummary):
     log_path: Optional[str]
+
+
+class BacktestTaskPage(BaseModel):
+    items: List[BacktestTaskSummary]
+    next_cursor: Optional[str] = None
+
+
+class BacktestTradePage(BaseModel):
+    task_id: str
+    offset: int
+    limit: int
+    total: int
+    trades: List[Dict[str, Any]]
+
+
+class BacktestCacheEntry(BaseModel):
+    key: str
+    data_id: str
+    strategy_id: str
+    size_bytes: int
+    has_trades: bool
+    created_at: datetime
+    last_used_at: datetime
+
+
+class BacktestCacheInfo(BaseModel):
+    entries: int
+    size_bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    items: List[BacktestCacheEntry]
+
+
+class ParameterRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(default=1.0, gt=0)
+
+
+class BacktestSweepRequest(BaseModel):
+    template: BacktestRequest
+    strategy_param_grid: Dict[str, Union[ParameterRange, List[Any]]] = Field(default_factory=dict)
+    execution_param_grid: Dict[str, Union[ParameterRange, List[Any]]] = Field(default_factory=dict)
+    metric: str = Field(default="total_return")
+    ascending: bool = False
+
+
+class BacktestSweepResult(BaseModel):
+    rank: int
+    strategy_params: Dict[str, Any]
+    execution_params: Dict[str, Any]
+    metrics: Optional[Dict[str, Any]]
+    message: Optional[str] = None
+
+
+class BacktestSweepInfo(BaseModel):
+    sweep_id: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    config: Dict[str, Any]
+    total_combinations: int
+    completed_combinations: int
+    message: Optional[str]
+    results: Optional[List[BacktestSweepResult]] = None
+
+
+class WalkForwardRequest(BaseModel):
+    template: BacktestRequest
+    strategy_param_grid: Dict[str, Union[ParameterRange, List[Any]]] = Field(default_factory=dict)
+    execution_param_grid: Dict[str, Union[ParameterRange, List[Any]]] = Field(default_factory=dict)
+    in_sample_size: int = Field(gt=1, description="Data points in each in-sample window")
+    out_of_sample_size: int = Field(gt=0, description="Data points in each out-of-sample window")
+    step_size: Optional[int] = Field(
+        default=None, gt=0, description="Shift between windows; defaults to out_of_sample_size"
+    )
+    metric: str = Field(default="total_return")
+    ascending: bool = False
+
+
+class WalkForwardWindow(BaseModel):
+    index: int
+    in_sample_start: str
+    in_sample_end: str
+    out_of_sample_start: str
+    out_of_sample_end: str
+    strategy_params: Optional[Dict[str, Any]] = None
+    execution_params: Optional[Dict[str, Any]] = None
+    in_sample_metrics: Optional[Dict[str, Any]] = None
+    out_of_sample_metrics: Optional[Dict[str, Any]] = None
+    message: Optional[str] = None
+
+
+class WalkForwardInfo(BaseModel):
+    walk_id: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    config: Dict[str, Any]
+    total_windows: int
+    completed_windows: int
     message: Optional[str]
-    trades: Optional[List[Dict[str, Any]]] = None
+    metrics: Optional[Dict[str, Any]] = None
+    windows: Optional[List[WalkForwardWindow]] = None
+    equity_curve: Optional[List[Dict[str, Any]]] = None
 
 
 class QuantTaskRequest(BaseModel):
@@ -175,6 +313,19 @@ class QuantTaskRequest(BaseModel):
     account_mode: str = Field(default="paper")
     interval_seconds: int = Field(default=30, ge=1)
     lot_size: float = Field(default=1.0, gt=0)
+    warmup_data_id: Optional[str] = Field(
+        default=None, description="Stored series (simulated or snapshot) fed to the strategy before trading"
+    )
+    warmup_from_live: bool = Field(
+        default=False, description="Warm up from the latest live capture task for the same symbol"
+    )
+    warmup_points: int = Field(default=5000, ge=1, description="Most recent stored points used for warm-up")
+
+    @root_validator(skip_on_failure=True)
+    def validate_warmup(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        if values.get("warmup_data_id") and values.get("warmup_from_live"):
+            raise ValueError("warmup_data_id and warmup_from_live cannot be used together.")
+        return values
 
 
 class QuantTaskInfo(BaseModel):
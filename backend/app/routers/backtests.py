@@ -1,16 +1,40 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-
-from app.models import BacktestRequest, BacktestTaskInfo
+from fastapi import APIRouter, HTTPException, Query
+
+from app.models import (
+    BacktestCacheInfo,
+    BacktestRequest,
+    BacktestSweepInfo,
+    BacktestSweepRequest,
+    BacktestTaskInfo,
+    BacktestTaskPage,
+    BacktestTradePage,
+    WalkForwardInfo,
+    WalkForwardRequest,
+)
+from app.services.backtest_cache import BACKTEST_CACHE
+from app.services.backtest_sweeps import SWEEP_MANAGER
+from app.services.backtest_walkforward import WALK_FORWARD_MANAGER
 from app.services.backtesting import BACKTEST_MANAGER
 
 router = APIRouter(prefix="/backtests", tags=["backtests"])
 
 
-@router.get("", response_model=list[BacktestTaskInfo])
-def list_backtests() -> list[BacktestTaskInfo]:
-    return BACKTEST_MANAGER.list_tasks()
+@router.get("", response_model=BacktestTaskPage)
+def list_backtests(
+    status: str | None = Query(default=None),
+    strategy_id: str | None = Query(default=None),
+    data_id: str | None = Query(default=None),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=50, ge=1, le=500),
+) -> BacktestTaskPage:
+    try:
+        return BACKTEST_MANAGER.list_tasks(
+            status=status, strategy_id=strategy_id, data_id=data_id, cursor=cursor, limit=limit
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("", response_model=BacktestTaskInfo)
@@ -21,6 +45,89 @@ async def create_backtest(request: BacktestRequest) -> BacktestTaskInfo:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
+@router.get("/cache", response_model=BacktestCacheInfo)
+def get_result_cache(
+    limit: int = Query(default=100, ge=0, le=1000, description="Most recently used entries to list"),
+) -> BacktestCacheInfo:
+    return BACKTEST_CACHE.describe(limit=limit)
+
+
+@router.delete("/cache", status_code=204)
+def clear_result_cache() -> None:
+    BACKTEST_CACHE.clear()
+
+
+@router.get("/sweeps", response_model=list[BacktestSweepInfo])
+def list_sweeps() -> list[BacktestSweepInfo]:
+    return SWEEP_MANAGER.list_sweeps()
+
+
+@router.post("/sweeps", response_model=BacktestSweepInfo)
+async def create_sweep(request: BacktestSweepRequest) -> BacktestSweepInfo:
+    try:
+        return SWEEP_MANAGER.create_sweep(request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/sweeps/{sweep_id}", response_model=BacktestSweepInfo)
+def get_sweep(
+    sweep_id: str,
+    top_n: int | None = Query(default=None, ge=1, description="Only return the best N combinations"),
+) -> BacktestSweepInfo:
+    try:
+        return SWEEP_MANAGER.describe_sweep(sweep_id, top_n=top_n)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Sweep not found") from exc
+
+
+@router.post("/sweeps/{sweep_id}/stop", response_model=BacktestSweepInfo)
+async def stop_sweep(sweep_id: str) -> BacktestSweepInfo:
+    try:
+        return SWEEP_MANAGER.stop(sweep_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Sweep not found") from exc
+
+
+@router.delete("/sweeps/{sweep_id}")
+async def delete_sweep(sweep_id: str) -> None:
+    SWEEP_MANAGER.delete(sweep_id)
+
+
+@router.get("/walk-forward", response_model=list[WalkForwardInfo])
+def list_walk_forward_runs() -> list[WalkForwardInfo]:
+    return WALK_FORWARD_MANAGER.list_runs()
+
+
+@router.post("/walk-forward", response_model=WalkForwardInfo)
+async def create_walk_forward(request: WalkForwardRequest) -> WalkForwardInfo:
+    try:
+        return WALK_FORWARD_MANAGER.create_walk_forward(request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/walk-forward/{walk_id}", response_model=WalkForwardInfo)
+def get_walk_forward(walk_id: str) -> WalkForwardInfo:
+    try:
+        return WALK_FORWARD_MANAGER.describe(walk_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Walk-forward run not found") from exc
+
+
+@router.post("/walk-forward/{walk_id}/stop", response_model=WalkForwardInfo)
+async def stop_walk_forward(walk_id: str) -> WalkForwardInfo:
+    try:
+        return WALK_FORWARD_MANAGER.stop(walk_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Walk-forward run not found") from exc
+
+
+@router.delete("/walk-forward/{walk_id}")
+async def delete_walk_forward(walk_id: str) -> None:
+    WALK_FORWARD_MANAGER.delete(walk_id)
+
+
 @router.get("/{task_id}", response_model=BacktestTaskInfo)
 def get_backtest(task_id: str) -> BacktestTaskInfo:
     try:
@@ -29,6 +136,18 @@ def get_backtest(task_id: str) -> BacktestTaskInfo:
         raise HTTPException(status_code=404, detail="Task not found") from exc
 
 
+@router.get("/{task_id}/trades", response_model=BacktestTradePage)
+def get_backtest_trades(
+    task_id: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=5000),
+) -> BacktestTradePage:
+    try:
+        return BACKTEST_MANAGER.get_trades(task_id, offset=offset, limit=limit)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Task not found") from exc
+
+
 @router.post("/{task_id}/pause", response_model=BacktestTaskInfo)
 async def pause_backtest(task_id: str) -> BacktestTaskInfo:
     try:
@@ -93,7 +93,10 @@ def create_snapshot(
     try:
         start_index = request.start_index if request else None
         end_index = request.end_index if request else None
-        return DATA_TASKS.create_snapshot(task_id, start_index=start_index, end_index=end_index)
+        storage_format = request.storage_format if request else None
+        return DATA_TASKS.create_snapshot(
+            task_id, start_index=start_index, end_index=end_index, storage_format=storage_format
+        )
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="Task not found") from exc
     except ValueError as exc:
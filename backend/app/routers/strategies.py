@@ -2,8 +2,8 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
 
-from app.models import StrategyMetadata
-from app.services.strategies import STRATEGY_REGISTRY
+from app.models import RuleStrategyRequest, StrategyMetadata
+from app.services.strategies import RULE_STRATEGIES, STRATEGY_REGISTRY
 
 router = APIRouter(prefix="/strategies", tags=["strategies"])
 
@@ -21,3 +21,23 @@ def get_strategy(strategy_id: str) -> StrategyMetadata:
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
+
+@router.post("/rules", response_model=StrategyMetadata)
+def create_rule_strategy(request: RuleStrategyRequest) -> StrategyMetadata:
+    try:
+        strategy_cls = RULE_STRATEGIES.create(
+            request.strategy_id, request.name, request.rules, description=request.description
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return strategy_cls.metadata()
+
+
+@router.delete("/{strategy_id}", status_code=204)
+def delete_strategy(strategy_id: str) -> None:
+    try:
+        RULE_STRATEGIES.delete(strategy_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
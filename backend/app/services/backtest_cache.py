@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import astuple, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config import CONFIG
+from app.models import BacktestCacheEntry, BacktestCacheInfo, BacktestRequest
+from app.services.backtest_engine import TradeLogEntry
+from app.services.series_catalog import SERIES_CATALOG
+from app.services.strategies import STRATEGY_REGISTRY
+from app.utils.task_index import config_hash
+
+# 不直接参与缓存键的字段：engine 与 signal_log_interval 不影响结果；
+# data_id 与数据文件的校验和一起写在键的 data 部分
+_NON_RESULT_FIELDS = {"data_id", "engine", "signal_log_interval"}
+# 单条 SQL 中最多携带多少个键
+_QUERY_BATCH = 500
+
+# (key, data_id, strategy_id, metrics, trades)
+CacheRecord = Tuple[str, str, str, Dict[str, Any], Optional[List[TradeLogEntry]]]
+
+
+@dataclass(slots=True)
+class CachedResult:
+    metrics: Dict[str, Any]
+    trades: Optional[List[TradeLogEntry]]
+
+
+class BacktestResultCache:
+    """Content-addressed store of finished backtest results.
+
+    The key is a hash of the normalised request (strategy defaults filled in, fields that
+    only affect logging dropped) plus the data file's checksum from the series catalog,
+    so a rewritten series never serves stale results. Entries are evicted least recently
+    used first once the stored size exceeds `max_bytes`. Sweeps store metrics-only entries;
+    those never satisfy a full backtest that needs its trades.
+    """
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    data_id TEXT NOT NULL,
+                    strategy_id TEXT NOT NULL,
+                    metrics TEXT NOT NULL,
+                    trades TEXT,
+                    size INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            self._conn.commit()
+        return self._conn
+
+    def key_for(self, request: BacktestRequest) -> Optional[str]:
+        """Cache key of `request`, or None when the data series or strategy is unknown."""
+        if not self.enabled:
+            return None
+        checksum = SERIES_CATALOG.checksum(request.data_id)
+        if checksum is None:
+            return None
+        try:
+            strategy = STRATEGY_REGISTRY.get(request.strategy_id)(**request.strategy_params)
+        except (KeyError, TypeError, ValueError):
+            return None
+        payload = {key: value for key, value in request.dict().items() if key not in _NON_RESULT_FIELDS}
+        payload["strategy_params"] = strategy.parameters
+        if strategy.fingerprint:
+            payload["strategy_fingerprint"] = strategy.fingerprint
+        payload["data"] = [request.data_id, checksum]
+        return config_hash(payload)
+
+    def get(self, key: str, with_trades: bool = True) -> Optional[CachedResult]:
+        return self.get_many([key], with_trades=with_trades).get(key)
+
+    def get_many(self, keys: Sequence[str], with_trades: bool = False) -> Dict[str, CachedResult]:
+        found: Dict[str, CachedResult] = {}
+        with self._lock:
+            conn = self._connection()
+            for offset in range(0, len(keys), _QUERY_BATCH):
+                batch = list(keys[offset : offset + _QUERY_BATCH])
+                placeholders = ",".join("?" * len(batch))
+                column = "trades" if with_trades else "NULL"
+                for key, metrics_text, trades_text, has_trades in conn.execute(
+                    f"SELECT key, metrics, {column}, trades IS NOT NULL FROM results WHERE key IN ({placeholders})",
+                    batch,
+                ):
+                    if with_trades and not has_trades:
+                        continue
+                    trades = None
+                    if with_trades:
+                        trades = [TradeLogEntry(*values) for values in json.loads(trades_text)]
+                    found[key] = CachedResult(metrics=json.loads(metrics_text), trades=trades)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+            if found:
+                now = time.time()
+                conn.executemany("UPDATE results SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+                conn.commit()
+        return found
+
+    def put(
+        self,
+        key: str,
+        request: BacktestRequest,
+        metrics: Dict[str, Any],
+        trades: Optional[List[TradeLogEntry]] = None,
+    ) -> None:
+        self.put_many([(key, request.data_id, request.strategy_id, metrics, trades)])
+
+    def put_many(self, entries: Sequence[CacheRecord]) -> None:
+        """Store results in one transaction; metrics-only entries never replace full ones."""
+        now = time.time()
+        created_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for key, data_id, strategy_id, metrics, trades in entries:
+            metrics_text = json.dumps(metrics)
+            trades_text = json.dumps([astuple(entry) for entry in trades]) if trades is not None else None
+            size = len(metrics_text) + len(trades_text or "")
+            if size <= self.max_bytes:
+                rows.append((key, data_id, strategy_id, metrics_text, trades_text, size, created_at, now))
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                """
+                INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    metrics = excluded.metrics,
+                    trades = COALESCE(excluded.trades, results.trades),
+                    size = CASE WHEN excluded.trades IS NULL THEN results.size ELSE excluded.size END,
+                    last_used = excluded.last_used
+                """,
+                rows,
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        removed = 0
+        doomed: List[str] = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if removed >= excess:
+                break
+            doomed.append(key)
+            removed += size
+        conn.executemany("DELETE FROM results WHERE key = ?", [(key,) for key in doomed])
+
+    def describe(self, limit: int = 100) -> BacktestCacheInfo:
+        with self._lock:
+            conn = self._connection()
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            rows = conn.execute(
+                """
+                SELECT key, data_id, strategy_id, size, trades IS NOT NULL, created_at, last_used
+                FROM results ORDER BY last_used DESC LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        return BacktestCacheInfo(
+            entries=count,
+            size_bytes=total,
+            max_bytes=self.max_bytes,
+            hits=self.hits,
+            misses=self.misses,
+            items=[
+                BacktestCacheEntry(
+                    key=key,
+                    data_id=data_id,
+                    strategy_id=strategy_id,
+                    size_bytes=size,
+                    has_trades=bool(has_trades),
+                    created_at=datetime.fromisoformat(created_at),
+                    last_used_at=datetime.fromtimestamp(last_used, tz=timezone.utc),
+                )
+                for key, data_id, strategy_id, size, has_trades, created_at, last_used in rows
+            ],
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM results")
+            conn.commit()
+            conn.execute("VACUUM")
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+BACKTEST_CACHE = BacktestResultCache(CONFIG.log_storage_path / "backtest_cache.sqlite3", CONFIG.backtest_cache_max_bytes)
@@ -0,0 +1,755 @@
+"""
+Backtest simulation primitives shared by the tick-by-tick and vectorized engines.
+
+The position-sizing rules live in `execute_signal` so both engines produce identical
+trades; the vectorized engine only differs in how prices, timestamps and signals
+are prepared (NumPy arrays instead of per-row Python objects).
+"""
+
+from __future__ import annotations
+
+import base64
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models import BacktestRequest, CommissionType, SignalType
+from app.services.bars import epoch_ns
+from app.services.strategies import Signal, Strategy, restore_strategy
+from app.services.strategies.base import SIGNAL_HOLD, SIGNAL_TYPES
+from app.utils.log_writer import LOG_WRITERS, BufferedLogWriter
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class TradeLogEntry:
+    timestamp: str
+    action: str
+    price: float
+    quantity: float
+    cash: float
+    position: float
+    value: float
+
+
+@dataclass
+class PriceArrays:
+    timestamps: np.ndarray  # int64 epoch nanoseconds
+    prices: np.ndarray  # float64
+    labels: Sequence[str]  # 原始时间戳字符串，用于交易日志
+
+
+@dataclass
+class BacktestResult:
+    metrics: Dict[str, Any]
+    trades: List[TradeLogEntry] = field(default_factory=list)
+    equity_curve: Optional[np.ndarray] = None  # 每个数据点交易前的权益
+    wins: int = 0
+    win_amount: float = 0.0
+    loss_amount: float = 0.0
+
+
+def slice_arrays(arrays: PriceArrays, start: int, stop: int) -> PriceArrays:
+    return PriceArrays(
+        timestamps=arrays.timestamps[start:stop],
+        prices=arrays.prices[start:stop],
+        labels=arrays.labels[start:stop],
+    )
+
+
+def parse_row_timestamp(timestamp_str: str) -> Optional[Tuple[datetime, str]]:
+    """解析数据行中的时间戳，返回 (时间, 用于日志的时间字符串)，无法解析时返回 None。"""
+    try:
+        # 尝试标准ISO格式（带时区）
+        return datetime.fromisoformat(timestamp_str), timestamp_str
+    except (ValueError, TypeError):
+        pass
+    try:
+        # 尝试简单格式（不带时区和毫秒），假设为UTC
+        # 格式如：2025-11-10T14:37:10
+        if "T" in timestamp_str and "+" not in timestamp_str and "Z" not in timestamp_str:
+            # 移除可能的毫秒部分
+            if "." in timestamp_str:
+                timestamp_str = timestamp_str.split(".")[0]
+            return datetime.fromisoformat(timestamp_str).replace(tzinfo=timezone.utc), timestamp_str
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def load_price_arrays(rows: Sequence[Dict[str, Any]]) -> PriceArrays:
+    """Convert stored rows into typed arrays, skipping rows the tick engine would skip."""
+    timestamps: List[int] = []
+    prices: List[float] = []
+    labels: List[str] = []
+    for row in rows:
+        timestamp_str = row.get("timestamp")
+        if not timestamp_str:
+            continue
+        parsed = parse_row_timestamp(timestamp_str)
+        if parsed is None:
+            continue
+        price = float(row.get("price", 0.0))
+        if price <= 0:
+            continue
+        timestamps.append(epoch_ns(parsed[0]))
+        prices.append(price)
+        labels.append(parsed[1])
+    return PriceArrays(
+        timestamps=np.asarray(timestamps, dtype=np.int64),
+        prices=np.asarray(prices, dtype=np.float64),
+        labels=labels,
+    )
+
+
+def calculate_commission(request: BacktestRequest, trade_amount: float) -> float:
+    """计算手续费
+
+    Args:
+        request: 回测请求配置
+        trade_amount: 交易金额（成交额）
+
+    Returns:
+        手续费金额
+    """
+    if request.commission_type == CommissionType.FIXED:
+        return request.commission_value
+    elif request.commission_type == CommissionType.RATIO:
+        commission = trade_amount * request.commission_value
+        if request.commission_max is not None:
+            commission = min(commission, request.commission_max)
+        return commission
+    return 0.0
+
+
+def calculate_max_drawdown(equity_curve: Sequence[float]) -> float:
+    peak = -float("inf")
+    max_drawdown = 0.0
+    for value in equity_curve:
+        peak = max(peak, value)
+        if peak > 0:
+            drawdown = (peak - value) / peak
+            max_drawdown = max(max_drawdown, drawdown)
+    return max_drawdown
+
+
+def execute_signal(
+    request: BacktestRequest,
+    cash: float,
+    position: float,
+    price: float,
+    signal: SignalType,
+    strength: float,
+) -> Optional[Tuple[str, float, float, float]]:
+    """根据信号计算并执行一笔模拟交易。
+
+    Returns:
+        (action, trade_qty, cash, position)；不满足交易条件时返回 None
+    """
+    # 信号强度作为百分比系数（0-1），用于计算实际交易数量
+    signal_strength = abs(strength)
+    if signal_strength <= 0:
+        return None
+
+    # 计算当前总资产价值
+    total_equity = cash + position * price
+
+    # 计算基于资产价值的最大可持仓数量
+    # 最大可持仓数量 = 总资产价值 / 当前价格
+    max_affordable_position_qty = total_equity / price if price > 0 else 0.0
+
+    # 计算实际的最大和最小持仓数量（基于比率）
+    actual_max_position = max_affordable_position_qty * request.max_position
+    actual_min_position = max_affordable_position_qty * request.min_position
+
+    if signal == SignalType.BUY:
+        # 1. 计算基于可用资金的最大可买入数量
+        # 最大可买入数量（基于现金）= 可用现金 / 当前价格
+        max_buyable_by_cash = cash / price if price > 0 else 0.0
+
+        # 2. 计算基于最大持仓比率的允许买入数量
+        # 最大允许持仓数量 = 总资产价值 * max_position / 当前价格
+        # 最大允许买入数量 = 最大允许持仓数量 - 当前持仓
+        max_allowed_position = actual_max_position
+        max_allowed_buy = max_allowed_position - position
+
+        # 3. 取两者较小值作为最大可买入数量
+        max_buyable_qty = min(max_buyable_by_cash, max_allowed_buy)
+
+        # 如果最大可买入数量 <= 0，无法交易
+        if max_buyable_qty <= 0:
+            return None
+
+        # 4. 根据信号强度计算目标交易数量：目标数量 = 信号强度 * 最大可买入数量
+        target_qty = signal_strength * max_buyable_qty
+
+        # 5. 将目标数量向下取整到lot_size的整数倍
+        target_lots = int(target_qty / request.lot_size)
+        proposed_qty = target_lots * request.lot_size
+
+        # 6. 如果计算出的数量为0或小于lot_size，不交易
+        if proposed_qty < request.lot_size:
+            return None
+
+        # 7. 确保不超过最大可买入数量（再次检查）
+        if proposed_qty > max_buyable_qty:
+            # 向下取整到不超过最大可买入数量
+            max_lots = int(max_buyable_qty / request.lot_size)
+            proposed_qty = max_lots * request.lot_size
+            if proposed_qty < request.lot_size:
+                return None
+
+        # 8. 计算交易后的持仓
+        proposed_position = position + proposed_qty
+
+        # 9. 检查交易后持仓是否在实际最小和最大持仓范围内
+        if proposed_position < actual_min_position or proposed_position > actual_max_position:
+            return None
+
+        # 10. 计算交易金额和手续费
+        trade_qty = proposed_qty
+        trade_amount = trade_qty * price
+        commission = calculate_commission(request, trade_amount)
+
+        # 11. 检查扣除手续费后是否有足够现金
+        total_cost = trade_amount + commission
+        if total_cost > cash:
+            # 如果手续费导致资金不足，需要重新计算可买入数量
+            # 对于固定手续费，先扣除手续费再计算可买入数量
+            # 对于比率手续费，需要迭代计算（简化处理：先估算）
+            if request.commission_type == CommissionType.FIXED:
+                available_cash = cash - request.commission_value
+            else:
+                # 比率手续费：先估算，如果不够再调整
+                estimated_ratio = request.commission_value
+                # 简化：假设手续费不超过成交额的某个比例，先预留一部分
+                available_cash = cash / (1 + estimated_ratio)
+
+            if available_cash <= 0:
+                return None
+            max_affordable_qty = available_cash / price
+            max_lots = int(max_affordable_qty / request.lot_size)
+            trade_qty = max_lots * request.lot_size
+            if trade_qty < request.lot_size:
+                return None
+            trade_amount = trade_qty * price
+            commission = calculate_commission(request, trade_amount)
+            total_cost = trade_amount + commission
+            # 再次检查是否足够
+            if total_cost > cash:
+                return None
+
+        # 12. 执行买入交易
+        return "buy", trade_qty, cash - total_cost, position + trade_qty
+
+    if signal == SignalType.SELL:
+        # 1. 计算可卖出的最大数量（基于当前持仓）
+        # 卖出数量不能超过当前持仓
+        max_sellable_by_position = position
+
+        # 2. 计算基于最小持仓比率的允许卖出数量
+        # 最小允许持仓数量 = 总资产价值 * min_position / 当前价格
+        # 最大允许卖出数量 = 当前持仓 - 最小允许持仓数量
+        min_allowed_position = actual_min_position
+        max_allowed_sell = position - min_allowed_position
+
+        # 3. 取两者较小值作为最大可卖出数量
+        max_sellable_qty = min(max_sellable_by_position, max_allowed_sell)
+
+        # 如果最大可卖出数量 <= 0，无法交易
+        if max_sellable_qty <= 0:
+            return None
+
+        # 4. 根据信号强度计算目标交易数量：目标数量 = 信号强度 * 最大可卖出数量
+        target_qty = signal_strength * max_sellable_qty
+
+        # 5. 将目标数量向下取整到lot_size的整数倍
+        target_lots = int(target_qty / request.lot_size)
+        proposed_qty = target_lots * request.lot_size
+
+        # 6. 如果计算出的数量为0或小于lot_size，不交易
+        if proposed_qty < request.lot_size:
+            return None
+
+        # 7. 确保不超过最大可卖出数量（再次检查）
+        if proposed_qty > max_sellable_qty:
+            # 向下取整到不超过最大可卖出数量
+            max_lots = int(max_sellable_qty / request.lot_size)
+            proposed_qty = max_lots * request.lot_size
+            if proposed_qty < request.lot_size:
+                return None
+
+        # 8. 最终安全检查：确保卖出数量不超过当前持仓
+        if proposed_qty > position:
+            max_lots = int(position / request.lot_size)
+            proposed_qty = max_lots * request.lot_size
+            if proposed_qty < request.lot_size:
+                return None
+
+        # 9. 计算交易后的持仓
+        proposed_position = position - proposed_qty
+
+        # 10. 检查交易后持仓是否在实际最小和最大持仓范围内
+        if proposed_position < actual_min_position or proposed_position > actual_max_position:
+            return None
+
+        # 11. 计算交易金额和手续费
+        trade_qty = proposed_qty
+        trade_amount = trade_qty * price
+        commission = calculate_commission(request, trade_amount)
+
+        # 12. 执行卖出交易（手续费从卖出金额中扣除）
+        return "sell", trade_qty, cash + (trade_amount - commission), position - trade_qty
+
+    return None
+
+
+def build_metrics(
+    request: BacktestRequest,
+    final_equity: float,
+    max_drawdown: float,
+    total_trades: int,
+    wins: int,
+    win_amount: float,
+    loss_amount: float,
+) -> Dict[str, Any]:
+    returns = (final_equity - request.initial_capital) / request.initial_capital
+    win_rate = wins / total_trades if total_trades else 0.0
+    profit_factor = (win_amount / loss_amount) if loss_amount > 0 else float("inf")
+    return {
+        "final_equity": final_equity,
+        "total_return": returns,
+        "annualized_return": returns * (365 * 24 * 60 * 60 / request.signal_frequency_seconds),
+        "max_drawdown": max_drawdown,
+        "win_rate": win_rate,
+        "total_trades": total_trades,
+        "profit_factor": profit_factor,
+    }
+
+
+def generate_signal_arrays(strategy: Strategy, arrays: PriceArrays) -> Tuple[np.ndarray, np.ndarray]:
+    return strategy.generate_signals(arrays.prices, arrays.timestamps)
+
+
+def signal_gate(timestamps: np.ndarray, frequency_seconds: int) -> np.ndarray:
+    """Mark the points at which a signal may be acted upon under `signal_frequency_seconds`."""
+    gate = np.zeros(len(timestamps), dtype=bool)
+    if len(timestamps) == 0:
+        return gate
+    step = int(frequency_seconds) * 1_000_000_000
+    if step <= 0:
+        gate[:] = True
+        return gate
+
+    deltas = np.diff(timestamps)
+    if bool(np.all(deltas >= step)):
+        gate[:] = True
+        return gate
+    if bool(np.all(deltas >= 0)):
+        # 有序时间戳：一次性求出每个点之后的下一个可生成信号的位置，再沿链跳转
+        next_index = np.searchsorted(timestamps, timestamps + step, side="left").tolist()
+        index = 0
+        while index < len(next_index):
+            gate[index] = True
+            index = next_index[index]
+        return gate
+
+    last: Optional[int] = None
+    for index, value in enumerate(timestamps.tolist()):
+        if last is None or value - last >= step:
+            gate[index] = True
+            last = value
+    return gate
+
+
+def run_vectorized_backtest(
+    request: BacktestRequest,
+    strategy: Strategy,
+    arrays: PriceArrays,
+    collect_trades: bool = True,
+) -> BacktestResult:
+    """Array-based equivalent of the tick engine.
+
+    With ``collect_trades=False`` only the metrics are produced, so `arrays.labels`
+    may be left empty (used by parameter sweeps).
+    """
+    signals, strengths = generate_signal_arrays(strategy, arrays)
+    return simulate_signals(request, arrays, signals, strengths, collect_trades=collect_trades)
+
+
+def simulate_signals(
+    request: BacktestRequest,
+    arrays: PriceArrays,
+    signals: np.ndarray,
+    strengths: np.ndarray,
+    collect_trades: bool = True,
+    include_equity: bool = False,
+) -> BacktestResult:
+    """Replay precomputed signal arrays through the execution and position-sizing model."""
+    prices = arrays.prices
+    gate = signal_gate(arrays.timestamps, request.signal_frequency_seconds)
+    candidates = np.flatnonzero(gate & (signals != SIGNAL_HOLD) & (strengths != 0.0))
+
+    cash = request.initial_capital
+    position = 0.0
+    max_equity = request.initial_capital
+    segment_start = 0
+    wins = 0
+    win_amount = 0.0
+    loss_amount = 0.0
+    trades: List[TradeLogEntry] = []
+    trade_indices: List[int] = []
+    cash_after: List[float] = []
+    position_after: List[float] = []
+
+    price_list = prices.tolist()
+    strength_list = strengths.tolist()
+    for index in candidates.tolist():
+        price = price_list[index]
+        outcome = execute_signal(
+            request, cash, position, price, SIGNAL_TYPES[int(signals[index])], strength_list[index]
+        )
+        if outcome is None:
+            continue
+        # 交易前的权益峰值：自上次交易以来持仓不变，按区间最高价计算
+        segment_equity = cash + position * prices[segment_start : index + 1]
+        max_equity = max(max_equity, float(segment_equity.max()))
+        segment_start = index + 1
+
+        action, trade_qty, cash, position = outcome
+        value = cash + position * price
+        pnl = value - max_equity
+        if pnl >= 0:
+            wins += 1
+            win_amount += pnl
+        else:
+            loss_amount += abs(pnl)
+        max_equity = max(max_equity, value)
+
+        trade_indices.append(index)
+        cash_after.append(cash)
+        position_after.append(position)
+        if collect_trades:
+            trades.append(
+                TradeLogEntry(
+                    timestamp=arrays.labels[index],
+                    action=action,
+                    price=price,
+                    quantity=trade_qty,
+                    cash=cash,
+                    position=position,
+                    value=value,
+                )
+            )
+
+    # 每个数据点在交易前的权益：使用该点之前最后一笔交易后的现金与持仓
+    state_index = np.searchsorted(np.asarray(trade_indices, dtype=np.int64), np.arange(len(prices)), side="left")
+    cash_curve = np.asarray([request.initial_capital, *cash_after], dtype=np.float64)[state_index]
+    position_curve = np.asarray([0.0, *position_after], dtype=np.float64)[state_index]
+    equity_curve = cash_curve + position_curve * prices
+    peaks = np.maximum.accumulate(equity_curve)
+    positive = peaks > 0
+    drawdowns = (peaks[positive] - equity_curve[positive]) / peaks[positive]
+    max_drawdown = max(0.0, float(drawdowns.max())) if len(drawdowns) else 0.0
+
+    final_equity = cash + position * price_list[-1]
+    metrics = build_metrics(request, final_equity, max_drawdown, len(trade_indices), wins, win_amount, loss_amount)
+    return BacktestResult(
+        metrics=metrics,
+        trades=trades,
+        equity_curve=equity_curve if include_equity else None,
+        wins=wins,
+        win_amount=win_amount,
+        loss_amount=loss_amount,
+    )
+
+
+TRADE_LOG_HEADER = "timestamp,action,price,quantity,cash,position,value\n"
+SIGNAL_LOG_HEADER = "timestamp,price,signal_type,strength,should_generate,strategy_state\n"
+
+
+def signal_log_path_for(log_path: Path) -> Path:
+    # 信号日志文件位于交易日志旁边
+    return log_path.parent / f"{log_path.stem}.signals.csv"
+
+
+def format_trade(entry: TradeLogEntry) -> str:
+    return (
+        f"{entry.timestamp},{entry.action},{entry.price:.4f},{entry.quantity:.4f},"
+        f"{entry.cash:.2f},{entry.position:.4f},{entry.value:.2f}\n"
+    )
+
+
+def checkpoint_path_for(log_path: Path) -> Path:
+    return log_path.parent / f"{log_path.stem}.checkpoint.json"
+
+
+def open_backtest_logs(
+    task_id: str, request: BacktestRequest, log_path: Path, resume: bool = False
+) -> Tuple[BufferedLogWriter, Optional[BufferedLogWriter]]:
+    """Create the trade log (and the sampled signal log), or reopen them for appending on resume."""
+    mode = "a" if resume else "w"
+    trade_log = LOG_WRITERS.open(task_id, "trades", log_path, mode=mode)
+    if not resume:
+        trade_log.write(json.dumps(request.dict()) + "\n")
+        trade_log.write(TRADE_LOG_HEADER)
+
+    signal_log_path = signal_log_path_for(log_path)
+    signal_log = None
+    if request.signal_log_interval > 0:
+        write_header = not resume or not signal_log_path.exists()
+        signal_log = LOG_WRITERS.open(task_id, "signals", signal_log_path, mode=mode)
+        if write_header:
+            signal_log.write(SIGNAL_LOG_HEADER)
+    elif signal_log_path.exists():
+        signal_log_path.unlink()
+    return trade_log, signal_log
+
+
+def write_trade_log(log_path: Path, request: BacktestRequest, trades: Sequence[TradeLogEntry]) -> None:
+    lines = [json.dumps(request.dict()) + "\n", TRADE_LOG_HEADER]
+    lines.extend(format_trade(entry) for entry in trades)
+    with log_path.open("w", encoding="utf-8") as fp:
+        fp.writelines(lines)
+
+
+def parse_trade_row(row: Sequence[str]) -> Optional[TradeLogEntry]:
+    if len(row) != 7:
+        return None
+    timestamp, action, price, quantity, cash, position, value = row
+    return TradeLogEntry(
+        timestamp=timestamp,
+        action=action,
+        price=float(price),
+        quantity=float(quantity),
+        cash=float(cash),
+        position=float(position),
+        value=float(value),
+    )
+
+
+def read_trade_log(log_path: Path) -> List[TradeLogEntry]:
+    """Parse the trades of a log file (config line and header are skipped)."""
+    trades: List[TradeLogEntry] = []
+    with log_path.open("r", encoding="utf-8") as fp:
+        if not fp.readline():
+            return trades
+        fp.readline()
+        for row in csv.reader(fp):
+            entry = parse_trade_row(row)
+            if entry is not None:
+                trades.append(entry)
+    return trades
+
+
+class TickBacktest:
+    """Tick-by-tick simulation advanced over a series one chunk of points at a time.
+
+    Callers feed the chunks of `iter_series` (starting after `cursor` on resume), which
+    lets the asyncio runner yield to the event loop and the process-pool worker poll for
+    cancellation. Between calls the whole simulation state can be saved with
+    `save_checkpoint` and picked up again with `from_checkpoint`.
+    """
+
+    _CHECKPOINT_FIELDS = (
+        "cursor",
+        "tick",
+        "cash",
+        "position",
+        "last_price",
+        "max_equity",
+        "peak_equity",
+        "max_drawdown",
+        "total_trades",
+        "wins",
+        "win_amount",
+        "loss_amount",
+    )
+
+    def __init__(
+        self,
+        request: BacktestRequest,
+        strategy: Strategy,
+        trade_log: Optional[BufferedLogWriter] = None,
+        signal_log: Optional[BufferedLogWriter] = None,
+    ) -> None:
+        self.request = request
+        self.strategy = strategy
+        self.trade_log = trade_log
+        self.signal_log = signal_log
+        self.cursor = 0
+        self.tick = 0
+        self.cash = request.initial_capital
+        self.position = 0.0
+        self.last_price: Optional[float] = None
+        self.max_equity = request.initial_capital
+        self.peak_equity = -float("inf")
+        self.max_drawdown = 0.0
+        self.total_trades = 0
+        self.wins = 0
+        self.win_amount = 0.0
+        self.loss_amount = 0.0
+        # 用于跟踪上次信号生成的时间
+        self.last_signal_time: Optional[datetime] = None
+
+    def advance(self, chunk: PriceArrays) -> List[TradeLogEntry]:
+        """Process the next `chunk` of points (the ones after `cursor`) and return the new trades."""
+        request = self.request
+        strategy = self.strategy
+        trade_log = self.trade_log
+        signal_log = self.signal_log
+        signal_log_interval = request.signal_log_interval
+        labels = chunk.labels
+
+        cash = self.cash
+        position = self.position
+        max_equity = self.max_equity
+        peak_equity = self.peak_equity
+        max_drawdown = self.max_drawdown
+        last_signal_time = self.last_signal_time
+        tick = self.tick
+        trades: List[TradeLogEntry] = []
+
+        for index, (price, nanoseconds) in enumerate(zip(chunk.prices.tolist(), chunk.timestamps.tolist())):
+            timestamp = _EPOCH + timedelta(microseconds=nanoseconds // 1000)
+            self.last_price = price
+
+            # 根据信号频率判断是否需要生成信号
+            # 如果设置了信号频率，需要检查时间间隔
+            should_generate_signal = True
+            if last_signal_time is not None and request.signal_frequency_seconds > 0:
+                time_diff = (timestamp - last_signal_time).total_seconds()
+                if time_diff < request.signal_frequency_seconds:
+                    should_generate_signal = False
+
+            # 重要：策略需要每个价格点来更新其内部状态（如价格历史、previous_spread等）
+            # 我们总是调用generate_signal来更新策略状态，但只在满足信号频率时使用信号结果
+            # 这样策略的状态会正确维护，即使信号频率设置得很大
+            strategy_signal: Signal = strategy.generate_signal(price, timestamp)
+
+            # 按采样间隔记录信号日志（包含策略状态信息）
+            if signal_log is not None and tick % signal_log_interval == 0:
+                signal_log.write(
+                    f"{labels[index]},{price:.4f},{strategy_signal.signal.value},{strategy_signal.strength:.6f},{should_generate_signal},{strategy.log_state()}\n"
+                )
+            tick += 1
+
+            if should_generate_signal:
+                # 使用策略生成的信号
+                signal_type = strategy_signal.signal
+                last_signal_time = timestamp
+            else:
+                # 不生成新信号，忽略策略信号，按HOLD处理
+                # 但策略状态已经通过上面的generate_signal调用更新了
+                signal_type = SignalType.HOLD
+
+            # 更新权益曲线（每个数据点都更新），同时增量计算最大回撤
+            equity = cash + position * price
+            max_equity = max(max_equity, equity)
+            peak_equity = max(peak_equity, equity)
+            if peak_equity > 0:
+                max_drawdown = max(max_drawdown, (peak_equity - equity) / peak_equity)
+
+            if signal_type == SignalType.HOLD:
+                continue
+
+            outcome = execute_signal(request, cash, position, price, signal_type, strategy_signal.strength)
+            if outcome is None:
+                continue
+            action, trade_qty, cash, position = outcome
+
+            # 记录交易日志
+            self.total_trades += 1
+            value = cash + position * price
+            pnl = value - max_equity
+            if pnl >= 0:
+                self.wins += 1
+                self.win_amount += pnl
+            else:
+                self.loss_amount += abs(pnl)
+            max_equity = max(max_equity, value)
+            entry = TradeLogEntry(
+                timestamp=labels[index],
+                action=action,
+                price=price,
+                quantity=trade_qty,
+                cash=cash,
+                position=position,
+                value=value,
+            )
+            trades.append(entry)
+            if trade_log is not None:
+                trade_log.write(format_trade(entry))
+
+        self.cursor += len(chunk.prices)
+        self.cash = cash
+        self.position = position
+        self.max_equity = max_equity
+        self.peak_equity = peak_equity
+        self.max_drawdown = max_drawdown
+        self.last_signal_time = last_signal_time
+        self.tick = tick
+        return trades
+
+    def checkpoint(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {name: getattr(self, name) for name in self._CHECKPOINT_FIELDS}
+        data["last_signal_time"] = self.last_signal_time.isoformat() if self.last_signal_time else None
+        data["strategy"] = base64.b64encode(self.strategy.dump_state()).decode("ascii")
+        data["version"] = CHECKPOINT_VERSION
+        return data
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        request: BacktestRequest,
+        data: Dict[str, Any],
+        trade_log: Optional[BufferedLogWriter] = None,
+        signal_log: Optional[BufferedLogWriter] = None,
+    ) -> "TickBacktest":
+        strategy = restore_strategy(base64.b64decode(data["strategy"]), request.strategy_id)
+        simulation = cls(request, strategy, trade_log, signal_log)
+        for name in cls._CHECKPOINT_FIELDS:
+            setattr(simulation, name, data[name])
+        if data.get("last_signal_time"):
+            simulation.last_signal_time = datetime.fromisoformat(data["last_signal_time"])
+        return simulation
+
+    def metrics(self) -> Optional[Dict[str, Any]]:
+        if self.last_price is None:
+            return None
+        return build_metrics(
+            self.request,
+            final_equity=self.cash + self.position * self.last_price,
+            max_drawdown=self.max_drawdown,
+            total_trades=self.total_trades,
+            wins=self.wins,
+            win_amount=self.win_amount,
+            loss_amount=self.loss_amount,
+        )
+
+
+def save_checkpoint(path: Path, simulation: TickBacktest) -> None:
+    # 先写临时文件再替换，避免进程中断留下半个检查点
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fp:
+        json.dump(simulation.checkpoint(), fp)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with path.open("r", encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != CHECKPOINT_VERSION:
+        return None
+    return data
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.models import (
+    BacktestRequest,
+    BacktestSweepInfo,
+    BacktestSweepRequest,
+    BacktestSweepResult,
+    ParameterRange,
+)
+from app.services.backtest_cache import BACKTEST_CACHE, CacheRecord
+from app.services.backtesting import BACKTEST_MANAGER
+from app.services.backtest_workers import BACKTEST_POOL, run_sweep_chunk
+from app.services.series_catalog import SERIES_CATALOG
+from app.utils.id_generator import generate_id
+from app.utils.scheduler import SCHEDULER, TaskStatus
+
+MAX_SWEEP_COMBINATIONS = 50_000
+SWEEP_METRICS = {
+    "final_equity",
+    "total_return",
+    "annualized_return",
+    "max_drawdown",
+    "win_rate",
+    "total_trades",
+    "profit_factor",
+}
+# 参数组合中不允许被扫描的字段
+_FIXED_FIELDS = {"data_id", "strategy_id", "strategy_params", "engine", "signal_log_interval"}
+# 每个工作进程大约分到多少批，保证负载均衡
+_CHUNKS_PER_WORKER = 4
+
+ParameterGrid = Dict[str, Union[ParameterRange, List[Any]]]
+Combination = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def expand_values(spec: Union[ParameterRange, List[Any]]) -> List[Any]:
+    if isinstance(spec, list):
+        return list(spec)
+    count = int(math.floor((spec.stop - spec.start) / spec.step + 1e-9)) + 1
+    if count <= 0:
+        return []
+    integral = all(float(value).is_integer() for value in (spec.start, spec.stop, spec.step))
+    if integral:
+        return [int(spec.start + index * spec.step) for index in range(count)]
+    return [round(spec.start + index * spec.step, 10) for index in range(count)]
+
+
+def expand_grid(grid: ParameterGrid) -> List[Dict[str, Any]]:
+    if not grid:
+        return [{}]
+    names = list(grid.keys())
+    value_lists = [expand_values(grid[name]) for name in names]
+    return [dict(zip(names, values)) for values in itertools.product(*value_lists)]
+
+
+def validate_grid(metric: str, execution_grid: ParameterGrid) -> None:
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"Unknown metric {metric}.")
+    invalid = [
+        name
+        for name in execution_grid
+        if name in _FIXED_FIELDS or name not in BacktestRequest.model_fields
+    ]
+    if invalid:
+        raise ValueError(f"Parameters cannot be swept: {', '.join(invalid)}")
+
+
+def build_request(template: BacktestRequest, combination: Combination) -> Dict[str, Any]:
+    strategy_params, execution_params = combination
+    payload = template.dict()
+    payload.update(execution_params)
+    payload["strategy_params"] = {**template.strategy_params, **strategy_params}
+    return payload
+
+
+def metric_sort_key(metrics: Optional[Dict[str, Any]], metric: str, ascending: bool) -> Tuple[int, float]:
+    """Sort key that ranks the best value first and missing/NaN values last."""
+    value = metrics.get(metric) if metrics else None
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return (1, 0.0)
+    return (0, value if ascending else -value)
+
+
+@dataclass
+class SweepState:
+    sweep_id: str
+    request: BacktestSweepRequest
+    combinations: List[Combination]
+    status: TaskStatus = TaskStatus.RUNNING
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    message: Optional[str] = None
+    completed: int = 0
+    outcomes: List[Optional[Tuple[Optional[Dict[str, Any]], Optional[str]]]] = field(default_factory=list)
+
+
+class SweepManager:
+    def __init__(self) -> None:
+        self.sweeps: Dict[str, SweepState] = {}
+
+    def create_sweep(self, request: BacktestSweepRequest) -> BacktestSweepInfo:
+        validate_grid(request.metric, request.execution_param_grid)
+        strategy_grid = expand_grid(request.strategy_param_grid)
+        execution_grid = expand_grid(request.execution_param_grid)
+        total = len(strategy_grid) * len(execution_grid)
+        if total == 0:
+            raise ValueError("Parameter grid is empty.")
+        if total > MAX_SWEEP_COMBINATIONS:
+            raise ValueError(f"Too many combinations ({total}); the limit is {MAX_SWEEP_COMBINATIONS}.")
+
+        sweep_id = generate_id("sweep_")
+        state = SweepState(
+            sweep_id=sweep_id,
+            request=request,
+            combinations=list(itertools.product(strategy_grid, execution_grid)),
+        )
+        state.outcomes = [None] * total
+        self.sweeps[sweep_id] = state
+
+        async def runner() -> None:
+            state.started_at = _now()
+            try:
+                await self._run_sweep(state)
+            finally:
+                state.finished_at = _now()
+
+        SCHEDULER.create(sweep_id, runner)
+        return self.describe_sweep(sweep_id, include_results=False)
+
+    async def _run_sweep(self, state: SweepState) -> None:
+        template = state.request.template
+        try:
+            data_path = BACKTEST_MANAGER.series_path(template.data_id)
+        except FileNotFoundError:
+            state.message = "Data series not found."
+            state.status = TaskStatus.FAILED
+            return
+        series = SERIES_CATALOG.get(template.data_id)
+        if series is not None and series.data_points == 0:
+            state.message = "No price data available."
+            state.status = TaskStatus.FAILED
+            return
+
+        # 批次只携带数据文件路径，每个工作进程只加载一次数据；命中结果缓存的组合直接填入
+        requests = [build_request(template, combination) for combination in state.combinations]
+        keys = await asyncio.to_thread(self._fill_from_cache, state, requests)
+        pending = [index for index, outcome in enumerate(state.outcomes) if outcome is None]
+        chunk_count = max(BACKTEST_POOL.max_workers, 1) * _CHUNKS_PER_WORKER
+        group_size = len(expand_grid(state.request.execution_param_grid))
+        groups = [list(group) for _, group in itertools.groupby(pending, key=lambda index: index // group_size)]
+        if group_size > 1 and len(groups) >= chunk_count:
+            # 组合按策略参数连续排列：整组放进同一批，每组的信号流只计算一次
+            per_chunk = math.ceil(len(groups) / chunk_count)
+            chunks = [
+                [index for group in groups[offset : offset + per_chunk] for index in group]
+                for offset in range(0, len(groups), per_chunk)
+            ]
+        else:
+            chunk_size = max(math.ceil(len(pending) / chunk_count), 1)
+            chunks = [pending[offset : offset + chunk_size] for offset in range(0, len(pending), chunk_size)]
+        payloads = [(str(data_path), [requests[index] for index in chunk]) for chunk in chunks]
+
+        def on_result(index: int, outcomes: List[Tuple[Optional[Dict[str, Any]], Optional[str]]]) -> None:
+            records: List[CacheRecord] = []
+            for request_index, outcome in zip(chunks[index], outcomes):
+                state.outcomes[request_index] = outcome
+                key = keys[request_index]
+                if key is not None and outcome[0] is not None:
+                    records.append((key, template.data_id, template.strategy_id, outcome[0], None))
+            state.completed += len(outcomes)
+            BACKTEST_CACHE.put_many(records)
+
+        await BACKTEST_POOL.map(run_sweep_chunk, payloads, on_result=on_result)
+        state.status = TaskStatus.COMPLETED
+
+    def _fill_from_cache(self, state: SweepState, requests: List[Dict[str, Any]]) -> List[Optional[str]]:
+        keys: List[Optional[str]] = []
+        for request_data in requests:
+            try:
+                keys.append(BACKTEST_CACHE.key_for(BacktestRequest(**request_data)))
+            except ValueError:
+                keys.append(None)
+        cached = BACKTEST_CACHE.get_many([key for key in keys if key is not None], with_trades=False)
+        for index, key in enumerate(keys):
+            if key in cached:
+                state.outcomes[index] = (cached[key].metrics, None)
+                state.completed += 1
+        return keys
+
+    def _ranked_results(self, state: SweepState) -> List[BacktestSweepResult]:
+        metric = state.request.metric
+        finished = [
+            (combination, outcome)
+            for combination, outcome in zip(state.combinations, state.outcomes)
+            if outcome is not None
+        ]
+
+        finished.sort(key=lambda item: metric_sort_key(item[1][0], metric, state.request.ascending))
+        return [
+            BacktestSweepResult(
+                rank=rank,
+                strategy_params=combination[0],
+                execution_params=combination[1],
+                metrics=outcome[0],
+                message=outcome[1],
+            )
+            for rank, (combination, outcome) in enumerate(finished, start=1)
+        ]
+
+    def describe_sweep(
+        self,
+        sweep_id: str,
+        include_results: bool = True,
+        top_n: Optional[int] = None,
+    ) -> BacktestSweepInfo:
+        state = self.sweeps[sweep_id]
+        scheduled = SCHEDULER.get(sweep_id)
+        status = scheduled.status.value if scheduled else state.status.value
+        if state.status == TaskStatus.FAILED:
+            status = state.status.value
+        results = None
+        if include_results:
+            results = self._ranked_results(state)
+            if top_n is not None:
+                results = results[:top_n]
+        return BacktestSweepInfo(
+            sweep_id=sweep_id,
+            status=status,
+            created_at=state.created_at,
+            started_at=state.started_at,
+            finished_at=state.finished_at,
+            config=state.request.dict(),
+            total_combinations=len(state.combinations),
+            completed_combinations=state.completed,
+            message=state.message,
+            results=results,
+        )
+
+    def list_sweeps(self) -> List[BacktestSweepInfo]:
+        return [self.describe_sweep(sweep_id, include_results=False) for sweep_id in self.sweeps]
+
+    def stop(self, sweep_id: str) -> BacktestSweepInfo:
+        if sweep_id not in self.sweeps:
+            raise KeyError(f"Sweep {sweep_id} not found")
+        if SCHEDULER.get(sweep_id) is not None:
+            SCHEDULER.stop(sweep_id)
+        self.sweeps[sweep_id].status = TaskStatus.STOPPED
+        return self.describe_sweep(sweep_id, include_results=False)
+
+    def delete(self, sweep_id: str) -> None:
+        SCHEDULER.remove(sweep_id)
+        self.sweeps.pop(sweep_id, None)
+
+
+SWEEP_MANAGER = SweepManager()
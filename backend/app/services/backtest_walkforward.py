@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models import WalkForwardInfo, WalkForwardRequest, WalkForwardWindow
+from app.services.backtest_engine import BacktestResult, PriceArrays, build_metrics
+from app.services.backtest_sweeps import (
+    MAX_SWEEP_COMBINATIONS,
+    Combination,
+    build_request,
+    expand_grid,
+    metric_sort_key,
+    validate_grid,
+)
+from app.services.backtest_workers import BACKTEST_POOL, WindowOutcome, run_walk_forward_tile
+from app.services.backtesting import BACKTEST_MANAGER
+from app.utils.id_generator import generate_id
+from app.utils.scheduler import SCHEDULER, TaskStatus
+
+# 返回给前端的拼接权益曲线最多保留多少个点
+MAX_CURVE_POINTS = 2000
+_CHUNKS_PER_WORKER = 4
+
+# (样本内起点, 样本外起点, 样本外终点)
+WindowBounds = Tuple[int, int, int]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def build_windows(total: int, in_sample: int, out_of_sample: int, step: int) -> List[WindowBounds]:
+    windows: List[WindowBounds] = []
+    start = 0
+    while start + in_sample + out_of_sample <= total:
+        windows.append((start, start + in_sample, start + in_sample + out_of_sample))
+        start += step
+    return windows
+
+
+def _split(items: List[Any], parts: int) -> List[List[Any]]:
+    size = max(math.ceil(len(items) / max(parts, 1)), 1)
+    return [items[offset : offset + size] for offset in range(0, len(items), size)]
+
+
+@dataclass
+class WalkForwardState:
+    walk_id: str
+    request: WalkForwardRequest
+    combinations: List[Combination]
+    status: TaskStatus = TaskStatus.RUNNING
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    message: Optional[str] = None
+    arrays: Optional[PriceArrays] = None
+    windows: List[WindowBounds] = field(default_factory=list)
+    # 每个窗口当前最优的 (排序键, 组合下标, 样本内结果)
+    best: List[Optional[Tuple[Tuple[int, float], int, BacktestResult]]] = field(default_factory=list)
+    out_of_sample: List[Optional[WindowOutcome]] = field(default_factory=list)
+    completed: int = 0
+    metrics: Optional[Dict[str, Any]] = None
+    equity_curve: Optional[np.ndarray] = None
+    curve_positions: Optional[np.ndarray] = None
+
+
+class WalkForwardManager:
+    """Rolling in-sample optimisation with out-of-sample validation.
+
+    Each window optimises the parameter grid on its in-sample slice, then replays the best
+    combination on the following out-of-sample slice. Out-of-sample windows start flat with
+    the template capital; their returns are compounded onto the previous window's ending
+    equity to build the stitched curve.
+
+    Runs live only in memory, like parameter sweeps: they are lost on restart and have to
+    be submitted again.
+    """
+
+    def __init__(self) -> None:
+        self.runs: Dict[str, WalkForwardState] = {}
+
+    def create_walk_forward(self, request: WalkForwardRequest) -> WalkForwardInfo:
+        validate_grid(request.metric, request.execution_param_grid)
+        strategy_grid = expand_grid(request.strategy_param_grid)
+        execution_grid = expand_grid(request.execution_param_grid)
+        total = len(strategy_grid) * len(execution_grid)
+        if total == 0:
+            raise ValueError("Parameter grid is empty.")
+        if total > MAX_SWEEP_COMBINATIONS:
+            raise ValueError(f"Too many combinations ({total}); the limit is {MAX_SWEEP_COMBINATIONS}.")
+
+        walk_id = generate_id("walk_")
+        state = WalkForwardState(
+            walk_id=walk_id,
+            request=request,
+            combinations=list(itertools.product(strategy_grid, execution_grid)),
+        )
+        self.runs[walk_id] = state
+
+        async def runner() -> None:
+            state.started_at = _now()
+            try:
+                await self._run(state, len(execution_grid))
+            finally:
+                state.finished_at = _now()
+
+        SCHEDULER.create(walk_id, runner)
+        return self.describe(walk_id, include_details=False)
+
+    def _fail(self, state: WalkForwardState, message: str) -> None:
+        state.message = message
+        state.status = TaskStatus.FAILED
+
+    async def _run(self, state: WalkForwardState, group_size: int) -> None:
+        config = state.request
+        try:
+            data_path = BACKTEST_MANAGER.series_path(config.template.data_id)
+            arrays = await asyncio.to_thread(BACKTEST_MANAGER.load_series_arrays, config.template.data_id)
+        except FileNotFoundError:
+            self._fail(state, "Data series not found.")
+            return
+        state.arrays = arrays
+        state.windows = build_windows(
+            len(arrays.prices),
+            config.in_sample_size,
+            config.out_of_sample_size,
+            config.step_size or config.out_of_sample_size,
+        )
+        if not state.windows:
+            self._fail(state, "Not enough data for a single in-sample/out-of-sample window.")
+            return
+        state.best = [None] * len(state.windows)
+        state.out_of_sample = [None] * len(state.windows)
+
+        await self._optimize_in_sample(state, str(data_path), group_size)
+        await self._run_out_of_sample(state, str(data_path))
+        if self._stitch(state):
+            state.status = TaskStatus.COMPLETED
+
+    async def _optimize_in_sample(self, state: WalkForwardState, data_path: str, group_size: int) -> None:
+        # 同一组内策略参数相同，只需计算一次信号；组与窗口块两个维度一起切分以便并行
+        # 批次只携带数据文件路径，价格数组由每个工作进程加载一次
+        requests = [build_request(state.request.template, combination) for combination in state.combinations]
+        groups = [requests[offset : offset + group_size] for offset in range(0, len(requests), group_size)]
+        target = max(BACKTEST_POOL.max_workers, 1) * _CHUNKS_PER_WORKER
+        group_chunks = _split(list(range(len(groups))), target)
+        window_blocks = _split(list(range(len(state.windows))), max(target // len(group_chunks), 1))
+
+        tiles = list(itertools.product(group_chunks, window_blocks))
+        payloads = [
+            (
+                data_path,
+                [groups[index] for index in group_indices],
+                [state.windows[index][:2] for index in window_indices],
+            )
+            for group_indices, window_indices in tiles
+        ]
+        metric = state.request.metric
+        ascending = state.request.ascending
+
+        def on_result(index: int, outcomes: List[List[List[WindowOutcome]]]) -> None:
+            group_indices, window_indices = tiles[index]
+            for group_index, group_outcomes in zip(group_indices, outcomes):
+                for offset, request_outcomes in enumerate(group_outcomes):
+                    combination_index = group_index * group_size + offset
+                    for window_index, (result, _) in zip(window_indices, request_outcomes):
+                        if result is None:
+                            continue
+                        key = metric_sort_key(result.metrics, metric, ascending)
+                        current = state.best[window_index]
+                        if current is None or (key, combination_index) < current[:2]:
+                            state.best[window_index] = (key, combination_index, result)
+
+        await BACKTEST_POOL.map(run_walk_forward_tile, payloads, on_result=on_result)
+
+    async def _run_out_of_sample(self, state: WalkForwardState, data_path: str) -> None:
+        by_combination: Dict[int, List[int]] = {}
+        for window_index, best in enumerate(state.best):
+            if best is None:
+                state.out_of_sample[window_index] = (None, "No valid in-sample result.")
+                state.completed += 1
+                continue
+            by_combination.setdefault(best[1], []).append(window_index)
+
+        selected = list(by_combination.items())
+        payloads = [
+            (
+                data_path,
+                [[build_request(state.request.template, state.combinations[combination_index])]],
+                [state.windows[index][1:] for index in window_indices],
+                True,
+            )
+            for combination_index, window_indices in selected
+        ]
+
+        def on_result(index: int, outcomes: List[List[List[WindowOutcome]]]) -> None:
+            for window_index, outcome in zip(selected[index][1], outcomes[0][0]):
+                state.out_of_sample[window_index] = outcome
+                state.completed += 1
+
+        await BACKTEST_POOL.map(run_walk_forward_tile, payloads, on_result=on_result)
+
+    def _stitch(self, state: WalkForwardState) -> bool:
+        """Build the stitched metrics and curve; fails the run and returns False without any result."""
+        template = state.request.template
+        capital = template.initial_capital
+        equity = capital
+        curves: List[np.ndarray] = []
+        positions: List[np.ndarray] = []
+        total_trades = 0
+        wins = 0
+        win_amount = 0.0
+        loss_amount = 0.0
+        for (_, start, stop), outcome in zip(state.windows, state.out_of_sample):
+            result = outcome[0] if outcome else None
+            if result is None or result.equity_curve is None:
+                continue
+            scale = equity / capital
+            curves.append(result.equity_curve * scale)
+            positions.append(np.arange(start, stop))
+            total_trades += result.metrics["total_trades"]
+            wins += result.wins
+            win_amount += result.win_amount * scale
+            loss_amount += result.loss_amount * scale
+            equity = result.metrics["final_equity"] * scale
+        if not curves:
+            self._fail(state, "No out-of-sample window produced a result.")
+            return False
+
+        curve = np.concatenate([*curves, [equity]])
+        peaks = np.maximum.accumulate(curve)
+        positive = peaks > 0
+        drawdowns = (peaks[positive] - curve[positive]) / peaks[positive]
+        max_drawdown = max(0.0, float(drawdowns.max())) if len(drawdowns) else 0.0
+        state.metrics = build_metrics(template, equity, max_drawdown, total_trades, wins, win_amount, loss_amount)
+        state.equity_curve = curve[:-1]
+        state.curve_positions = np.concatenate(positions)
+        return True
+
+    def _describe_windows(self, state: WalkForwardState) -> List[WalkForwardWindow]:
+        labels = state.arrays.labels if state.arrays else []
+        windows: List[WalkForwardWindow] = []
+        for index, (start, split, stop) in enumerate(state.windows):
+            best = state.best[index] if state.best else None
+            outcome = state.out_of_sample[index] if state.out_of_sample else None
+            combination = state.combinations[best[1]] if best else (None, None)
+            windows.append(
+                WalkForwardWindow(
+                    index=index,
+                    in_sample_start=labels[start],
+                    in_sample_end=labels[split - 1],
+                    out_of_sample_start=labels[split],
+                    out_of_sample_end=labels[stop - 1],
+                    strategy_params=combination[0],
+                    execution_params=combination[1],
+                    in_sample_metrics=best[2].metrics if best else None,
+                    out_of_sample_metrics=outcome[0].metrics if outcome and outcome[0] else None,
+                    message=outcome[1] if outcome else None,
+                )
+            )
+        return windows
+
+    def _describe_curve(self, state: WalkForwardState) -> Optional[List[Dict[str, Any]]]:
+        if state.equity_curve is None or state.curve_positions is None or state.arrays is None:
+            return None
+        stride = max(math.ceil(len(state.equity_curve) / MAX_CURVE_POINTS), 1)
+        labels = state.arrays.labels
+        return [
+            {"timestamp": labels[position], "equity": equity}
+            for position, equity in zip(
+                state.curve_positions[::stride].tolist(), state.equity_curve[::stride].tolist()
+            )
+        ]
+
+    def describe(self, walk_id: str, include_details: bool = True) -> WalkForwardInfo:
+        state = self.runs[walk_id]
+        scheduled = SCHEDULER.get(walk_id)
+        status = scheduled.status.value if scheduled else state.status.value
+        if state.status == TaskStatus.FAILED:
+            status = state.status.value
+        return WalkForwardInfo(
+            walk_id=walk_id,
+            status=status,
+            created_at=state.created_at,
+            started_at=state.started_at,
+            finished_at=state.finished_at,
+            config=state.request.dict(),
+            total_windows=len(state.windows),
+            completed_windows=state.completed,
+            message=state.message,
+            metrics=state.metrics,
+            windows=self._describe_windows(state) if include_details else None,
+            equity_curve=self._describe_curve(state) if include_details else None,
+        )
+
+    def list_runs(self) -> List[WalkForwardInfo]:
+        return [self.describe(walk_id, include_details=False) for walk_id in self.runs]
+
+    def stop(self, walk_id: str) -> WalkForwardInfo:
+        if walk_id not in self.runs:
+            raise KeyError(f"Walk-forward run {walk_id} not found")
+        if SCHEDULER.get(walk_id) is not None:
+            SCHEDULER.stop(walk_id)
+        self.runs[walk_id].status = TaskStatus.STOPPED
+        return self.describe(walk_id, include_details=False)
+
+    def delete(self, walk_id: str) -> None:
+        SCHEDULER.remove(walk_id)
+        self.runs.pop(walk_id, None)
+
+
+WALK_FORWARD_MANAGER = WalkForwardManager()
@@ -0,0 +1,334 @@
+"""
+Process-pool execution for backtests.
+
+Worker processes are started with the ``spawn`` method and only import the engine,
+strategy and storage modules, so they never touch the managers that own the API state.
+Progress and trades flow back through a manager queue; cancellation flows in through
+a manager event that the worker polls between chunks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import SyncManager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import CONFIG
+from app.models import BacktestEngine, BacktestRequest
+from app.services.backtest_engine import (
+    BacktestResult,
+    PriceArrays,
+    TickBacktest,
+    checkpoint_path_for,
+    load_checkpoint,
+    open_backtest_logs,
+    save_checkpoint,
+    simulate_signals,
+    slice_arrays,
+    write_trade_log,
+)
+from app.services.series_store import iter_series, read_price_arrays
+from app.services.signal_store import SIGNAL_STORE
+from app.services.strategies import STRATEGY_REGISTRY
+from app.utils.file_storage import count_series_rows
+from app.utils.log_writer import LOG_WRITERS
+
+# 每处理多少个数据点检查一次取消标志并回传进度
+WORKER_CHUNK_SIZE = 5000
+# 每个工作进程最多缓存几份价格序列
+WORKER_SERIES_LIMIT = 2
+
+WorkerEvent = Tuple[str, Dict[str, Any]]
+WindowOutcome = Tuple[Optional[BacktestResult], Optional[str]]
+
+_worker_series: "OrderedDict[Tuple[str, int, int], PriceArrays]" = OrderedDict()
+_worker_series_lock = threading.Lock()
+
+
+def load_worker_series(data_path: str) -> PriceArrays:
+    """Prices of a stored series, read once per worker process and reused by later batches.
+
+    Sweep and walk-forward payloads carry only the file path, so the arrays are never
+    pickled per batch. Entries are keyed by size and mtime, so a rewritten file is read
+    again; columnar files are memory-mapped and share the page cache across workers.
+    """
+    stat = os.stat(data_path)
+    key = (data_path, stat.st_size, stat.st_mtime_ns)
+    with _worker_series_lock:
+        arrays = _worker_series.get(key)
+        if arrays is not None:
+            _worker_series.move_to_end(key)
+            return arrays
+    loaded = read_price_arrays(Path(data_path))
+    # 批量任务不需要时间标签
+    arrays = PriceArrays(timestamps=loaded.timestamps, prices=loaded.prices, labels=[])
+    with _worker_series_lock:
+        _worker_series[key] = arrays
+        while len(_worker_series) > WORKER_SERIES_LIMIT:
+            _worker_series.popitem(last=False)
+    return arrays
+
+
+def run_backtest_job(
+    task_id: str,
+    request_data: Dict[str, Any],
+    data_path: str,
+    log_path: str,
+    cancel_event: Any,
+    events: Any,
+) -> Dict[str, Any]:
+    """Worker entry point: run one backtest to completion or until `cancel_event` is set."""
+    request = BacktestRequest(**request_data)
+    strategy = STRATEGY_REGISTRY.get(request.strategy_id)(**request.strategy_params)
+
+    if request.engine == BacktestEngine.VECTORIZED:
+        try:
+            arrays = read_price_arrays(Path(data_path))
+        except FileNotFoundError:
+            return {"status": "failed", "message": "Data series not found."}
+        if len(arrays.prices) == 0:
+            return {"status": "failed", "message": "No price data available."}
+        stream = SIGNAL_STORE.stream_for(request, arrays)
+        result = simulate_signals(request, arrays, stream.signals, stream.strengths)
+        if cancel_event.is_set():
+            return {"status": "cancelled"}
+        write_trade_log(Path(log_path), request, result.trades)
+        events.put(("progress", {"progress": 1.0, "trades": result.trades, "metrics": result.metrics}))
+        return {"status": "completed", "metrics": result.metrics}
+
+    try:
+        total = count_series_rows(Path(data_path))
+    except FileNotFoundError:
+        return {"status": "failed", "message": "Data series not found."}
+    if not total:
+        return {"status": "failed", "message": "Data series is empty."}
+
+    checkpoint_path = checkpoint_path_for(Path(log_path))
+    checkpoint = load_checkpoint(checkpoint_path)
+    trade_log, signal_log = open_backtest_logs(task_id, request, Path(log_path), resume=checkpoint is not None)
+    if checkpoint is not None:
+        simulation = TickBacktest.from_checkpoint(request, checkpoint, trade_log, signal_log)
+    else:
+        simulation = TickBacktest(request, strategy, trade_log, signal_log)
+    try:
+        for chunk in iter_series(Path(data_path), WORKER_CHUNK_SIZE, start=simulation.cursor):
+            if cancel_event.is_set():
+                # 暂停与停止都会先写检查点，是否保留由调用方决定
+                LOG_WRITERS.flush_task(task_id)
+                save_checkpoint(checkpoint_path, simulation)
+                return {"status": "cancelled"}
+            trades = simulation.advance(chunk)
+            LOG_WRITERS.flush_due(task_id)
+            events.put(
+                (
+                    "progress",
+                    {
+                        "progress": min(simulation.cursor / total, 1.0),
+                        "trades": trades,
+                        "metrics": simulation.metrics(),
+                    },
+                )
+            )
+    finally:
+        LOG_WRITERS.close_task(task_id)
+
+    checkpoint_path.unlink(missing_ok=True)
+    metrics = simulation.metrics()
+    if metrics is None:
+        return {"status": "failed", "message": "No price data available."}
+    return {"status": "completed", "metrics": metrics}
+
+
+def run_sweep_chunk(
+    data_path: str,
+    request_batch: Sequence[Dict[str, Any]],
+) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Worker entry point for parameter sweeps: metrics only, no log files.
+
+    Requests that share strategy parameters replay one stored signal stream, so sweeping
+    execution parameters never re-evaluates the strategy.
+    """
+    arrays = load_worker_series(data_path)
+    results: List[Tuple[Optional[Dict[str, Any]], Optional[str]]] = []
+    for request_data in request_batch:
+        try:
+            request = BacktestRequest(**request_data)
+            stream = SIGNAL_STORE.stream_for(request, arrays)
+            result = simulate_signals(request, arrays, stream.signals, stream.strengths, collect_trades=False)
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as exc:
+            results.append((None, str(exc)))
+            continue
+        results.append((result.metrics, None))
+    return results
+
+
+def run_walk_forward_tile(
+    data_path: str,
+    groups: Sequence[Sequence[Dict[str, Any]]],
+    windows: Sequence[Tuple[int, int]],
+    include_equity: bool = False,
+) -> List[List[List[WindowOutcome]]]:
+    """Worker entry point for walk-forward runs.
+
+    Every request in a group shares the same strategy parameters, so the signal arrays are
+    computed once over the prefix covering all `windows` and then sliced per window instead
+    of re-warming the indicators for each one. Returns ``[group][request][window]`` outcomes.
+    """
+    stop = max(end for _, end in windows)
+    arrays = slice_arrays(load_worker_series(data_path), 0, stop)
+    results: List[List[List[WindowOutcome]]] = []
+    for group in groups:
+        try:
+            requests = [BacktestRequest(**request_data) for request_data in group]
+            stream = SIGNAL_STORE.stream_for(requests[0], arrays)
+            signals, strengths = stream.signals, stream.strengths
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as exc:
+            results.append([[(None, str(exc))] * len(windows) for _ in group])
+            continue
+
+        group_results: List[List[WindowOutcome]] = []
+        for request in requests:
+            outcomes: List[WindowOutcome] = []
+            for start, end in windows:
+                try:
+                    result = simulate_signals(
+                        request,
+                        slice_arrays(arrays, start, end),
+                        signals[start:end],
+                        strengths[start:end],
+                        collect_trades=False,
+                        include_equity=include_equity,
+                    )
+                except (ValueError, ZeroDivisionError) as exc:
+                    outcomes.append((None, str(exc)))
+                    continue
+                outcomes.append((result, None))
+            group_results.append(outcomes)
+        results.append(group_results)
+    return results
+
+
+class BacktestWorkerPool:
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._context = multiprocessing.get_context("spawn")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[SyncManager] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _ensure_started(self) -> Tuple[ProcessPoolExecutor, SyncManager]:
+        if self._manager is None:
+            self._manager = self._context.Manager()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._context)
+        return self._executor, self._manager
+
+    async def run(
+        self,
+        task_id: str,
+        request: BacktestRequest,
+        data_path: Path,
+        log_path: Path,
+        on_event: Callable[[str, Dict[str, Any]], None],
+        poll_interval: float = 0.25,
+    ) -> Dict[str, Any]:
+        """Run a backtest in the pool, forwarding worker events to `on_event`.
+
+        Cancelling the awaiting coroutine (pause/stop) signals the worker to stop at its
+        next chunk boundary; the coroutine waits for it so the checkpoint is on disk
+        before the cancellation propagates.
+        """
+        executor, manager = self._ensure_started()
+        cancel_event = manager.Event()
+        events = manager.Queue()
+        submitted = executor.submit(
+            run_backtest_job,
+            task_id,
+            request.dict(),
+            str(data_path),
+            str(log_path),
+            cancel_event,
+            events,
+        )
+        future = asyncio.wrap_future(submitted)
+        try:
+            while not future.done():
+                await asyncio.wait({future}, timeout=poll_interval)
+                for kind, payload in await asyncio.to_thread(self._drain, events):
+                    on_event(kind, payload)
+            for kind, payload in await asyncio.to_thread(self._drain, events):
+                on_event(kind, payload)
+            return future.result()
+        except asyncio.CancelledError:
+            cancel_event.set()
+            if not submitted.cancel():
+                # 等工作进程在分块边界停下并写好检查点，再把剩余事件转发出去
+                await asyncio.wait({future})
+                for kind, payload in await asyncio.to_thread(self._drain, events):
+                    on_event(kind, payload)
+            raise
+
+    async def map(
+        self,
+        fn: Callable[..., Any],
+        payloads: Sequence[Tuple[Any, ...]],
+        on_result: Optional[Callable[[int, Any], None]] = None,
+    ) -> List[Any]:
+        """Run `fn(*payload)` for every payload across the pool (or a thread when disabled)."""
+        results: List[Any] = [None] * len(payloads)
+        if not self.enabled:
+            for index, payload in enumerate(payloads):
+                results[index] = await asyncio.to_thread(fn, *payload)
+                if on_result is not None:
+                    on_result(index, results[index])
+            return results
+
+        executor, _ = self._ensure_started()
+        futures = {
+            asyncio.wrap_future(executor.submit(fn, *payload)): index
+            for index, payload in enumerate(payloads)
+        }
+        try:
+            pending = set(futures)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index = futures[future]
+                    results[index] = future.result()
+                    if on_result is not None:
+                        on_result(index, results[index])
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        return results
+
+    @staticmethod
+    def _drain(events: Any) -> List[WorkerEvent]:
+        drained: List[WorkerEvent] = []
+        while True:
+            try:
+                drained.append(events.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+BACKTEST_POOL = BacktestWorkerPool(CONFIG.backtest_workers)
@@ -0,0 +1,258 @@
+"""
+OHLC bar aggregation of tick streams, shared by strategies.
+
+`resample_bars` builds the bars of a whole series at once (cached per series in
+`BAR_CACHE`); `BarFeed` builds them tick by tick for live use. A bar covers one
+``seconds``-long bucket of epoch time and is *completed* once a tick from another
+bucket arrives, so at any tick both forms expose exactly the bars completed before it.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.config import CONFIG
+from app.services.indicators import Indicator
+from app.utils.array_cache import SizedLRUCache, array_fingerprint
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NANOSECONDS = 1_000_000_000
+
+BAR_FIELDS = ("open", "high", "low", "close")
+
+
+def epoch_ns(timestamp: datetime) -> int:
+    """Epoch nanoseconds of `timestamp`; naive values are taken as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def check_timeframe(seconds: int) -> int:
+    seconds = int(seconds)
+    if seconds <= 0:
+        raise ValueError("Bar timeframe must be a positive number of seconds.")
+    return seconds
+
+
+class Bar(NamedTuple):
+    start: int
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int
+
+
+@dataclass(slots=True)
+class BarSeries:
+    """Bars of one series; `tick_bar[i]` is the bar that tick ``i`` falls into."""
+
+    seconds: int
+    start: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    count: np.ndarray
+    tick_bar: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ("start", *BAR_FIELDS, "count", "tick_bar"))
+
+    def at_ticks(self, values: np.ndarray) -> np.ndarray:
+        """Per-bar `values` as seen at each tick: the value of the last completed bar, NaN before the first."""
+        completed = self.tick_bar - 1
+        result = np.asarray(values, dtype=np.float64)[np.maximum(completed, 0)]
+        result[completed < 0] = np.nan
+        return result
+
+
+def resample_bars(prices: np.ndarray, timestamps: np.ndarray, seconds: int) -> BarSeries:
+    """Aggregate ticks into ``seconds``-long bars; `timestamps` are epoch nanoseconds."""
+    seconds = check_timeframe(seconds)
+    prices = np.asarray(prices, dtype=np.float64)
+    buckets = np.asarray(timestamps, dtype=np.int64) // (seconds * _NANOSECONDS)
+    if len(prices) == 0:
+        empty = np.zeros(0, dtype=np.float64)
+        index = np.zeros(0, dtype=np.int64)
+        return BarSeries(seconds, index, empty, empty, empty, empty, index, index)
+    # 桶编号变化即开始新 K 线（乱序时间戳同样按变化切分，与逐点聚合一致）
+    opens = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    closes = np.concatenate((opens[1:], [len(prices)])) - 1
+    tick_bar = np.zeros(len(prices), dtype=np.int64)
+    tick_bar[opens[1:]] = 1
+    return BarSeries(
+        seconds=seconds,
+        start=buckets[opens] * (seconds * _NANOSECONDS),
+        open=prices[opens],
+        high=np.maximum.reduceat(prices, opens),
+        low=np.minimum.reduceat(prices, opens),
+        close=prices[closes],
+        count=closes - opens + 1,
+        tick_bar=np.cumsum(tick_bar),
+    )
+
+
+class BarCache(SizedLRUCache[BarSeries]):
+    """LRU cache of `resample_bars` results keyed by series fingerprint and timeframe.
+
+    Every strategy and parameter set evaluated on the same series shares one
+    aggregation per timeframe. Cached arrays are read-only.
+    """
+
+    def bars(self, prices: np.ndarray, timestamps: np.ndarray, seconds: int) -> BarSeries:
+        if not self.enabled:
+            return resample_bars(prices, timestamps, seconds)
+        key = (array_fingerprint(prices), array_fingerprint(timestamps), int(seconds))
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        series = resample_bars(prices, timestamps, seconds)
+        for name in ("start", *BAR_FIELDS, "count", "tick_bar"):
+            getattr(series, name).flags.writeable = False
+        self.put(key, series, series.nbytes)
+        return series
+
+
+class BarAggregator:
+    """Tick-by-tick form of `resample_bars` for one timeframe.
+
+    The last `history` completed bars are kept; subscribers are called with each bar
+    as it completes.
+    """
+
+    def __init__(self, seconds: int, history: int = 1) -> None:
+        self.seconds = check_timeframe(seconds)
+        self.history: Deque[Bar] = deque(maxlen=max(history, 1))
+        self._subscribers: List[Callable[[Bar], None]] = []
+        self._bucket: Optional[int] = None
+        self._open = self._high = self._low = self._close = 0.0
+        self._count = 0
+
+    @property
+    def last(self) -> Optional[Bar]:
+        """The most recently completed bar."""
+        return self.history[-1] if self.history else None
+
+    @property
+    def current(self) -> Optional[Bar]:
+        """The bar still being built, which the latest tick belongs to."""
+        if self._bucket is None:
+            return None
+        return Bar(self._bucket * self.seconds * _NANOSECONDS, self._open, self._high, self._low, self._close, self._count)
+
+    def keep(self, history: int) -> None:
+        if history > (self.history.maxlen or 0):
+            self.history = deque(self.history, maxlen=history)
+
+    def subscribe(self, callback: Callable[[Bar], None], history: int = 1) -> None:
+        self._subscribers.append(callback)
+        self.keep(history)
+
+    def update(self, price: float, timestamp_ns: int) -> Optional[Bar]:
+        """Add one tick; returns the bar it completed, if any."""
+        bucket = timestamp_ns // (self.seconds * _NANOSECONDS)
+        completed = None
+        if bucket != self._bucket:
+            if self._bucket is not None:
+                completed = self.current
+                self.history.append(completed)
+                for callback in self._subscribers:
+                    callback(completed)
+            self._bucket = bucket
+            self._open = self._high = self._low = price
+            self._count = 0
+        elif price > self._high:
+            self._high = price
+        elif price < self._low:
+            self._low = price
+        self._close = price
+        self._count += 1
+        return completed
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "bars": [list(bar) for bar in self.history],
+            "current": list(self.current) if self._bucket is not None else None,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore the bars and replay the kept history to subscribers."""
+        self.history.clear()
+        self._bucket = None
+        for values in state.get("bars", ()):
+            bar = Bar(int(values[0]), *map(float, values[1:5]), int(values[5]))
+            self.history.append(bar)
+            for callback in self._subscribers:
+                callback(bar)
+        current = state.get("current")
+        if current is not None:
+            self._bucket = int(current[0]) // (self.seconds * _NANOSECONDS)
+            self._open, self._high, self._low, self._close = map(float, current[1:5])
+            self._count = int(current[5])
+
+
+class BarFeed:
+    """The bar aggregations one strategy subscribes to, each timeframe built once.
+
+    Strategies subscribe indicators with `indicator()` and call `update()` with every
+    tick (`Strategy.update_bars` does this), then read `indicator.value` or
+    `aggregator(seconds).last` instead of keeping the raw ticks themselves.
+    """
+
+    def __init__(self) -> None:
+        self.aggregators: Dict[int, BarAggregator] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.aggregators)
+
+    def aggregator(self, seconds: int, history: int = 1) -> BarAggregator:
+        seconds = check_timeframe(seconds)
+        aggregator = self.aggregators.get(seconds)
+        if aggregator is None:
+            aggregator = self.aggregators[seconds] = BarAggregator(seconds, history)
+        else:
+            aggregator.keep(history)
+        return aggregator
+
+    def indicator(self, seconds: int, indicator: Indicator, field: str = "close", history: Optional[int] = None) -> Indicator:
+        """Feed `indicator` with one field of every completed bar; returns the indicator.
+
+        `history` bars are kept so a restored state can rebuild the indicator; it defaults
+        to the indicator's warm-up length.
+        """
+        if field not in BAR_FIELDS:
+            raise ValueError(f"Unknown bar field {field!r}.")
+        position = BAR_FIELDS.index(field) + 1
+        self.aggregator(seconds).subscribe(
+            lambda bar: indicator.update(bar[position]), history if history is not None else indicator.warmup
+        )
+        return indicator
+
+    def update(self, price: float, timestamp: datetime | int) -> None:
+        timestamp_ns = timestamp if isinstance(timestamp, int) else epoch_ns(timestamp)
+        for aggregator in self.aggregators.values():
+            aggregator.update(price, timestamp_ns)
+
+    def reset(self) -> None:
+        """Drop all bars; subscribed indicators are reset by their owner."""
+        state: Dict[str, Any] = {"bars": [], "current": None}
+        for aggregator in self.aggregators.values():
+            aggregator.set_state(state)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {str(seconds): aggregator.get_state() for seconds, aggregator in self.aggregators.items()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        for seconds, aggregator in self.aggregators.items():
+            aggregator.set_state(state.get(str(seconds), {}))
+
+
+BAR_CACHE = BarCache(CONFIG.bar_cache_max_bytes)
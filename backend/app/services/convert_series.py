@@ -0,0 +1,65 @@
+"""
+Convert stored data series between the CSV and columnar formats::
+
+    python -m app.services.convert_series --to columnar [DATA_ID ...]
+
+Without data ids every simulated series and snapshot is converted. The catalog is
+updated, and a running service picks the new files up on its next lookup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+from app.config import CONFIG
+from app.services.series_catalog import SERIES_CATALOG
+from app.services.series_store import SERIES_FORMATS, convert_series_file
+from app.utils.file_storage import COLUMNAR_SUFFIX, CSV_SUFFIX, find_series_file
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _stored_series(directories: Iterable[Path], data_ids: Sequence[str]) -> List[Path]:
+    paths: List[Path] = []
+    for directory in directories:
+        if data_ids:
+            paths.extend(path for path in (find_series_file(directory, data_id) for data_id in data_ids) if path)
+        else:
+            for suffix in (CSV_SUFFIX, COLUMNAR_SUFFIX):
+                paths.extend(sorted(directory.glob(f"data_*{suffix}")))
+    return paths
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert stored data series between storage formats.")
+    parser.add_argument("data_ids", nargs="*", help="Series to convert (default: all simulated data and snapshots)")
+    parser.add_argument("--to", dest="storage_format", choices=SERIES_FORMATS, default="columnar")
+    args = parser.parse_args(argv)
+
+    directories = [CONFIG.data_storage_path, CONFIG.data_storage_path / "snapshots"]
+    paths = _stored_series(directories, args.data_ids)
+    missing = set(args.data_ids) - {path.stem for path in paths}
+    for data_id in sorted(missing):
+        LOGGER.error("Data series %s not found.", data_id)
+    converted = 0
+    for path in paths:
+        data_id = path.stem
+        try:
+            target = convert_series_file(path, args.storage_format)
+        except (OSError, ValueError) as exc:
+            LOGGER.error("Failed to convert %s: %s", path, exc)
+            continue
+        if target != path:
+            SERIES_CATALOG.refresh(data_id, target)
+            converted += 1
+            LOGGER.info("Converted %s -> %s", path, target)
+    LOGGER.info("Converted %d of %d series to %s.", converted, len(paths), args.storage_format)
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", force=True)
+    raise SystemExit(main())
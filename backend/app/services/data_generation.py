@@ -10,7 +10,9 @@ from typing import Dict, List
 
 from app.config import CONFIG
 from app.models import DataSeriesDetail, DataSeriesInfo, SimulatedDataRequest
-from app.utils.file_storage import read_series, write_series
+from app.services.series_catalog import SERIES_CATALOG, SeriesMetadata
+from app.services.series_store import write_series_file
+from app.utils.file_storage import delete_series_file, find_series_file, read_series
 from app.utils.id_generator import generate_id
 
 
@@ -63,6 +65,7 @@ class DataRepository:
     def __init__(self, base_path: Path) -> None:
         self.base_path = base_path
         self.base_path.mkdir(parents=True, exist_ok=True)
+        SERIES_CATALOG.scan(self.base_path)
 
     def create_simulated(self, config: SimulatedDataRequest) -> DataSeriesInfo:
         data_id = generate_id("data_")
@@ -74,42 +77,39 @@ class DataRepository:
             "created_at": datetime.now(timezone.utc).isoformat(),
             "configuration": config.dict(),
         }
-        path = self.base_path / f"{data_id}.csv"
-        write_series(path, meta, rows)
+        path = write_series_file(self.base_path, data_id, meta, rows, config.storage_format)
+        return self._series_info(SERIES_CATALOG.register(data_id, path, meta, rows))
+
+    @staticmethod
+    def _series_info(entry: SeriesMetadata) -> DataSeriesInfo:
+        created_at = (
+            datetime.fromisoformat(entry.created_at)
+            if entry.created_at
+            else datetime.fromtimestamp(entry.mtime_ns / 1e9, tz=timezone.utc)
+        )
         return DataSeriesInfo(
-            data_id=data_id,
-            symbol=config.symbol,
-            created_at=datetime.fromisoformat(meta["created_at"]),
-            source="simulated",
-            path=str(path),
-            config=meta,
+            data_id=entry.data_id,
+            symbol=entry.symbol,
+            created_at=created_at,
+            source=entry.source,
+            path=entry.path,
+            config=entry.config,
+            data_points=entry.data_points,
+            start_time=entry.start_time,
+            end_time=entry.end_time,
         )
 
     def list_series(self) -> List[DataSeriesInfo]:
-        items: List[DataSeriesInfo] = []
-        for file in sorted(self.base_path.glob("data_*.csv")):
-            stored = read_series(file)
-            created_at_str = stored.config.get("created_at")
-            created_at = (
-                datetime.fromisoformat(created_at_str)
-                if isinstance(created_at_str, str)
-                else datetime.fromtimestamp(file.stat().st_mtime, tz=timezone.utc)
-            )
-            items.append(
-                DataSeriesInfo(
-                    data_id=file.stem,
-                    symbol=stored.config.get("symbol", "unknown"),
-                    created_at=created_at,
-                    source=stored.config.get("source", "unknown"),
-                    path=str(file),
-                    config=stored.config,
-                    data_points=len(stored.rows),
-                )
-            )
-        return items
+        return [self._series_info(entry) for entry in SERIES_CATALOG.in_directory(self.base_path)]
+
+    def series_path(self, data_id: str) -> Path:
+        path = find_series_file(self.base_path, data_id)
+        if path is None:
+            raise FileNotFoundError(f"Data series {data_id} not found")
+        return path
 
     def get_series(self, data_id: str) -> DataSeriesDetail:
-        path = self.base_path / f"{data_id}.csv"
+        path = self.series_path(data_id)
         stored = read_series(path)
         created_at_str = stored.config.get("created_at")
         created_at = (
@@ -128,10 +128,8 @@ class DataRepository:
         )
 
     def delete_series(self, data_id: str) -> None:
-        path = self.base_path / f"{data_id}.csv"
-        if not path.exists():
-            raise FileNotFoundError(f"Data series {data_id} not found")
-        path.unlink()
+        delete_series_file(self.series_path(data_id))
+        SERIES_CATALOG.remove(data_id)
 
 
 DATA_REPOSITORY = DataRepository(CONFIG.data_storage_path)
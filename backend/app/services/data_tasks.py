@@ -1,13 +1,11 @@
 from __future__ import annotations
 
 import asyncio
-import csv
-import json
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from app.config import CONFIG
 from app.models import (
@@ -19,9 +17,12 @@ from app.models import (
 )
 from app.services.longport_client import LONGPORT_CLIENT, MissingCredentialsError
 from app.services.quote_utils import extract_price_and_timestamp
-from app.utils.file_storage import read_series, write_series
+from app.services.series_catalog import SERIES_CATALOG
+from app.services.series_store import write_series_stream
+from app.utils.file_storage import delete_series_file, find_series_file, read_series
 from app.utils.id_generator import generate_id
 from app.utils.scheduler import SCHEDULER, TaskStatus
+from app.utils.segmented_series import SegmentedSeries
 from app.utils.trading_sessions import contains_session, get_dst_labels, resolve_sessions
 
 
@@ -41,8 +42,12 @@ class LiveDataTaskState:
     finished_at: Optional[datetime] = None
     status: TaskStatus = TaskStatus.PAUSED
     message: Optional[str] = None
-    data_file: Path = field(default_factory=Path)
+    data_dir: Path = field(default_factory=Path)
     data_id: Optional[str] = None
+    series: SegmentedSeries = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.series = SegmentedSeries(self.data_dir, self.config.max_points)
 
 
 class DataTaskManager:
@@ -57,18 +62,32 @@ class DataTaskManager:
         self._load_existing_live_tasks()
         self._load_existing_snapshots()
 
+    def _migrate_live_files(self) -> None:
+        """Move single-file live captures of older versions into their first segment."""
+        for file_path in self.live_dir.glob("task_*.csv"):
+            directory = self._task_data_dir(file_path.stem)
+            if SegmentedSeries(directory).exists():
+                # 已有分段时不覆盖，保留旧文件待人工处理
+                LOGGER.warning("Live task %s already has segments; leaving %s in place", file_path.stem, file_path)
+                continue
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                file_path.replace(SegmentedSeries(directory).segment_path(0))
+            except OSError as exc:
+                LOGGER.warning("Failed to migrate live task file %s: %s", file_path, exc)
+
     def _load_existing_live_tasks(self) -> None:
-        for file_path in sorted(self.live_dir.glob("task_*.csv")):
+        self._migrate_live_files()
+        for data_dir in sorted(path for path in self.live_dir.glob("task_*") if path.is_dir()):
             try:
-                stored = read_series(file_path)
+                config = SegmentedSeries(data_dir).read_config() or {}
             except FileNotFoundError:
                 continue
             except Exception as exc:  # noqa: BLE001
-                LOGGER.warning("Failed to read live task file %s: %s", file_path, exc)
+                LOGGER.warning("Failed to read live task data %s: %s", data_dir, exc)
                 continue
 
-            config = stored.config or {}
-            task_id = str(config.get("task_id") or file_path.stem)
+            task_id = str(config.get("task_id") or data_dir.name)
 
             try:
                 request = self._build_request_from_config(config)
@@ -104,41 +123,26 @@ class DataTaskManager:
                 finished_at=finished_at,
                 status=status,
                 message=config.get("message"),
-                data_file=file_path,
+                data_dir=data_dir,
                 data_id=config.get("data_id"),
             )
             self.tasks[task_id] = state
 
     def _load_existing_snapshots(self) -> None:
         """Load existing snapshot files from disk on service startup."""
-        for file_path in sorted(self.snapshots_dir.glob("data_*.csv")):
-            try:
-                stored = read_series(file_path)
-            except FileNotFoundError:
-                continue
-            except Exception as exc:  # noqa: BLE001
-                LOGGER.warning("Failed to read snapshot file %s: %s", file_path, exc)
-                continue
-
-            config = stored.config or {}
-            data_id = file_path.stem  # Extract data_id from filename (e.g., "data_4yhvh9vl")
+        for entry in SERIES_CATALOG.scan(self.snapshots_dir):
+            file_path = Path(entry.path)
+            config = dict(entry.config)
+            data_id = entry.data_id
             task_id = config.get("task_id")
             
             if not task_id:
                 LOGGER.warning("Snapshot file %s missing task_id, skipping", file_path)
                 continue
 
-            # Get or generate snapshot_id
-            snapshot_id = config.get("snapshot_id")
-            if not snapshot_id:
-                # Generate a new snapshot_id for old snapshots that don't have one
-                snapshot_id = generate_id("snap_")
-                # Update the file to include snapshot_id for future loads
-                try:
-                    config["snapshot_id"] = snapshot_id
-                    write_series(file_path, config, stored.rows)
-                except Exception as exc:  # noqa: BLE001
-                    LOGGER.warning("Failed to update snapshot file %s with snapshot_id: %s", file_path, exc)
+            # Old snapshots without a stored snapshot_id get one derived from the data id,
+            # which stays the same across restarts without rewriting the file
+            snapshot_id = config.get("snapshot_id") or f"snap_{data_id.removeprefix('data_')}"
 
             # Parse created_at
             created_at_str = config.get("created_at")
@@ -264,8 +268,8 @@ class DataTaskManager:
                 return info
         raise KeyError(task_id)
 
-    def _task_data_file(self, task_id: str) -> Path:
-        return self.live_dir / f"{task_id}.csv"
+    def _task_data_dir(self, task_id: str) -> Path:
+        return self.live_dir / task_id
 
     def _create_task_runner(self, state: LiveDataTaskState):
         request = state.config
@@ -275,10 +279,7 @@ class DataTaskManager:
             state.finished_at = None
             header = ["timestamp", "price"]
             session_definitions = resolve_sessions(request.session)
-            if not state.data_file.parent.exists():
-                state.data_file.parent.mkdir(parents=True, exist_ok=True)
-
-            if not state.data_file.exists() or state.data_file.stat().st_size == 0:
+            if not state.series.exists():
                 config_payload = request.dict()
                 config_payload["task_id"] = state.task_id
                 config_payload["source"] = config_payload.get("source", "longport_live")
@@ -289,16 +290,11 @@ class DataTaskManager:
                 if state.data_id:
                     config_payload["data_id"] = state.data_id
                 config_payload["status"] = state.status.value
-                with state.data_file.open("w", newline="", encoding="utf-8") as fp:
-                    fp.write(json.dumps(config_payload) + "\n")
-                    writer = csv.DictWriter(fp, fieldnames=header)
-                    writer.writeheader()
+                state.series.create(config_payload, header)
             else:
                 try:
-                    with state.data_file.open("r", encoding="utf-8") as fp:
-                        config_line = fp.readline().strip()
-                    if config_line:
-                        stored_config = json.loads(config_line)
+                    stored_config = state.series.read_config()
+                    if stored_config:
                         parsed_started = self._parse_datetime(stored_config.get("started_at"))
                         if parsed_started:
                             state.started_at = parsed_started
@@ -348,12 +344,8 @@ class DataTaskManager:
                         request.symbol, request.account_mode, request.session
                     )
                     timestamp = price_timestamp or _now()
-                    row = {"timestamp": timestamp.isoformat(), "price": price}
-                    with state.data_file.open("a", newline="", encoding="utf-8") as fp:
-                        writer = csv.DictWriter(fp, fieldnames=header)
-                        writer.writerow(row)
-                    if request.max_points is not None:
-                        self._trim_data_file(state.data_file, request.max_points)
+                    # 只追加到最新分段，超出 max_points 的旧分段在分段写满时整体删除
+                    state.series.append({"timestamp": timestamp.isoformat(), "price": price})
                     await asyncio.sleep(request.interval_seconds)
             except asyncio.CancelledError:
                 raise
@@ -373,7 +365,7 @@ class DataTaskManager:
         state = LiveDataTaskState(
             task_id=task_id,
             config=request,
-            data_file=self._task_data_file(task_id),
+            data_dir=self._task_data_dir(task_id),
         )
         state.status = TaskStatus.RUNNING
         self.tasks[task_id] = state
@@ -407,24 +399,20 @@ class DataTaskManager:
         task_id: str,
         start_index: Optional[int] = None,
         end_index: Optional[int] = None,
+        storage_format: Optional[str] = None,
     ) -> LiveDataSnapshotInfo:
         state = self.tasks[task_id]
-        if not state.data_file.exists():
+        if not state.series.exists():
             raise FileNotFoundError("No data available yet for this task.")
-        stored = read_series(state.data_file)
-        rows = stored.rows
-        if not rows:
+        total_rows = state.series.count()
+        if not total_rows:
             raise FileNotFoundError("No data rows available yet for this task.")
-        total_rows = len(rows)
         start = 0 if start_index is None else max(0, min(start_index, total_rows - 1))
         end = total_rows - 1 if end_index is None else max(0, min(end_index, total_rows - 1))
         if start > end:
             raise ValueError("Invalid snapshot range: start_index cannot be greater than end_index.")
-        sliced_rows = rows[start : end + 1]
-        if not sliced_rows:
-            raise ValueError("Snapshot range does not contain any data points.")
 
-        snapshot_config = dict(stored.config)
+        snapshot_config = dict(state.series.read_config())
         snapshot_config["snapshot_range"] = {"start_index": start, "end_index": end}
         snapshot_config["source"] = snapshot_config.get("source", "longport_live")
         snapshot_config["created_at"] = _now().isoformat()
@@ -432,8 +420,9 @@ class DataTaskManager:
         data_id = generate_id("data_")
         snapshot_id = generate_id("snap_")
         snapshot_config["snapshot_id"] = snapshot_id  # Save snapshot_id to file for persistence
-        snapshot_path = self.snapshots_dir / f"{data_id}.csv"
-        write_series(snapshot_path, snapshot_config, sliced_rows)
+        chunks = self._slice_rows(state.series.iter_rows(), start, end + 1)
+        snapshot_path = write_series_stream(self.snapshots_dir, data_id, snapshot_config, chunks, storage_format)
+        SERIES_CATALOG.refresh(data_id, snapshot_path)
 
         snapshot = LiveDataSnapshotInfo(
             snapshot_id=snapshot_id,
@@ -446,19 +435,26 @@ class DataTaskManager:
         state.data_id = data_id
         return snapshot
 
-    def _trim_data_file(self, file_path: Path, max_points: int) -> None:
-        stored = read_series(file_path)
-        if len(stored.rows) <= max_points:
-            return
-        trimmed_rows = stored.rows[-max_points:]
-        write_series(file_path, stored.config, trimmed_rows)
+    @staticmethod
+    def _slice_rows(
+        chunks: Iterable[List[Dict[str, Any]]], start: int, stop: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Rows ``start:stop`` of a chunked row stream."""
+        offset = 0
+        for rows in chunks:
+            if offset >= stop:
+                break
+            if offset + len(rows) > start:
+                yield rows[max(start - offset, 0) : stop - offset]
+            offset += len(rows)
 
     def delete_snapshot_data(self, data_id: str) -> None:
-        path = self.snapshots_dir / f"{data_id}.csv"
-        if not path.exists():
+        path = find_series_file(self.snapshots_dir, data_id)
+        if path is None:
             raise FileNotFoundError(f"Snapshot data {data_id} not found")
 
-        path.unlink()
+        delete_series_file(path)
+        SERIES_CATALOG.remove(data_id)
 
         for snapshot_id, snapshot in list(self.snapshots.items()):
             if snapshot.data_id == data_id:
@@ -470,34 +466,33 @@ class DataTaskManager:
                 state.data_id = None
     def list_snapshots(self) -> List[LiveDataSnapshotInfo]:
         result = []
+        # 一次目录查询取出全部快照的元数据，不读取数据文件
+        entries = {entry.data_id: entry for entry in SERIES_CATALOG.in_directory(self.snapshots_dir)}
         for snapshot in self.snapshots.values():
-            data_points = None
-            symbol = None
-            snapshot_path = Path(snapshot.path)
-            if snapshot_path.exists():
-                try:
-                    stored = read_series(snapshot_path)
-                    data_points = len(stored.rows)
-                    symbol = stored.config.get("symbol", "unknown")
-                except Exception:  # noqa: BLE001
-                    pass
+            entry = entries.get(snapshot.data_id)
+            data_points = entry.data_points if entry else None
+            symbol = entry.symbol if entry else None
             result.append(
                 LiveDataSnapshotInfo(
                     snapshot_id=snapshot.snapshot_id,
                     task_id=snapshot.task_id,
                     data_id=snapshot.data_id,
                     created_at=snapshot.created_at,
-                    path=snapshot.path,
+                    path=entry.path if entry else snapshot.path,
                     data_points=data_points,
                     symbol=symbol,
                 )
             )
         return result
 
+    def series_path(self, data_id: str) -> Optional[Path]:
+        """File of a stored snapshot or simulated series."""
+        return find_series_file(self.snapshots_dir, data_id) or find_series_file(CONFIG.data_storage_path, data_id)
+
     def get_data_series(self, data_id: str) -> DataSeriesDetail:
-        path = self.snapshots_dir / f"{data_id}.csv"
-        if not path.exists():
-            path = (CONFIG.data_storage_path / f"{data_id}.csv")
+        path = self.series_path(data_id)
+        if path is None:
+            raise FileNotFoundError(f"Data series {data_id} not found")
         stored = read_series(path)
         return DataSeriesDetail(
             data_id=data_id,
@@ -509,15 +504,25 @@ class DataTaskManager:
             data=stored.rows,
         )
 
+    def latest_task_for(self, symbol: str) -> Optional[str]:
+        """Most recently created live task capturing `symbol` that has data on disk."""
+        candidates = [
+            state
+            for state in self.tasks.values()
+            if state.config.symbol == symbol and state.series.exists()
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda state: state.created_at).task_id
+
     def get_task_series(self, task_id: str) -> DataSeriesDetail:
         if task_id not in self.tasks:
             raise KeyError(task_id)
         state = self.tasks[task_id]
-        path = state.data_file
-        if not path.exists():
+        if not state.series.exists():
             raise FileNotFoundError(f"Live task data for {task_id} not found.")
-        stored = read_series(path)
-        config = stored.config or {}
+        config = state.series.read_config() or {}
+        rows = [row for chunk in state.series.iter_rows() for row in chunk]
         created_at_str = config.get("created_at")
         created_at = state.created_at
         if isinstance(created_at_str, str):
@@ -525,7 +530,7 @@ class DataTaskManager:
                 created_at = datetime.fromisoformat(created_at_str)
             except ValueError:
                 created_at = state.created_at
-        data_id = config.get("data_id") or state.data_id or state.data_file.stem
+        data_id = config.get("data_id") or state.data_id or state.task_id
         symbol = config.get("symbol", state.config.symbol)
         source = config.get("source", "longport_live")
         return DataSeriesDetail(
@@ -533,9 +538,9 @@ class DataTaskManager:
             symbol=symbol,
             created_at=created_at,
             source=source,
-            path=str(path),
+            path=str(state.data_dir),
             config=config,
-            data=stored.rows,
+            data=rows,
         )
 
     def pause_task(self, task_id: str) -> LiveDataTaskInfo:
@@ -578,8 +583,7 @@ class DataTaskManager:
         SCHEDULER.remove(task_id)
         if task_id in self.tasks:
             state = self.tasks.pop(task_id)
-            if state.data_file.exists():
-                state.data_file.unlink()
+            state.series.delete()
 
 
 DATA_TASKS = DataTaskManager(CONFIG.data_storage_path)
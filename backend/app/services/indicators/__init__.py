@@ -0,0 +1,32 @@
+"""
+Streaming technical indicators shared by strategies.
+
+Every indicator offers an O(1) `update()` for tick-by-tick use and a vectorized
+`compute()` over a whole array; both paths produce the same values.
+"""
+
+from __future__ import annotations
+
+from .base import Indicator
+from .cache import INDICATOR_CACHE, IndicatorCache
+from .extrema import RollingMax, RollingMin
+from .moving_averages import EMA, SMA, WMA
+from .oscillators import MACD, RSI
+from .volatility import ATR, BollingerBands, RollingStd, ZScore
+
+__all__ = [
+    "ATR",
+    "EMA",
+    "MACD",
+    "RSI",
+    "SMA",
+    "WMA",
+    "BollingerBands",
+    "INDICATOR_CACHE",
+    "Indicator",
+    "IndicatorCache",
+    "RollingMax",
+    "RollingMin",
+    "RollingStd",
+    "ZScore",
+]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class Indicator(ABC):
+    """Base class of streaming indicators.
+
+    `update()` consumes one value and returns the current output, or None while the
+    indicator is still warming up (`warmup` values are needed for the first output).
+    `compute()` evaluates a whole array from a fresh state, with NaN in the warm-up
+    positions, and does not touch the streaming state.
+    """
+
+    indicator_id: str
+    warmup: int
+
+    def __init__(self) -> None:
+        self.value: Optional[Any] = None
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    @abstractmethod
+    def update(self, value: float) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def compute(self, values: np.ndarray) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{key}={value}" for key, value in self.parameters.items())
+        return f"{type(self).__name__}({params})"
+
+
+def check_period(period: int) -> int:
+    period = int(period)
+    if period <= 0:
+        raise ValueError("Indicator period must be positive.")
+    return period
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Any, Hashable, Tuple
+
+import numpy as np
+
+from app.config import CONFIG
+from app.services.indicators.base import Indicator
+from app.utils.array_cache import SizedLRUCache, array_fingerprint
+
+IndicatorKey = Tuple[str, str, Tuple[Tuple[str, Hashable], ...]]
+
+
+def _arrays(result: Any) -> Tuple[np.ndarray, ...]:
+    return result if isinstance(result, tuple) else (result,)
+
+
+class IndicatorCache(SizedLRUCache[Any]):
+    """LRU cache of `Indicator.compute()` results keyed by (series fingerprint, indicator, params).
+
+    Strategies evaluated on the same prices (sweeps, walk-forward tiles, repeated backtests
+    of one data series) then compute each indicator once. Cached arrays are read-only.
+    The cache lives in each process, so every backtest worker keeps its own under the
+    same budget.
+    """
+
+    def key_for(self, indicator: Indicator, values: np.ndarray) -> IndicatorKey:
+        parameters = tuple(sorted(indicator.parameters.items()))
+        return (array_fingerprint(values), indicator.indicator_id, parameters)
+
+    def compute(self, indicator: Indicator, values: np.ndarray) -> Any:
+        """`indicator.compute(values)`, served from the cache when the same series was seen before."""
+        if not self.enabled:
+            return indicator.compute(values)
+        key = self.key_for(indicator, values)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        # 在锁外计算：并发请求同一指标时可能重复计算一次，但不会互相阻塞
+        result = indicator.compute(values)
+        for array in _arrays(result):
+            array.flags.writeable = False
+        self.put(key, result, sum(array.nbytes for array in _arrays(result)))
+        return result
+
+
+INDICATOR_CACHE = IndicatorCache(CONFIG.indicator_cache_max_bytes)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.services.indicators.base import Indicator, check_period
+from app.utils.rolling import rolling_extreme
+
+
+class _RollingExtreme(Indicator):
+    maximum: bool
+
+    def __init__(self, period: int) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.warmup = self.period
+        self._count = 0
+        # 单调队列：(序号, 值)，队首始终是窗口内的极值，每个值最多进出一次
+        self._candidates: Deque[Tuple[int, float]] = deque()
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def update(self, value: float) -> Optional[float]:
+        value = float(value)
+        candidates = self._candidates
+        if self.maximum:
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= value:
+                candidates.pop()
+        candidates.append((self._count, value))
+        if candidates[0][0] <= self._count - self.period:
+            candidates.popleft()
+        self._count += 1
+        if self._count >= self.period:
+            self.value = candidates[0][1]
+        return self.value
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        return rolling_extreme(values, self.period, self.maximum)
+
+    def reset(self) -> None:
+        self._candidates.clear()
+        self._count = 0
+        self.value = None
+
+
+class RollingMax(_RollingExtreme):
+    indicator_id = "rolling_max"
+    maximum = True
+
+
+class RollingMin(_RollingExtreme):
+    indicator_id = "rolling_min"
+    maximum = False
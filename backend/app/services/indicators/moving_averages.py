@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.indicators.base import Indicator, check_period
+from app.utils.rolling import (
+    RollingWeightedWindow,
+    RollingWindow,
+    exponential_smoothing,
+    rolling_mean,
+    rolling_weighted_mean,
+    seed_mean,
+)
+
+
+class SMA(Indicator):
+    indicator_id = "sma"
+
+    def __init__(self, period: int, exact: bool = False) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.exact = bool(exact)
+        self.warmup = self.period
+        self._window = RollingWindow(self.period)
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period, "exact": self.exact}
+
+    def update(self, value: float) -> Optional[float]:
+        self._window.push(value)
+        if self._window.full:
+            self.value = self._window.mean()
+        return self.value
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        return rolling_mean(values, self.period, self.exact)
+
+    def reset(self) -> None:
+        self._window.clear()
+        self.value = None
+
+
+class WMA(Indicator):
+    """Linearly weighted moving average, weights ``1..period`` with the newest value heaviest."""
+
+    indicator_id = "wma"
+
+    def __init__(self, period: int, exact: bool = False) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.exact = bool(exact)
+        self.warmup = self.period
+        self._window = RollingWeightedWindow(self.period)
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period, "exact": self.exact}
+
+    def update(self, value: float) -> Optional[float]:
+        self._window.push(value)
+        if self._window.full:
+            self.value = self._window.weighted_mean()
+        return self.value
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        return rolling_weighted_mean(values, self.period, self.exact)
+
+    def reset(self) -> None:
+        self._window.clear()
+        self.value = None
+
+
+class EMA(Indicator):
+    """Exponential moving average seeded with the simple mean of the first `period` values.
+
+    `alpha` defaults to ``2 / (period + 1)``; Wilder smoothing uses ``1 / period``.
+    """
+
+    indicator_id = "ema"
+
+    def __init__(self, period: int, alpha: Optional[float] = None) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.alpha = float(alpha) if alpha is not None else 2.0 / (self.period + 1)
+        if not 0.0 < self.alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1].")
+        self.warmup = self.period
+        self._seed: List[float] = []
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period, "alpha": self.alpha}
+
+    def update(self, value: float) -> Optional[float]:
+        value = float(value)
+        if self.value is None:
+            self._seed.append(value)
+            if len(self._seed) == self.period:
+                self.value = seed_mean(self._seed)
+                self._seed = []
+            return self.value
+        self.value = (1.0 - self.alpha) * self.value + self.alpha * value
+        return self.value
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        result = np.full(len(values), np.nan)
+        if len(values) < self.period:
+            return result
+        seed = seed_mean(values[: self.period].tolist())
+        result[self.period - 1] = seed
+        result[self.period :] = exponential_smoothing(values[self.period :], self.alpha, seed)
+        return result
+
+    def reset(self) -> None:
+        self._seed = []
+        self.value = None
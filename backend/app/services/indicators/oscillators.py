@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.indicators.base import Indicator, check_period
+from app.services.indicators.moving_averages import EMA
+from app.utils.rolling import exponential_smoothing, seed_mean
+
+
+def _relative_strength(gain: float, loss: float) -> float:
+    total = gain + loss
+    return 100.0 * gain / total if total > 0 else 50.0
+
+
+class RSI(Indicator):
+    """Relative strength index with Wilder smoothing; needs ``period + 1`` prices."""
+
+    indicator_id = "rsi"
+
+    def __init__(self, period: int = 14) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.warmup = self.period + 1
+        self._previous: Optional[float] = None
+        self._gains: List[float] = []
+        self._losses: List[float] = []
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def update(self, value: float) -> Optional[float]:
+        value = float(value)
+        previous, self._previous = self._previous, value
+        if previous is None:
+            return self.value
+        change = value - previous
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        if self.value is None:
+            self._gains.append(gain)
+            self._losses.append(loss)
+            if len(self._gains) < self.period:
+                return self.value
+            self._avg_gain = seed_mean(self._gains)
+            self._avg_loss = seed_mean(self._losses)
+            self._gains, self._losses = [], []
+        else:
+            alpha = 1.0 / self.period
+            self._avg_gain = (1.0 - alpha) * self._avg_gain + alpha * gain
+            self._avg_loss = (1.0 - alpha) * self._avg_loss + alpha * loss
+        self.value = _relative_strength(self._avg_gain, self._avg_loss)
+        return self.value
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        result = np.full(len(values), np.nan)
+        if len(values) < self.warmup:
+            return result
+        changes = np.diff(values)
+        gains = np.where(changes > 0, changes, 0.0)
+        losses = np.where(changes < 0, -changes, 0.0)
+        alpha = 1.0 / self.period
+        gain_seed = seed_mean(gains[: self.period].tolist())
+        loss_seed = seed_mean(losses[: self.period].tolist())
+        avg_gain = np.concatenate(([gain_seed], exponential_smoothing(gains[self.period :], alpha, gain_seed)))
+        avg_loss = np.concatenate(([loss_seed], exponential_smoothing(losses[self.period :], alpha, loss_seed)))
+        total = avg_gain + avg_loss
+        result[self.period :] = np.where(total > 0, 100.0 * avg_gain / np.where(total > 0, total, 1.0), 50.0)
+        return result
+
+    def reset(self) -> None:
+        self._previous = None
+        self._gains, self._losses = [], []
+        self._avg_gain = self._avg_loss = 0.0
+        self.value = None
+
+
+class MACD(Indicator):
+    """Fast EMA minus slow EMA, with an EMA signal line; outputs (macd, signal, histogram).
+
+    All three outputs start together, once the signal line is ready (after `warmup` values).
+    """
+
+    indicator_id = "macd"
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        super().__init__()
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.warmup = max(self.fast.period, self.slow.period) + self.signal.period - 1
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"fast": self.fast.period, "slow": self.slow.period, "signal": self.signal.period}
+
+    def update(self, value: float) -> Optional[Tuple[float, float, float]]:
+        fast = self.fast.update(value)
+        slow = self.slow.update(value)
+        if fast is None or slow is None:
+            return self.value
+        line = fast - slow
+        signal = self.signal.update(line)
+        if signal is not None:
+            self.value = (line, signal, line - signal)
+        return self.value
+
+    def compute(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        line = self.fast.compute(values) - self.slow.compute(values)
+        signal = np.full(len(line), np.nan)
+        start = max(self.fast.period, self.slow.period) - 1
+        if start < len(line):
+            signal[start:] = self.signal.compute(line[start:])
+        # 与 update() 一致：信号线就绪前 MACD 线同样不输出
+        line[np.isnan(signal)] = np.nan
+        return line, signal, line - signal
+
+    def reset(self) -> None:
+        self.fast.reset()
+        self.slow.reset()
+        self.signal.reset()
+        self.value = None
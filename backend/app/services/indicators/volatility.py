@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.indicators.base import Indicator, check_period
+from app.utils.rolling import RollingMoments, exponential_smoothing, rolling_mean, rolling_variance, seed_mean
+
+
+class RollingStd(Indicator):
+    indicator_id = "rolling_std"
+
+    def __init__(self, period: int, ddof: int = 0, exact: bool = False) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.ddof = int(ddof)
+        self.exact = bool(exact)
+        if not 0 <= self.ddof < self.period:
+            raise ValueError("ddof must be in [0, period).")
+        self.warmup = self.period
+        self._window = RollingMoments(self.period)
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period, "ddof": self.ddof, "exact": self.exact}
+
+    def update(self, value: float) -> Optional[float]:
+        self._window.push(value)
+        if self._window.full:
+            self.value = math.sqrt(self._window.variance(self.ddof))
+        return self.value
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        return np.sqrt(rolling_variance(values, self.period, self.ddof, self.exact))
+
+    def reset(self) -> None:
+        self._window.clear()
+        self.value = None
+
+
+class BollingerBands(Indicator):
+    """Simple mean ± `width` population standard deviations; outputs (middle, upper, lower)."""
+
+    indicator_id = "bollinger"
+
+    def __init__(self, period: int = 20, width: float = 2.0, exact: bool = False) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.width = float(width)
+        self.exact = bool(exact)
+        self.warmup = self.period
+        self._window = RollingMoments(self.period)
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period, "width": self.width, "exact": self.exact}
+
+    def update(self, value: float) -> Optional[Tuple[float, float, float]]:
+        self._window.push(value)
+        if self._window.full:
+            middle = self._window.mean()
+            band = self.width * math.sqrt(self._window.variance())
+            self.value = (middle, middle + band, middle - band)
+        return self.value
+
+    def compute(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        middle = rolling_mean(values, self.period, self.exact)
+        band = self.width * np.sqrt(rolling_variance(values, self.period, exact=self.exact))
+        return middle, middle + band, middle - band
+
+    def reset(self) -> None:
+        self._window.clear()
+        self.value = None
+
+
+class ZScore(Indicator):
+    """Distance of the latest value from the window mean in standard deviations (0 for a flat window)."""
+
+    indicator_id = "zscore"
+
+    def __init__(self, period: int, ddof: int = 0, exact: bool = False) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.ddof = int(ddof)
+        self.exact = bool(exact)
+        if not 0 <= self.ddof < self.period:
+            raise ValueError("ddof must be in [0, period).")
+        self.warmup = self.period
+        self._window = RollingMoments(self.period)
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period, "ddof": self.ddof, "exact": self.exact}
+
+    def update(self, value: float) -> Optional[float]:
+        value = float(value)
+        self._window.push(value)
+        if self._window.full:
+            std = math.sqrt(self._window.variance(self.ddof))
+            self.value = (value - self._window.mean()) / std if std > 0 else 0.0
+        return self.value
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        std = np.sqrt(rolling_variance(values, self.period, self.ddof, self.exact))
+        deviation = values - rolling_mean(values, self.period, self.exact)
+        result = np.full(len(values), np.nan)
+        valid = ~np.isnan(std)
+        result[valid] = np.where(std[valid] > 0, deviation[valid] / np.where(std[valid] > 0, std[valid], 1.0), 0.0)
+        return result
+
+    def reset(self) -> None:
+        self._window.clear()
+        self.value = None
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    ranges = high - low
+    if len(ranges) > 1:
+        previous = close[:-1]
+        ranges[1:] = np.maximum(ranges[1:], np.maximum(np.abs(high[1:] - previous), np.abs(low[1:] - previous)))
+    return ranges
+
+
+class ATR(Indicator):
+    """Average true range with Wilder smoothing.
+
+    Pass `low` and `close` for bar data; with only one price per point (tick series) the
+    true range reduces to the absolute price change.
+    """
+
+    indicator_id = "atr"
+
+    def __init__(self, period: int = 14) -> None:
+        super().__init__()
+        self.period = check_period(period)
+        self.warmup = self.period
+        self._previous_close: Optional[float] = None
+        self._seed: List[float] = []
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def update(self, high: float, low: Optional[float] = None, close: Optional[float] = None) -> Optional[float]:
+        high = float(high)
+        low = high if low is None else float(low)
+        close = high if close is None else float(close)
+        current = high - low
+        if self._previous_close is not None:
+            current = max(current, abs(high - self._previous_close), abs(low - self._previous_close))
+        self._previous_close = close
+
+        if self.value is None:
+            self._seed.append(current)
+            if len(self._seed) == self.period:
+                self.value = seed_mean(self._seed)
+                self._seed = []
+            return self.value
+        alpha = 1.0 / self.period
+        self.value = (1.0 - alpha) * self.value + alpha * current
+        return self.value
+
+    def compute(
+        self, high: np.ndarray, low: Optional[np.ndarray] = None, close: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        high = np.asarray(high, dtype=np.float64)
+        low = high if low is None else np.asarray(low, dtype=np.float64)
+        close = high if close is None else np.asarray(close, dtype=np.float64)
+        ranges = true_range(high, low, close)
+        result = np.full(len(ranges), np.nan)
+        if len(ranges) < self.period:
+            return result
+        seed = seed_mean(ranges[: self.period].tolist())
+        result[self.period - 1] = seed
+        result[self.period :] = exponential_smoothing(ranges[self.period :], 1.0 / self.period, seed)
+        return result
+
+    def reset(self) -> None:
+        self._previous_close = None
+        self._seed = []
+        self.value = None
@@ -2,19 +2,30 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
+import os
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from app.config import CONFIG
-from app.models import QuantTaskInfo, QuantTaskRequest, SignalType, StrategySignal
+from app.models import QuantTaskInfo, QuantTaskRequest, SignalType
+from app.services.data_tasks import DATA_TASKS
 from app.services.longport_client import LONGPORT_CLIENT, MissingCredentialsError
+from app.services.series_catalog import SERIES_CATALOG
+from app.services.series_store import iter_row_arrays, tail_arrays, tail_price_arrays
 from app.services.quote_utils import extract_price_and_timestamp
-from app.services.strategies.base import STRATEGY_REGISTRY, Strategy
+from app.services.strategies.base import STRATEGY_REGISTRY, Signal, Strategy, restore_strategy
 from app.utils.id_generator import generate_id
 from app.utils.scheduler import SCHEDULER, TaskStatus
 
+LOGGER = logging.getLogger(__name__)
+
+# 运行中策略状态的保存间隔（秒）；暂停、停止或失败时总会再保存一次
+STATE_SAVE_INTERVAL = 60.0
+
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
@@ -31,6 +42,7 @@ class QuantTaskState:
     config: Dict[str, object] = field(default_factory=dict)
     message: Optional[str] = None
     log_path: Path = field(default_factory=Path)
+    state_path: Path = field(default_factory=Path)
     latest_metrics: Dict[str, float] = field(default_factory=dict)
     logs: List[Dict[str, object]] = field(default_factory=list)
     price_history: List[Dict[str, object]] = field(default_factory=list)
@@ -44,12 +56,14 @@ class QuantTradingManager:
 
     def create_task(self, request: QuantTaskRequest) -> QuantTaskInfo:
         self._ensure_credentials(request.account_mode)
+        self._ensure_warmup_source(request)
         task_id = generate_id("quant_")
         state = QuantTaskState(
             task_id=task_id,
             request=request,
             status=TaskStatus.RUNNING,
             log_path=self.log_dir / f"{task_id}.log",
+            state_path=self.log_dir / f"{task_id}.state",
         )
         self.tasks[task_id] = state
 
@@ -66,14 +80,94 @@ class QuantTradingManager:
         if creds is None:
             raise MissingCredentialsError(f"{mode.title()} account credentials are not configured.")
 
+    def _ensure_warmup_source(self, request: QuantTaskRequest) -> None:
+        if request.warmup_data_id and SERIES_CATALOG.get(request.warmup_data_id) is None:
+            raise FileNotFoundError(f"Data series {request.warmup_data_id} not found.")
+        if request.warmup_from_live and DATA_TASKS.latest_task_for(request.symbol) is None:
+            raise ValueError(f"No live capture task found for {request.symbol}.")
+
+    def _warm_up(self, strategy: Strategy, request: QuantTaskRequest) -> int:
+        """Feed the most recent stored prices to `strategy` in one batch; returns the point count."""
+        if request.warmup_data_id:
+            path = DATA_TASKS.series_path(request.warmup_data_id)
+            if path is None:
+                raise FileNotFoundError(f"Data series {request.warmup_data_id} not found.")
+            # 只保留最后 warmup_points 个数据点，不把整个序列读入内存
+            arrays = tail_price_arrays(path, request.warmup_points)
+        elif request.warmup_from_live:
+            task_id = DATA_TASKS.latest_task_for(request.symbol)
+            if task_id is None:
+                return 0
+            series = DATA_TASKS.tasks[task_id].series
+            arrays = tail_arrays(iter_row_arrays(series.iter_rows()), request.warmup_points)
+        else:
+            return 0
+        # 批量接口一次性推进策略状态，信号本身丢弃
+        strategy.generate_signals(arrays.prices, arrays.timestamps)
+        return len(arrays.prices)
+
+    def _load_strategy_state(self, state: QuantTaskState, strategy: Strategy) -> Optional[Strategy]:
+        """Strategy saved by an earlier run of this task, if it matches the current parameters."""
+        try:
+            data = state.state_path.read_bytes()
+        except OSError:
+            return None
+        try:
+            restored = restore_strategy(data, strategy.strategy_id)
+        except (KeyError, TypeError, ValueError) as exc:
+            LOGGER.warning("Ignoring unreadable strategy state %s: %s", state.state_path, exc)
+            return None
+        return restored if restored.parameters == strategy.parameters else None
+
+    @staticmethod
+    def _write_strategy_state(path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            LOGGER.warning("Failed to save strategy state %s: %s", path, exc)
+
+    def _save_strategy_state(self, state: QuantTaskState, strategy: Strategy) -> None:
+        try:
+            data = strategy.dump_state()
+        except TypeError as exc:
+            LOGGER.warning("Failed to encode strategy state %s: %s", state.state_path, exc)
+            return
+        self._write_strategy_state(state.state_path, data)
+
+    async def _save_strategy_state_async(self, state: QuantTaskState, strategy: Strategy) -> None:
+        # 状态在事件循环中编码（策略对象只在这里被修改），写文件放到线程中
+        try:
+            data = strategy.dump_state()
+        except TypeError as exc:
+            LOGGER.warning("Failed to encode strategy state %s: %s", state.state_path, exc)
+            return
+        await asyncio.to_thread(self._write_strategy_state, state.state_path, data)
+
     async def _run_quant(self, state: QuantTaskState) -> None:
         request = state.request
         strategy_cls = STRATEGY_REGISTRY.get(request.strategy_id)
         strategy: Strategy = strategy_cls(**request.strategy_params)
+        # 恢复运行时直接加载上次保存的策略状态，无需重新回放历史
+        restored = self._load_strategy_state(state, strategy)
+        if restored is not None:
+            strategy = restored
+            state.message = "Strategy state restored from the previous run."
+        else:
+            try:
+                warmed_up = await asyncio.to_thread(self._warm_up, strategy, request)
+            except (FileNotFoundError, KeyError, ValueError) as exc:
+                state.message = f"Warm-up failed: {exc}"
+                state.status = TaskStatus.FAILED
+                return
+            if warmed_up:
+                state.message = f"Strategy warmed up with {warmed_up} stored points."
         cash = await self._fetch_available_cash(request.account_mode)
         position = await self._fetch_position(request.account_mode, request.symbol)
         last_price: Optional[float] = None
         realized_pnl = 0.0
+        last_saved = time.monotonic()
 
         with state.log_path.open("w", encoding="utf-8") as fp:
             fp.write(json.dumps(request.dict()) + "\n")
@@ -87,7 +181,10 @@ class QuantTradingManager:
                 timestamp_dt = price_timestamp or _now()
                 timestamp = timestamp_dt.isoformat()
                 last_price = price
-                signal: StrategySignal = strategy.generate_signal(price, _now())
+                signal: Signal = strategy.generate_signal(price, _now())
+                if time.monotonic() - last_saved >= STATE_SAVE_INTERVAL:
+                    await self._save_strategy_state_async(state, strategy)
+                    last_saved = time.monotonic()
 
                 action = "hold"
                 quantity = 0.0
@@ -154,6 +251,8 @@ class QuantTradingManager:
             state.message = str(exc)
             state.status = TaskStatus.FAILED
         finally:
+            # 暂停（任务被取消）、停止或失败时保存最新状态，恢复运行时从这里继续
+            self._save_strategy_state(state, strategy)
             state.status = TaskStatus.STOPPED if state.status == TaskStatus.RUNNING else state.status
 
     async def _fetch_available_cash(self, mode: str) -> float:
@@ -283,6 +382,8 @@ class QuantTradingManager:
         state = self.tasks.pop(task_id, None)
         if state and state.log_path.exists():
             state.log_path.unlink()
+        if state:
+            state.state_path.unlink(missing_ok=True)
 
 
 QUANT_MANAGER = QuantTradingManager(CONFIG.log_storage_path / "quant")
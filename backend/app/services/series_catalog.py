@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import astuple, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.config import CONFIG
+from app.utils.file_storage import (
+    COLUMNAR_SUFFIX,
+    CSV_SUFFIX,
+    find_series_file,
+    is_columnar,
+    iter_series_rows,
+    read_columnar_series,
+    read_series_config,
+    series_checksum,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class SeriesMetadata:
+    data_id: str
+    path: str
+    symbol: str
+    source: str
+    data_points: int
+    start_time: Optional[str]
+    end_time: Optional[str]
+    created_at: Optional[str]
+    size: int
+    mtime_ns: int
+    checksum: str
+    config: Dict[str, Any] = field(default_factory=dict)
+
+
+_COLUMNS = ", ".join(item.name for item in fields(SeriesMetadata))
+
+
+class SeriesCatalog:
+    """Metadata of every stored data series, so callers need not parse the series files.
+
+    Entries live in a SQLite table indexed by directory, so listing a directory is one
+    query whatever the data volume. The writers (`DataRepository`, `DataTaskManager`)
+    register a series right after writing it; single lookups validate the entry against
+    the file's size and mtime, and `scan` picks up files changed outside the service.
+    Registering does not hash the file: `checksum` reads it once per file version, the
+    first time a cache key needs it, so writes and live snapshots stay proportional to
+    the rows they add.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS series (
+                    data_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    data_points INTEGER NOT NULL,
+                    start_time TEXT,
+                    end_time TEXT,
+                    created_at TEXT,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    checksum TEXT NOT NULL,
+                    config TEXT NOT NULL,
+                    directory TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS series_directory ON series (directory, data_id)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _entry(row: Sequence[Any]) -> SeriesMetadata:
+        *values, config = row
+        return SeriesMetadata(*values, config=json.loads(config))
+
+    def _select(self, where: str, params: Sequence[Any]) -> List[SeriesMetadata]:
+        with self._lock:
+            rows = self._connection().execute(f"SELECT {_COLUMNS} FROM series WHERE {where}", params).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def register(
+        self,
+        data_id: str,
+        path: Path,
+        config: Dict[str, Any],
+        rows: Sequence[Dict[str, Any]],
+        commit: bool = True,
+    ) -> SeriesMetadata:
+        """Record a series that was just written with `config` and `rows`."""
+        return self._register(
+            data_id,
+            path,
+            config,
+            len(rows),
+            rows[0].get("timestamp") if rows else None,
+            rows[-1].get("timestamp") if rows else None,
+            commit,
+        )
+
+    def _register(
+        self,
+        data_id: str,
+        path: Path,
+        config: Dict[str, Any],
+        data_points: int,
+        start_time: Optional[str],
+        end_time: Optional[str],
+        commit: bool,
+    ) -> SeriesMetadata:
+        stat = path.stat()
+        entry = SeriesMetadata(
+            data_id=data_id,
+            path=str(path),
+            symbol=config.get("symbol", "unknown"),
+            source=config.get("source", "unknown"),
+            data_points=data_points,
+            start_time=start_time,
+            end_time=end_time,
+            created_at=config.get("created_at") if isinstance(config.get("created_at"), str) else None,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            # 校验和在首次需要时计算
+            checksum="",
+            config=dict(config),
+        )
+        *values, config_value = astuple(entry)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                f"INSERT OR REPLACE INTO series ({_COLUMNS}, directory) VALUES ({', '.join('?' * 13)})",
+                (*values, json.dumps(config_value), str(path.parent)),
+            )
+            if commit:
+                conn.commit()
+        return entry
+
+    def refresh(self, data_id: str, path: Path, commit: bool = True) -> SeriesMetadata:
+        if is_columnar(path):
+            series = read_columnar_series(path)
+            labels = series.labels
+            first, last = (labels[0], labels[-1]) if len(labels) else (None, None)
+            return self._register(data_id, path, series.config, len(labels), first, last, commit)
+        # CSV 分块读取，只保留行数与首尾时间戳
+        data_points = 0
+        first = last = None
+        for rows in iter_series_rows(path):
+            if first is None:
+                first = rows[0].get("timestamp")
+            last = rows[-1].get("timestamp")
+            data_points += len(rows)
+        return self._register(data_id, path, read_series_config(path), data_points, first, last, commit)
+
+    def remove(self, data_id: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM series WHERE data_id = ?", (data_id,))
+            conn.commit()
+
+    def _is_current(self, entry: SeriesMetadata, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == entry.size and stat.st_mtime_ns == entry.mtime_ns
+
+    def get(self, data_id: str) -> Optional[SeriesMetadata]:
+        found = self._select("data_id = ?", (data_id,))
+        if not found:
+            return None
+        entry = found[0]
+        path = Path(entry.path)
+        if self._is_current(entry, path):
+            return entry
+        if not path.exists():
+            # 序列可能已转换为另一种存储格式
+            path = find_series_file(path.parent, data_id)
+            if path is None:
+                self.remove(data_id)
+                return None
+        try:
+            return self.refresh(data_id, path)
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Failed to refresh series %s: %s", data_id, exc)
+            return entry
+
+    def checksum(self, data_id: str) -> Optional[str]:
+        """Checksum of the current file of `data_id`, or None when the series is unknown."""
+        entry = self.get(data_id)
+        if entry is None:
+            return None
+        if entry.checksum:
+            return entry.checksum
+        try:
+            digest = series_checksum(Path(entry.path))
+        except OSError as exc:
+            LOGGER.warning("Failed to hash series %s: %s", data_id, exc)
+            return None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE series SET checksum = ? WHERE data_id = ? AND size = ? AND mtime_ns = ?",
+                (digest, data_id, entry.size, entry.mtime_ns),
+            )
+            conn.commit()
+        return digest
+
+    def scan(self, directory: Path, prefix: str = "data_") -> List[SeriesMetadata]:
+        """Synchronise the entries stored in `directory`; only new or changed files are parsed.
+
+        Called at startup; listings use `in_directory`, which does not touch the files.
+        """
+        entries = {entry.data_id: entry for entry in self.in_directory(directory)}
+        seen: set[str] = set()
+        files = [path for suffix in (CSV_SUFFIX, COLUMNAR_SUFFIX) for path in directory.glob(f"{prefix}*{suffix}")]
+        for file_path in sorted(files):
+            data_id = file_path.stem
+            seen.add(data_id)
+            entry = entries.get(data_id)
+            if entry is not None and entry.path == str(file_path) and self._is_current(entry, file_path):
+                continue
+            try:
+                self.refresh(data_id, file_path, commit=False)
+            except Exception as exc:  # noqa: BLE001
+                LOGGER.warning("Failed to read series file %s: %s", file_path, exc)
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "DELETE FROM series WHERE data_id = ?", [(data_id,) for data_id in entries if data_id not in seen]
+            )
+            conn.commit()
+        return self.in_directory(directory)
+
+    def in_directory(self, directory: Path) -> List[SeriesMetadata]:
+        return self._select("directory = ? ORDER BY data_id", (str(directory),))
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+SERIES_CATALOG = SeriesCatalog(CONFIG.data_storage_path / "catalog.sqlite3")
@@ -0,0 +1,177 @@
+"""
+Storage formats of data series.
+
+Series are stored either as the JSON-header CSV (`write_series`) or in the columnar
+format (`write_columnar_series`), chosen per series; readers accept both. Stored
+series are converted between the formats with `app.services.convert_series`.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import CONFIG
+from app.services.backtest_engine import PriceArrays, load_price_arrays, slice_arrays
+from app.utils.file_storage import (
+    COLUMNAR_SUFFIX,
+    CSV_SUFFIX,
+    NAIVE_OFFSET,
+    SERIES_CHUNK_SIZE,
+    delete_series_file,
+    is_columnar,
+    iter_series_rows,
+    read_columnar_series,
+    read_series_config,
+    write_columnar_series,
+    write_series_chunks,
+)
+
+SERIES_FORMATS = ("csv", "columnar")
+
+
+def series_file_path(directory: Path, data_id: str, storage_format: Optional[str] = None) -> Path:
+    storage_format = storage_format or CONFIG.series_format
+    if storage_format not in SERIES_FORMATS:
+        raise ValueError(f"Unknown series format {storage_format!r}.")
+    suffix = COLUMNAR_SUFFIX if storage_format == "columnar" else CSV_SUFFIX
+    return directory / f"{data_id}{suffix}"
+
+
+def _utc_offset(label: str) -> int:
+    offset = datetime.fromisoformat(label).utcoffset()
+    return NAIVE_OFFSET if offset is None else int(offset.total_seconds())
+
+
+def write_series_file(
+    directory: Path,
+    data_id: str,
+    config: Dict[str, Any],
+    rows: Sequence[Dict[str, Any]],
+    storage_format: Optional[str] = None,
+) -> Path:
+    """Store `rows` in the requested format (default `CONFIG.series_format`); returns the file path.
+
+    The columnar format keeps only rows with a valid timestamp and a positive price,
+    the same rows backtests use.
+    """
+    return write_series_stream(directory, data_id, config, [rows], storage_format)
+
+
+def write_series_stream(
+    directory: Path,
+    data_id: str,
+    config: Dict[str, Any],
+    chunks: Iterable[Sequence[Dict[str, Any]]],
+    storage_format: Optional[str] = None,
+) -> Path:
+    """Like `write_series_file`, converting the rows one chunk at a time."""
+    path = series_file_path(directory, data_id, storage_format)
+    if not is_columnar(path):
+        write_series_chunks(path, config, chunks)
+        return path
+    # 同一序列的时区通常相同，按时区后缀缓存解析结果
+    offsets: Dict[str, int] = {}
+    parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    for rows in chunks:
+        arrays = load_price_arrays(rows)
+        utc_offsets = np.empty(len(arrays.labels), dtype=np.int32)
+        for index, label in enumerate(arrays.labels):
+            suffix = label[19:].lstrip(".0123456789")
+            offset = offsets.get(suffix)
+            if offset is None:
+                offset = offsets[suffix] = _utc_offset(label)
+            utc_offsets[index] = offset
+        parts.append((arrays.timestamps, arrays.prices, utc_offsets))
+    timestamps, prices, utc_offsets = (
+        (np.concatenate(column) for column in zip(*parts))
+        if parts
+        else (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int32))
+    )
+    write_columnar_series(path, config, timestamps, prices, utc_offsets)
+    return path
+
+
+def iter_series(path: Path, chunk_size: int = SERIES_CHUNK_SIZE, start: int = 0) -> Iterator[PriceArrays]:
+    """Typed chunks of a stored series, skipping the first `start` points.
+
+    Points are the rows backtests use (valid timestamp, positive price). Columnar files
+    yield views of the mapped columns; CSV files are parsed one chunk at a time, so
+    memory use does not grow with the series length.
+    """
+    if is_columnar(path):
+        arrays = read_price_arrays(path)
+        for offset in range(start, len(arrays.prices), chunk_size):
+            yield slice_arrays(arrays, offset, offset + chunk_size)
+        return
+    yield from iter_row_arrays(iter_series_rows(path, chunk_size), start)
+
+
+def iter_row_arrays(chunks: Iterable[Sequence[Dict[str, Any]]], start: int = 0) -> Iterator[PriceArrays]:
+    """Parse chunks of rows into typed chunks, skipping the first `start` points."""
+    skip = start
+    for rows in chunks:
+        arrays = load_price_arrays(rows)
+        if skip:
+            dropped = min(skip, len(arrays.prices))
+            skip -= dropped
+            arrays = slice_arrays(arrays, dropped, len(arrays.prices))
+        if len(arrays.prices):
+            yield arrays
+
+
+def read_price_arrays(path: Path) -> PriceArrays:
+    """Typed arrays of a stored series; columnar files are read without parsing any text."""
+    if is_columnar(path):
+        series = read_columnar_series(path)
+        return PriceArrays(timestamps=series.timestamps, prices=series.prices, labels=series.labels)
+    return _concatenate(list(iter_series(path)))
+
+
+def tail_price_arrays(path: Path, points: int) -> PriceArrays:
+    """The last `points` points of a stored series, read chunk by chunk."""
+    if is_columnar(path):
+        arrays = read_price_arrays(path)
+        return slice_arrays(arrays, max(len(arrays.prices) - points, 0), len(arrays.prices))
+    return tail_arrays(iter_series(path), points)
+
+
+def tail_arrays(chunks: Iterable[PriceArrays], points: int) -> PriceArrays:
+    """The last `points` points of a stream of typed chunks, keeping only the chunks needed."""
+    kept_chunks: Deque[PriceArrays] = deque()
+    kept = 0
+    for chunk in chunks:
+        kept_chunks.append(chunk)
+        kept += len(chunk.prices)
+        while kept - len(kept_chunks[0].prices) >= points:
+            kept -= len(kept_chunks.popleft().prices)
+    arrays = _concatenate(list(kept_chunks))
+    return slice_arrays(arrays, max(len(arrays.prices) - points, 0), len(arrays.prices))
+
+
+def _concatenate(chunks: Sequence[PriceArrays]) -> PriceArrays:
+    if not chunks:
+        return PriceArrays(timestamps=np.empty(0, dtype=np.int64), prices=np.empty(0, dtype=np.float64), labels=[])
+    labels: List[str] = []
+    for chunk in chunks:
+        labels.extend(chunk.labels)
+    return PriceArrays(
+        timestamps=np.concatenate([chunk.timestamps for chunk in chunks]),
+        prices=np.concatenate([chunk.prices for chunk in chunks]),
+        labels=labels,
+    )
+
+
+def convert_series_file(path: Path, storage_format: str) -> Path:
+    """Rewrite one stored series in `storage_format` and remove the old file; returns the new path."""
+    data_id = path.stem
+    target = series_file_path(path.parent, data_id, storage_format)
+    if target == path:
+        return path
+    write_series_stream(path.parent, data_id, read_series_config(path), iter_series_rows(path), storage_format)
+    delete_series_file(path)
+    return target
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Hashable, Tuple
+
+import numpy as np
+
+from app.config import CONFIG
+from app.models import BacktestRequest
+from app.services.backtest_engine import PriceArrays, generate_signal_arrays
+from app.services.strategies import STRATEGY_REGISTRY
+from app.utils.array_cache import SizedLRUCache, array_fingerprint
+
+SignalKey = Tuple[str, str, Tuple[Tuple[str, Hashable], ...], str, str]
+
+
+@dataclass(slots=True)
+class SignalStream:
+    """Per-point strategy output before signal-frequency gating and execution."""
+
+    timestamps: np.ndarray  # int64 epoch nanoseconds
+    signals: np.ndarray  # int8 signal codes
+    strengths: np.ndarray  # float64
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.signals.nbytes + self.strengths.nbytes
+
+
+class SignalStore(SizedLRUCache[SignalStream]):
+    """Stage one of the backtest pipeline: signal streams per (strategy, params, data).
+
+    Execution settings (capital, commission, lot size, position limits, signal frequency)
+    only matter in stage two, `simulate_signals`, so runs that differ only in those
+    replay one stored stream instead of evaluating the strategy again. Streams are
+    computed from a fresh strategy instance and kept in memory per process.
+    """
+
+    def key_for(self, request: BacktestRequest, arrays: PriceArrays) -> SignalKey:
+        strategy = STRATEGY_REGISTRY.get(request.strategy_id)(**request.strategy_params)
+        parameters = tuple(sorted(strategy.parameters.items()))
+        return (request.strategy_id, strategy.fingerprint, parameters, array_fingerprint(arrays.prices), array_fingerprint(arrays.timestamps))
+
+    def stream_for(self, request: BacktestRequest, arrays: PriceArrays) -> SignalStream:
+        if not self.enabled:
+            return self._compute(request, arrays)
+        key = self.key_for(request, arrays)
+        stream = self.get(key)
+        if stream is None:
+            stream = self._compute(request, arrays)
+            self.put(key, stream, stream.nbytes)
+        return stream
+
+    @staticmethod
+    def _compute(request: BacktestRequest, arrays: PriceArrays) -> SignalStream:
+        strategy = STRATEGY_REGISTRY.get(request.strategy_id)(**request.strategy_params)
+        signals, strengths = generate_signal_arrays(strategy, arrays)
+        signals.flags.writeable = False
+        strengths.flags.writeable = False
+        return SignalStream(timestamps=arrays.timestamps, signals=signals, strengths=strengths)
+
+
+SIGNAL_STORE = SignalStore(CONFIG.signal_store_max_bytes)
@@ -1,5 +1,3 @@
-from __future__ import annotations
-
 """
 Strategy implementations and registry helpers.
 
@@ -7,9 +5,23 @@ Importing this package ensures all built-in strategies register themselves
 with the shared `STRATEGY_REGISTRY`.
 """
 
-from .base import STRATEGY_REGISTRY, Strategy
+from __future__ import annotations
+
+from .base import STRATEGY_REGISTRY, Signal, Strategy, restore_strategy
 from . import moving_average  # noqa: F401  # Ensure registration side-effects
+from .dsl import RuleSyntaxError, compile_rules
+from .rule_based import RULE_STRATEGIES, RuleStrategy, build_rule_strategy
 
-__all__ = ["STRATEGY_REGISTRY", "Strategy"]
+__all__ = [
+    "RULE_STRATEGIES",
+    "STRATEGY_REGISTRY",
+    "RuleStrategy",
+    "RuleSyntaxError",
+    "Signal",
+    "Strategy",
+    "build_rule_strategy",
+    "compile_rules",
+    "restore_strategy",
+]
 
 
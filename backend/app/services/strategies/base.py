@@ -3,16 +3,52 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from collections import deque
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Deque, Dict, List, Type
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, Type
+
+import numpy as np
 
 from app.models import SignalType, StrategyMetadata, StrategyParameter, StrategySignal
+from app.services.bars import BarFeed
+from app.utils.state_codec import decode_state, encode_state
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# 批量信号接口使用的信号编码
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+SIGNAL_CODES: Dict[SignalType, int] = {
+    SignalType.HOLD: SIGNAL_HOLD,
+    SignalType.BUY: SIGNAL_BUY,
+    SignalType.SELL: SIGNAL_SELL,
+}
+SIGNAL_TYPES: Dict[int, SignalType] = {code: signal for signal, code in SIGNAL_CODES.items()}
+
+
+class Signal(NamedTuple):
+    """Per-tick strategy output used inside the engines.
+
+    A plain tuple with no validation, so producing one per tick is cheap; convert it
+    with `to_model()` where it crosses an API boundary.
+    """
+
+    timestamp: datetime
+    signal: SignalType
+    strength: float
+    price: Optional[float] = None
+
+    def to_model(self) -> StrategySignal:
+        return StrategySignal(timestamp=self.timestamp, signal=self.signal, strength=self.strength, price=self.price)
 
 
 class Strategy(ABC):
     strategy_id: str
     name: str
     description: str
+    # 策略逻辑的版本标识，参与结果缓存的键；运行时定义的策略在逻辑变化时会改变它
+    fingerprint: str = ""
 
     def __init__(self, **parameters: Any) -> None:
         self.parameters = self.get_default_parameters()
@@ -20,6 +56,8 @@ class Strategy(ABC):
             if key in self.parameters:
                 self.parameters[key] = value
         self._history: Deque[float] = deque()
+        # 多周期 K 线聚合：策略在 __init__ 中通过 self.bars.indicator() 订阅
+        self.bars = BarFeed()
 
     @classmethod
     @abstractmethod
@@ -31,6 +69,12 @@ class Strategy(ABC):
 
     def reset(self) -> None:
         self._history.clear()
+        self.bars.reset()
+
+    def update_bars(self, price: float, timestamp: datetime) -> None:
+        """Feed one tick to the subscribed bar timeframes; call it at the top of `generate_signal`."""
+        if self.bars:
+            self.bars.update(price, timestamp)
 
     def record_price(self, price: float, window: int | None = None) -> None:
         self._history.append(price)
@@ -39,9 +83,47 @@ class Strategy(ABC):
                 self._history.popleft()
 
     @abstractmethod
-    def generate_signal(self, price: float, timestamp: datetime) -> StrategySignal:
+    def generate_signal(self, price: float, timestamp: datetime) -> Signal:
         raise NotImplementedError
 
+    def generate_signals(self, prices: np.ndarray, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Signals for a whole series: parallel arrays of signal codes (int8) and strengths.
+
+        `timestamps` are epoch nanoseconds. The default feeds every point through
+        `generate_signal`, leaving the strategy in the same state as tick-by-tick calls;
+        strategies with a vectorized formulation override it.
+        """
+        signals = np.zeros(len(prices), dtype=np.int8)
+        strengths = np.zeros(len(prices), dtype=np.float64)
+        for index, (price, nanoseconds) in enumerate(zip(prices.tolist(), timestamps.tolist())):
+            timestamp = _EPOCH + timedelta(microseconds=nanoseconds // 1000)
+            signal = self.generate_signal(price, timestamp)
+            signals[index] = SIGNAL_CODES[signal.signal]
+            strengths[index] = signal.strength
+        return signals, strengths
+
+    def get_state(self) -> Dict[str, Any]:
+        """Internal state needed to continue from the current point; see `set_state`.
+
+        Values must be encodable by `encode_state` (numbers, strings, lists, dicts).
+        Strategies keeping state outside `_history` and `bars` override both methods.
+        """
+        return {"history": list(self._history), "bars": self.bars.get_state()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._history = deque(state.get("history", ()))
+        self.bars.set_state(state.get("bars", {}))
+
+    def log_state(self) -> str:
+        """Short state summary written to the signal log; empty by default."""
+        return ""
+
+    def dump_state(self) -> bytes:
+        """Strategy identity, parameters and state in the binary format read by `restore_strategy`."""
+        return encode_state(
+            {"strategy_id": self.strategy_id, "parameters": self.parameters, "state": self.get_state()}
+        )
+
     @classmethod
     def metadata(cls) -> StrategyMetadata:
         return StrategyMetadata(
@@ -55,14 +137,34 @@ class Strategy(ABC):
 class StrategyRegistry:
     def __init__(self) -> None:
         self._strategies: Dict[str, Type[Strategy]] = {}
+        self._loaders: List[Callable[[bool], None]] = []
 
     def register(self, strategy_cls: Type[Strategy]) -> None:
         self._strategies[strategy_cls.strategy_id] = strategy_cls
 
+    def unregister(self, strategy_id: str) -> None:
+        self._strategies.pop(strategy_id, None)
+
+    def add_loader(self, loader: Callable[[bool], None]) -> None:
+        """Call `loader(force)` before every lookup, e.g. to pick up strategies defined in another process.
+
+        Loaders may skip their check when it ran recently; a lookup that misses calls them
+        again with ``force=True``.
+        """
+        self._loaders.append(loader)
+
+    def _load(self, force: bool = False) -> None:
+        for loader in self._loaders:
+            loader(force)
+
     def list(self) -> List[StrategyMetadata]:
+        self._load()
         return [cls.metadata() for cls in self._strategies.values()]
 
     def get(self, strategy_id: str) -> Type[Strategy]:
+        self._load()
+        if strategy_id not in self._strategies:
+            self._load(force=True)
         if strategy_id not in self._strategies:
             raise KeyError(f"Strategy {strategy_id} is not registered.")
         return self._strategies[strategy_id]
@@ -70,3 +172,16 @@ class StrategyRegistry:
 
 STRATEGY_REGISTRY = StrategyRegistry()
 
+
+def restore_strategy(data: bytes, strategy_id: Optional[str] = None) -> Strategy:
+    """Rebuild a strategy saved with `Strategy.dump_state`, without replaying its history.
+
+    When `strategy_id` is given, a state saved by a different strategy is rejected.
+    """
+    payload = decode_state(data)
+    if strategy_id is not None and payload.get("strategy_id") != strategy_id:
+        raise ValueError(f"Saved state belongs to strategy {payload.get('strategy_id')}, not {strategy_id}.")
+    strategy = STRATEGY_REGISTRY.get(payload["strategy_id"])(**payload.get("parameters", {}))
+    strategy.set_state(payload.get("state", {}))
+    return strategy
+
@@ -0,0 +1,727 @@
+"""
+Rule DSL for signal strategies.
+
+    buy when sma(5) crosses_above sma(20) and rsi(14) < 70
+    sell when sma(5) crosses_below sma(20) or rsi(14) > overbought=80
+
+One rule per line (or separated by ``;``; ``#`` starts a comment): ``buy when <condition>``
+or ``sell when <condition>``. Conditions combine comparisons (``< <= > >= == !=``,
+``crosses_above``, ``crosses_below``) with ``and``/``or``/``not``; operands are ``price``,
+numbers, indicator calls and ``+ - * /``. Numbers passed to indicators become strategy
+parameters named ``<function>_<argument>``; any number can instead be written as
+``name=value`` to choose the parameter name (the same name may be reused).
+
+Appending ``@<timeframe>`` (``30s``, ``5m``, ``1h``, ``1d`` or plain seconds) evaluates an
+indicator on bar closes of that timeframe, e.g. ``price > sma(50)@1h``; ``open@1h``,
+``high@1h``, ``low@1h`` and ``close@1h`` read the last completed bar. Bar values only change
+when a bar completes, so they never look ahead.
+
+A compiled `RuleProgram` evaluates a whole price array with NumPy (`evaluate`) or one
+price at a time through a `RuleEvaluator`; both produce the same conditions.
+"""
+
+from __future__ import annotations
+
+import operator
+import re
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.models import StrategyParameter
+from app.services.bars import BAR_CACHE, BAR_FIELDS, BarAggregator, BarFeed, BarSeries
+from app.services.indicators import (
+    EMA,
+    INDICATOR_CACHE,
+    MACD,
+    RSI,
+    SMA,
+    WMA,
+    BollingerBands,
+    Indicator,
+    RollingMax,
+    RollingMin,
+    RollingStd,
+    ZScore,
+)
+
+_NAN = float("nan")
+# 指数平滑类指标的历史影响按此倍数的 warmup 截断，用于估算恢复状态所需的价格数
+_EXPONENTIAL_MEMORY = 10
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class _Function:
+    factory: Callable[..., Indicator]
+    # (参数名, 类型, 默认值)；默认值为 None 表示必须提供
+    arguments: Tuple[Tuple[str, str, Optional[float]], ...]
+    output: Optional[int] = None
+    # 多输出指标的各个函数共用参数名前缀，例如 macd() 与 macd_signal() 共用 macd_fast
+    family: Optional[str] = None
+
+
+_PERIOD = (("period", "int", None),)
+_MACD = (("fast", "int", 12), ("slow", "int", 26), ("signal", "int", 9))
+_BANDS = (("period", "int", 20), ("width", "float", 2.0))
+_FUNCTIONS: Dict[str, _Function] = {
+    "sma": _Function(SMA, _PERIOD),
+    "ema": _Function(EMA, _PERIOD),
+    "wma": _Function(WMA, _PERIOD),
+    "rsi": _Function(RSI, (("period", "int", 14),)),
+    "std": _Function(RollingStd, _PERIOD),
+    "zscore": _Function(ZScore, _PERIOD),
+    "highest": _Function(RollingMax, _PERIOD),
+    "lowest": _Function(RollingMin, _PERIOD),
+    "macd": _Function(MACD, _MACD, output=0, family="macd"),
+    "macd_signal": _Function(MACD, _MACD, output=1, family="macd"),
+    "macd_hist": _Function(MACD, _MACD, output=2, family="macd"),
+    "bb_middle": _Function(BollingerBands, _BANDS, output=0, family="bb"),
+    "bb_upper": _Function(BollingerBands, _BANDS, output=1, family="bb"),
+    "bb_lower": _Function(BollingerBands, _BANDS, output=2, family="bb"),
+}
+
+_KEYWORDS = {"and", "or", "not", "buy", "sell", "when", "price", "crosses_above", "crosses_below", *BAR_FIELDS}
+_TIME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>\d+\.?\d*|\.\d+)|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<op><=|>=|==|!=|[-+*/<>(),=@]))"
+)
+
+
+class _VectorEnv:
+    __slots__ = ("size", "prices", "outputs", "bars", "parameters")
+
+    def __init__(
+        self,
+        prices: np.ndarray,
+        outputs: List[Tuple[np.ndarray, ...]],
+        bars: Dict[int, BarSeries],
+        parameters: Dict[str, Any],
+    ) -> None:
+        self.size = len(prices)
+        self.prices = prices
+        self.outputs = outputs
+        self.bars = bars
+        self.parameters = parameters
+
+
+class _ScalarEnv:
+    __slots__ = ("price", "values", "previous", "bars", "parameters")
+
+    def __init__(self, slots: int, crosses: int, bars: Dict[int, BarAggregator], parameters: Dict[str, Any]) -> None:
+        self.price = _NAN
+        self.values: List[Tuple[float, ...]] = [()] * slots
+        self.previous: List[Optional[Tuple[float, float]]] = [None] * crosses
+        self.bars = bars
+        self.parameters = parameters
+
+
+class _Node:
+    boolean = False
+
+    def vector(self, env: _VectorEnv) -> Any:
+        raise NotImplementedError
+
+    def scalar(self, env: _ScalarEnv) -> Any:
+        raise NotImplementedError
+
+
+class _Const(_Node):
+    def __init__(self, value: float) -> None:
+        self.value = value
+
+    def vector(self, env: _VectorEnv) -> float:
+        return self.value
+
+    def scalar(self, env: _ScalarEnv) -> float:
+        return self.value
+
+
+class _Param(_Node):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def vector(self, env: _VectorEnv) -> float:
+        return float(env.parameters[self.name])
+
+    def scalar(self, env: _ScalarEnv) -> float:
+        return float(env.parameters[self.name])
+
+
+class _Price(_Node):
+    def vector(self, env: _VectorEnv) -> np.ndarray:
+        return env.prices
+
+    def scalar(self, env: _ScalarEnv) -> float:
+        return env.price
+
+
+class _BarField(_Node):
+    def __init__(self, timeframe: int, field: str) -> None:
+        self.timeframe = timeframe
+        self.field = field
+        self.position = BAR_FIELDS.index(field) + 1
+
+    def vector(self, env: _VectorEnv) -> np.ndarray:
+        bars = env.bars[self.timeframe]
+        return bars.at_ticks(getattr(bars, self.field))
+
+    def scalar(self, env: _ScalarEnv) -> float:
+        last = env.bars[self.timeframe].last
+        return _NAN if last is None else last[self.position]
+
+
+class _IndicatorValue(_Node):
+    def __init__(self, slot: int, output: int) -> None:
+        self.slot = slot
+        self.output = output
+
+    def vector(self, env: _VectorEnv) -> np.ndarray:
+        return env.outputs[self.slot][self.output]
+
+    def scalar(self, env: _ScalarEnv) -> float:
+        return env.values[self.slot][self.output]
+
+
+class _Negate(_Node):
+    def __init__(self, operand: _Node) -> None:
+        self.operand = operand
+
+    def vector(self, env: _VectorEnv) -> Any:
+        return -self.operand.vector(env)
+
+    def scalar(self, env: _ScalarEnv) -> float:
+        return -self.operand.scalar(env)
+
+
+class _Arithmetic(_Node):
+    def __init__(self, symbol: str, left: _Node, right: _Node) -> None:
+        self.symbol = symbol
+        self.left = left
+        self.right = right
+
+    def vector(self, env: _VectorEnv) -> Any:
+        left = self.left.vector(env)
+        right = self.right.vector(env)
+        if self.symbol == "+":
+            return left + right
+        if self.symbol == "-":
+            return left - right
+        if self.symbol == "*":
+            return left * right
+        # 除以 0 得到 NaN，与逐点实现一致
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(np.asarray(right) != 0, np.divide(left, right), _NAN)
+
+    def scalar(self, env: _ScalarEnv) -> float:
+        left = self.left.scalar(env)
+        right = self.right.scalar(env)
+        if self.symbol == "+":
+            return left + right
+        if self.symbol == "-":
+            return left - right
+        if self.symbol == "*":
+            return left * right
+        return left / right if right != 0 else _NAN
+
+
+class _Compare(_Node):
+    boolean = True
+
+    def __init__(self, symbol: str, left: _Node, right: _Node) -> None:
+        self.function = _COMPARISONS[symbol]
+        self.left = left
+        self.right = right
+
+    def vector(self, env: _VectorEnv) -> Any:
+        return self.function(self.left.vector(env), self.right.vector(env))
+
+    def scalar(self, env: _ScalarEnv) -> bool:
+        return self.function(self.left.scalar(env), self.right.scalar(env))
+
+
+class _Cross(_Node):
+    boolean = True
+
+    def __init__(self, above: bool, left: _Node, right: _Node, index: int) -> None:
+        self.above = above
+        self.left = left
+        self.right = right
+        self.index = index
+
+    def vector(self, env: _VectorEnv) -> np.ndarray:
+        left = np.broadcast_to(np.asarray(self.left.vector(env), dtype=np.float64), (env.size,))
+        right = np.broadcast_to(np.asarray(self.right.vector(env), dtype=np.float64), (env.size,))
+        previous_left = np.concatenate(([_NAN], left[:-1]))
+        previous_right = np.concatenate(([_NAN], right[:-1]))
+        if self.above:
+            return (left > right) & (previous_left <= previous_right)
+        return (left < right) & (previous_left >= previous_right)
+
+    def scalar(self, env: _ScalarEnv) -> bool:
+        left = self.left.scalar(env)
+        right = self.right.scalar(env)
+        previous = env.previous[self.index]
+        env.previous[self.index] = (left, right)
+        if previous is None:
+            return False
+        if self.above:
+            return left > right and previous[0] <= previous[1]
+        return left < right and previous[0] >= previous[1]
+
+
+class _Logic(_Node):
+    boolean = True
+
+    def __init__(self, conjunction: bool, operands: List[_Node]) -> None:
+        self.conjunction = conjunction
+        self.operands = operands
+
+    def vector(self, env: _VectorEnv) -> Any:
+        values = [np.asarray(operand.vector(env), dtype=bool) for operand in self.operands]
+        return reduce(operator.and_ if self.conjunction else operator.or_, values)
+
+    def scalar(self, env: _ScalarEnv) -> bool:
+        # 不短路：交叉判断需要在每个价格点更新前值
+        values = [operand.scalar(env) for operand in self.operands]
+        return all(values) if self.conjunction else any(values)
+
+
+class _Not(_Node):
+    boolean = True
+
+    def __init__(self, operand: _Node) -> None:
+        self.operand = operand
+
+    def vector(self, env: _VectorEnv) -> Any:
+        return ~np.asarray(self.operand.vector(env), dtype=bool)
+
+    def scalar(self, env: _ScalarEnv) -> bool:
+        return not self.operand.scalar(env)
+
+
+@dataclass(frozen=True)
+class _Slot:
+    function: _Function
+    arguments: Tuple[str, ...]
+    # 0 表示逐笔价格，否则为 K 线周期（秒），指标使用已完成 K 线的收盘价
+    timeframe: int = 0
+
+    def build(self, parameters: Dict[str, Any]) -> Indicator:
+        values = []
+        for (_, kind, _), name in zip(self.function.arguments, self.arguments):
+            values.append(int(parameters[name]) if kind == "int" else float(parameters[name]))
+        return self.function.factory(*values)
+
+
+class _Parser:
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.tokens: List[Tuple[str, str, int]] = []
+        self.position = 0
+        self.slots: List[_Slot] = []
+        self.parameters: Dict[str, StrategyParameter] = {}
+        self.auto_names: Dict[Tuple[str, str, float], str] = {}
+        self.timeframes: Set[int] = set()
+        self.crosses = 0
+
+    def tokenize(self, text: str, offset: int) -> None:
+        self.tokens = []
+        self.position = 0
+        index = 0
+        while index < len(text):
+            if text[index:].strip() == "":
+                break
+            match = _TOKEN.match(text, index)
+            if match is None or match.end() == index:
+                raise RuleSyntaxError(f"Unexpected character {text[index:].strip()[:1]!r} at {offset + index}.")
+            kind = match.lastgroup or "op"
+            self.tokens.append((kind, match.group(kind), offset + match.start(kind)))
+            index = match.end()
+
+    def peek(self, value: Optional[str] = None) -> bool:
+        if self.position >= len(self.tokens):
+            return False
+        return value is None or self.tokens[self.position][1] == value
+
+    def take(self, description: str) -> Tuple[str, str, int]:
+        if self.position >= len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected end of rule, expected {description}.")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def next(self, expected: Optional[str] = None) -> Tuple[str, str, int]:
+        token = self.take(repr(expected) if expected else "more input")
+        if expected is not None and token[1] != expected:
+            raise RuleSyntaxError(f"Expected {expected!r} at {token[2]}, found {token[1]!r}.")
+        return token
+
+    def rule(self) -> Tuple[bool, _Node]:
+        _, action, position = self.take("'buy' or 'sell'")
+        if action not in ("buy", "sell"):
+            raise RuleSyntaxError(f"Rules start with 'buy' or 'sell', found {action!r} at {position}.")
+        self.next("when")
+        condition = self.condition()
+        if self.peek():
+            token = self.tokens[self.position]
+            raise RuleSyntaxError(f"Unexpected {token[1]!r} at {token[2]}.")
+        return action == "buy", condition
+
+    def condition(self) -> _Node:
+        node = self.disjunction()
+        if not node.boolean:
+            raise RuleSyntaxError("A rule condition must be a comparison, not a number.")
+        return node
+
+    def disjunction(self) -> _Node:
+        operands = [self.conjunction()]
+        while self.peek("or"):
+            self.next()
+            operands.append(self.conjunction())
+        return self._logic(False, operands)
+
+    def conjunction(self) -> _Node:
+        operands = [self.negation()]
+        while self.peek("and"):
+            self.next()
+            operands.append(self.negation())
+        return self._logic(True, operands)
+
+    def _logic(self, conjunction: bool, operands: List[_Node]) -> _Node:
+        if len(operands) == 1:
+            return operands[0]
+        if not all(operand.boolean for operand in operands):
+            raise RuleSyntaxError(f"'{'and' if conjunction else 'or'}' combines comparisons, not numbers.")
+        return _Logic(conjunction, operands)
+
+    def negation(self) -> _Node:
+        if self.peek("not"):
+            self.next()
+            operand = self.negation()
+            if not operand.boolean:
+                raise RuleSyntaxError("'not' applies to a comparison, not a number.")
+            return _Not(operand)
+        return self.comparison()
+
+    def comparison(self) -> _Node:
+        left = self.additive()
+        if not self.peek():
+            return left
+        symbol = self.tokens[self.position][1]
+        if symbol not in _COMPARISONS and symbol not in ("crosses_above", "crosses_below"):
+            return left
+        self.next()
+        right = self.additive()
+        if left.boolean or right.boolean:
+            raise RuleSyntaxError(f"'{symbol}' compares numbers, not conditions.")
+        if symbol in _COMPARISONS:
+            return _Compare(symbol, left, right)
+        self.crosses += 1
+        return _Cross(symbol == "crosses_above", left, right, self.crosses - 1)
+
+    def additive(self) -> _Node:
+        node = self.multiplicative()
+        while self.peek("+") or self.peek("-"):
+            symbol = self.next()[1]
+            node = _Arithmetic(symbol, self._number(node), self._number(self.multiplicative()))
+        return node
+
+    def multiplicative(self) -> _Node:
+        node = self.unary()
+        while self.peek("*") or self.peek("/"):
+            symbol = self.next()[1]
+            node = _Arithmetic(symbol, self._number(node), self._number(self.unary()))
+        return node
+
+    def _number(self, node: _Node) -> _Node:
+        if node.boolean:
+            raise RuleSyntaxError("Arithmetic applies to numbers, not conditions.")
+        return node
+
+    def unary(self) -> _Node:
+        if self.peek("-"):
+            self.next()
+            return _Negate(self._number(self.unary()))
+        return self.atom()
+
+    def atom(self) -> _Node:
+        kind, text, position = self.take("a value")
+        if kind == "number":
+            return _Const(float(text))
+        if text == "(":
+            node = self.disjunction()
+            self.next(")")
+            return node
+        if kind != "name":
+            raise RuleSyntaxError(f"Unexpected {text!r} at {position}.")
+        if self.peek("="):
+            self.parameter_name(text, position)
+            return self.declare(text, self.literal(), "float", "规则中的阈值", None, position)
+        if text == "price":
+            return _Price()
+        if text in BAR_FIELDS:
+            if not self.peek("@"):
+                raise RuleSyntaxError(f"{text!r} at {position} needs a timeframe, e.g. {text}@1h.")
+            return _BarField(self.timeframe(), text)
+        if text in _FUNCTIONS:
+            return self.call(text, position)
+        raise RuleSyntaxError(f"Unknown name {text!r} at {position}.")
+
+    def timeframe(self) -> int:
+        _, _, position = self.next("@")
+        amount = self.literal()
+        unit = 1
+        if self.peek() and self.tokens[self.position][1] in _TIME_UNITS:
+            unit = _TIME_UNITS[self.next()[1]]
+        seconds = amount * unit
+        if seconds != int(seconds) or seconds <= 0:
+            raise RuleSyntaxError(f"Timeframe at {position} must be a positive whole number of seconds.")
+        self.timeframes.add(int(seconds))
+        return int(seconds)
+
+    def literal(self) -> float:
+        negative = False
+        if self.peek("-"):
+            self.next()
+            negative = True
+        kind, text, position = self.take("a number")
+        if kind != "number":
+            raise RuleSyntaxError(f"Expected a number at {position}, found {text!r}.")
+        return -float(text) if negative else float(text)
+
+    def parameter_name(self, name: str, position: int) -> None:
+        self.next("=")
+        if name in _KEYWORDS or name in _FUNCTIONS:
+            raise RuleSyntaxError(f"{name!r} at {position} is reserved and cannot name a parameter.")
+
+    def declare(
+        self, name: str, value: float, kind: str, description: str, minimum: Optional[float], position: int
+    ) -> _Param:
+        default: Any = int(value) if kind == "int" else value
+        if kind == "int" and default != value:
+            raise RuleSyntaxError(f"Parameter {name!r} at {position} must be an integer.")
+        existing = self.parameters.get(name)
+        if existing is not None:
+            if existing.default != default:
+                raise RuleSyntaxError(f"Parameter {name!r} is given different values ({existing.default} and {default}).")
+            return _Param(name)
+        self.parameters[name] = StrategyParameter(
+            name=name, parameter_type=kind, description=description, default=default, minimum=minimum
+        )
+        return _Param(name)
+
+    def call(self, name: str, position: int) -> _IndicatorValue:
+        function = _FUNCTIONS[name]
+        family = function.family or name
+        self.next("(")
+        given: List[Tuple[Optional[str], float]] = []
+        while not self.peek(")"):
+            if given:
+                self.next(",")
+            if len(given) >= len(function.arguments):
+                raise RuleSyntaxError(f"{name}() takes at most {len(function.arguments)} arguments ({position}).")
+            label: Optional[str] = None
+            if self.peek() and self.tokens[self.position][0] == "name":
+                _, label, label_position = self.next()
+                self.parameter_name(label, label_position)
+            given.append((label, self.literal()))
+        self.next(")")
+
+        arguments: List[_Param] = []
+        for index, (argument, kind, default) in enumerate(function.arguments):
+            if index < len(given):
+                label, value = given[index]
+            elif default is not None:
+                label, value = None, default
+            else:
+                raise RuleSyntaxError(f"{name}() at {position} needs its {argument} argument.")
+            parameter = label or self._auto_name(family, argument, value)
+            description = f"规则中 {family} 的 {argument} 参数"
+            arguments.append(self.declare(parameter, value, kind, description, 1 if kind == "int" else None, position))
+
+        timeframe = self.timeframe() if self.peek("@") else 0
+
+        # 同一指标（含多输出指标的不同输出）在同一周期上使用相同参数时共用一个槽位
+        slot = _Slot(function=function, arguments=tuple(argument.name for argument in arguments), timeframe=timeframe)
+        for index, existing in enumerate(self.slots):
+            if (
+                existing.function.factory is slot.function.factory
+                and existing.arguments == slot.arguments
+                and existing.timeframe == slot.timeframe
+            ):
+                return _IndicatorValue(index, function.output or 0)
+        self.slots.append(slot)
+        return _IndicatorValue(len(self.slots) - 1, function.output or 0)
+
+    def _auto_name(self, function: str, argument: str, value: float) -> str:
+        # 同一函数参数写相同数值时视为同一个参数，例如买卖规则里的 sma(5)
+        key = (function, argument, value)
+        if key not in self.auto_names:
+            base = f"{function}_{argument}"
+            name = base
+            suffix = 2
+            while name in self.parameters:
+                name = f"{base}_{suffix}"
+                suffix += 1
+            self.auto_names[key] = name
+        return self.auto_names[key]
+
+
+class RuleProgram:
+    """Compiled rules; see the module docstring for the syntax."""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parser = _Parser(source)
+        self.rules: List[Tuple[bool, _Node]] = []
+        offset = 0
+        for line in re.split(r"([;\n])", source):
+            if line in (";", "\n"):
+                offset += 1
+                continue
+            text = line.split("#", 1)[0]
+            if text.strip():
+                parser.tokenize(text, offset)
+                self.rules.append(parser.rule())
+            offset += len(line)
+        if not self.rules:
+            raise RuleSyntaxError("No rules given.")
+        self.slots = parser.slots
+        self.crosses = parser.crosses
+        self.timeframes = sorted(parser.timeframes)
+        self.parameters = list(parser.parameters.values())
+        try:
+            self.indicators({parameter.name: parameter.default for parameter in self.parameters})
+        except ValueError as exc:
+            raise RuleSyntaxError(str(exc)) from exc
+
+    def indicators(self, parameters: Dict[str, Any]) -> List[Indicator]:
+        return [slot.build(parameters) for slot in self.slots]
+
+    def lookback(self, parameters: Dict[str, Any]) -> int:
+        """Ticks needed to rebuild the tick-level evaluator state by replay (exact for window indicators)."""
+        longest = 1
+        for slot, indicator in zip(self.slots, self.indicators(parameters)):
+            if not slot.timeframe:
+                longest = max(longest, _memory(indicator))
+        return longest + 1
+
+    def evaluate(
+        self, prices: np.ndarray, parameters: Dict[str, Any], timestamps: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Buy and sell conditions for every price, as two boolean arrays.
+
+        `timestamps` (epoch nanoseconds) are required when the rules use bar timeframes.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if self.timeframes and timestamps is None:
+            raise ValueError("Rules with bar timeframes need timestamps.")
+        bars = {seconds: BAR_CACHE.bars(prices, timestamps, seconds) for seconds in self.timeframes}
+        outputs = []
+        for slot, indicator in zip(self.slots, self.indicators(parameters)):
+            if not slot.timeframe:
+                outputs.append(_outputs(INDICATOR_CACHE.compute(indicator, prices)))
+                continue
+            series = bars[slot.timeframe]
+            values = _outputs(INDICATOR_CACHE.compute(indicator, series.close))
+            outputs.append(tuple(series.at_ticks(array) for array in values))
+        env = _VectorEnv(prices, outputs, bars, parameters)
+        buy = np.zeros(len(prices), dtype=bool)
+        sell = np.zeros(len(prices), dtype=bool)
+        for is_buy, condition in self.rules:
+            result = np.broadcast_to(np.asarray(condition.vector(env), dtype=bool), buy.shape)
+            if is_buy:
+                buy |= result
+            else:
+                sell |= result
+        return buy, sell
+
+    def evaluator(self, parameters: Dict[str, Any]) -> "RuleEvaluator":
+        return RuleEvaluator(self, parameters)
+
+
+def _memory(indicator: Indicator) -> int:
+    return indicator.warmup * (_EXPONENTIAL_MEMORY if isinstance(indicator, (EMA, RSI, MACD)) else 1)
+
+
+def _outputs(result: Any) -> Tuple[np.ndarray, ...]:
+    return result if isinstance(result, tuple) else (result,)
+
+
+def _scalar_outputs(value: Any) -> Tuple[float, ...]:
+    if value is None:
+        return (_NAN, _NAN, _NAN)
+    return value if isinstance(value, tuple) else (value,)
+
+
+class RuleEvaluator:
+    """Incremental form of a `RuleProgram`: `step()` consumes one price per call.
+
+    Bar-timeframe indicators subscribe to a shared `BarFeed` and are updated as bars
+    complete; the feed keeps enough bars to rebuild them from a saved state.
+    """
+
+    def __init__(self, program: RuleProgram, parameters: Dict[str, Any]) -> None:
+        self.program = program
+        self.indicators = program.indicators(parameters)
+        self.bars = BarFeed()
+        self._tick_slots: List[Tuple[int, Indicator]] = []
+        self._bar_slots: List[Tuple[int, Indicator]] = []
+        for seconds in program.timeframes:
+            self.bars.aggregator(seconds)
+        for index, (slot, indicator) in enumerate(zip(program.slots, self.indicators)):
+            if slot.timeframe:
+                self.bars.indicator(slot.timeframe, indicator, history=_memory(indicator))
+                self._bar_slots.append((index, indicator))
+            else:
+                self._tick_slots.append((index, indicator))
+        self.env = _ScalarEnv(len(self.indicators), program.crosses, self.bars.aggregators, parameters)
+        self.ticks = 0
+
+    def step(self, price: float, timestamp_ns: Optional[int] = None, update_bars: bool = True) -> Tuple[bool, bool]:
+        """Evaluate the rules at one tick; `timestamp_ns` is required when the rules use bars.
+
+        With `update_bars=False` the bars are left as they are, which is used to replay
+        recent ticks on top of restored bars.
+        """
+        env = self.env
+        env.price = price
+        values = env.values
+        if self.bars and update_bars:
+            if timestamp_ns is None:
+                raise ValueError("Rules with bar timeframes need timestamps.")
+            self.bars.update(price, timestamp_ns)
+        # K 线指标只在 K 线完成时由 BarFeed 更新，这里读取其当前值
+        for index, indicator in self._bar_slots:
+            values[index] = _scalar_outputs(indicator.value)
+        for index, indicator in self._tick_slots:
+            values[index] = _scalar_outputs(indicator.update(price))
+        self.ticks += 1
+        buy = sell = False
+        for is_buy, condition in self.program.rules:
+            # 每条规则都要求值，以便交叉判断更新前值
+            if condition.scalar(env):
+                if is_buy:
+                    buy = True
+                else:
+                    sell = True
+        return buy, sell
+
+
+def compile_rules(source: str) -> RuleProgram:
+    return RuleProgram(source)
+
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from collections import deque
 from datetime import datetime
-from statistics import mean
-from typing import Deque
+from typing import Any, Dict, Tuple
 
-from app.models import SignalType, StrategyParameter, StrategySignal
-from app.services.strategies.base import STRATEGY_REGISTRY, Strategy
+import numpy as np
+
+from app.models import SignalType, StrategyParameter
+from app.services.indicators import INDICATOR_CACHE, SMA
+from app.services.strategies.base import SIGNAL_BUY, SIGNAL_HOLD, SIGNAL_SELL, STRATEGY_REGISTRY, Signal, Strategy
+from app.utils.rolling import RollingWindow
 
 
 class MovingAverageStrategy(Strategy):
@@ -21,7 +23,9 @@ class MovingAverageStrategy(Strategy):
         self.short_window = int(self.parameters["short_window"])
         self.long_window = int(self.parameters["long_window"])
         self.min_strength = float(self.parameters["min_strength"])
-        self.price_history: Deque[float] = deque(maxlen=self.long_window)
+        # 两条均线各自维护滑动和，每个价格 O(1) 更新；短窗口不超过长窗口
+        self.price_history = RollingWindow(self.long_window)
+        self._short_history = RollingWindow(min(self.short_window, self.long_window))
         self._previous_spread: float | None = None
 
     @classmethod
@@ -53,17 +57,15 @@ class MovingAverageStrategy(Strategy):
             ),
         ]
 
-    def generate_signal(self, price: float, timestamp: datetime) -> StrategySignal:
-        self.price_history.append(price)
-
-        if len(self.price_history) < self.long_window:
-            return StrategySignal(timestamp=timestamp, signal=SignalType.HOLD, strength=0.0, price=price)
+    def generate_signal(self, price: float, timestamp: datetime) -> Signal:
+        self.price_history.push(price)
+        self._short_history.push(price)
 
-        short_prices = list(self.price_history)[-self.short_window :]
-        long_prices = list(self.price_history)
+        if not self.price_history.full:
+            return Signal(timestamp, SignalType.HOLD, 0.0, price)
 
-        short_avg = mean(short_prices)
-        long_avg = mean(long_prices)
+        short_avg = self._short_history.mean()
+        long_avg = self.price_history.mean()
         spread = short_avg - long_avg
         normalized_strength = max(min(spread / long_avg, 1.0), -1.0)
 
@@ -98,7 +100,68 @@ class MovingAverageStrategy(Strategy):
 
         self._previous_spread = spread
 
-        return StrategySignal(timestamp=timestamp, signal=signal, strength=strength, price=price)
+        return Signal(timestamp, signal, strength, price)
+
+    def get_state(self) -> Dict[str, Any]:
+        # 短窗口是长窗口的尾部，只需保存长窗口
+        return {"prices": self.price_history.values(), "previous_spread": self._previous_spread}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.price_history.clear()
+        self._short_history.clear()
+        for price in state.get("prices", ()):
+            self.price_history.push(price)
+            self._short_history.push(price)
+        self._previous_spread = state.get("previous_spread")
+
+    def log_state(self) -> str:
+        if self._previous_spread is None:
+            return f"history_len={len(self.price_history)},prev_spread=None"
+        return f"history_len={len(self.price_history)},prev_spread={self._previous_spread:.6f}"
+
+    def generate_signals(self, prices: np.ndarray, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self.price_history) or self._previous_spread is not None:
+            # 已有历史状态时向量化结果与逐点调用不一致，退回逐点实现
+            return super().generate_signals(prices, timestamps)
+
+        prices = np.asarray(prices, dtype=np.float64)
+        long_window = self.long_window
+        short_window = min(self.short_window, long_window)
+        signals = np.zeros(len(prices), dtype=np.int8)
+        strengths = np.zeros(len(prices), dtype=np.float64)
+        if len(prices) >= long_window:
+            # 同一序列上的多组参数共享均线结果；精确求和与逐点实现逐位一致，交叉判断不受舍入影响
+            short_avg = INDICATOR_CACHE.compute(SMA(short_window, exact=True), prices)[long_window - 1 :]
+            long_avg = INDICATOR_CACHE.compute(SMA(long_window, exact=True), prices)[long_window - 1 :]
+            spread = short_avg - long_avg
+            normalized = np.maximum(np.minimum(spread / long_avg, 1.0), -1.0)
+
+            active = np.where(spread > 0, SIGNAL_BUY, SIGNAL_SELL).astype(np.int8)
+            active_strength = normalized.copy()
+            weak = np.abs(normalized) < self.min_strength
+            active[weak] = SIGNAL_HOLD
+            active_strength[weak] = 0.0
+
+            # 交叉点：与 generate_signal 一致，强制信号并保证强度不低于 min_strength
+            previous = np.empty_like(spread)
+            previous[0] = np.nan
+            previous[1:] = spread[:-1]
+            cross_up = (spread > 0) & (previous <= 0)
+            cross_down = (spread < 0) & (previous >= 0)
+            active[cross_up] = SIGNAL_BUY
+            active_strength[cross_up] = np.where(weak[cross_up], self.min_strength, normalized[cross_up])
+            active[cross_down] = SIGNAL_SELL
+            active_strength[cross_down] = np.where(weak[cross_down], -self.min_strength, normalized[cross_down])
+
+            signals[long_window - 1 :] = active
+            strengths[long_window - 1 :] = active_strength
+            self._previous_spread = float(spread[-1])
+
+        # 同步滑动窗口，之后的逐点调用从序列末尾继续
+        for price in prices[-long_window:].tolist():
+            self.price_history.push(price)
+            self._short_history.push(price)
+        return signals, strengths
 
 
 STRATEGY_REGISTRY.register(MovingAverageStrategy)
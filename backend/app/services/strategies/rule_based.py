@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from app.config import CONFIG
+from app.models import SignalType, StrategyMetadata, StrategyParameter
+from app.services.bars import epoch_ns
+from app.services.strategies.base import SIGNAL_BUY, SIGNAL_SELL, STRATEGY_REGISTRY, Signal, Strategy
+from app.services.strategies.dsl import RuleEvaluator, RuleProgram, compile_rules
+from app.utils.task_index import config_hash
+
+LOGGER = logging.getLogger(__name__)
+
+# 查找策略时最多每隔多少秒检查一次定义文件
+RULE_SYNC_INTERVAL = 1.0
+
+_STRENGTH = StrategyParameter(
+    name="strength",
+    parameter_type="float",
+    description="规则触发时的信号强度（仓位比例）",
+    default=0.5,
+    minimum=0.0,
+    maximum=1.0,
+)
+
+
+class RuleStrategy(Strategy):
+    """Strategy defined by DSL rules; concrete classes are created by `build_rule_strategy`.
+
+    Backtests evaluate the compiled rules over the whole series with NumPy; live use
+    steps a `RuleEvaluator` one price at a time. A price on which both a buy and a sell
+    rule fire is treated as HOLD. Rules using bar timeframes share the evaluator's
+    `BarFeed` as the strategy's `bars`.
+    """
+
+    program: RuleProgram
+
+    def __init__(self, **parameters: Any) -> None:
+        super().__init__(**parameters)
+        self.strength = float(self.parameters["strength"])
+        self._evaluator: RuleEvaluator = self.program.evaluator(self.parameters)
+        self.bars = self._evaluator.bars
+        # 用于恢复状态的最近价格；批量计算后尚未逐点回放的价格与时间戳
+        self._recent: Deque[float] = deque(maxlen=self.program.lookback(self.parameters))
+        self._pending: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def parameter_definitions(cls) -> List[StrategyParameter]:
+        return [*cls.program.parameters, _STRENGTH]
+
+    @classmethod
+    def metadata(cls) -> StrategyMetadata:
+        metadata = super().metadata()
+        metadata.rules = cls.program.source
+        return metadata
+
+    def reset(self) -> None:
+        super().reset()
+        self._evaluator = self.program.evaluator(self.parameters)
+        self.bars = self._evaluator.bars
+        self._recent.clear()
+        self._pending = None
+
+    def _catch_up(self) -> None:
+        # 批量计算不维护逐点状态，第一次逐点调用时再把这些价格回放一遍
+        (prices, timestamps), self._pending = self._pending, None
+        for price, timestamp_ns in zip(prices.tolist(), timestamps.tolist()):
+            self._evaluator.step(price, timestamp_ns)
+
+    def _signal(self, buy: bool, sell: bool) -> Tuple[SignalType, float]:
+        if buy and not sell:
+            return SignalType.BUY, self.strength
+        if sell and not buy:
+            return SignalType.SELL, -self.strength
+        return SignalType.HOLD, 0.0
+
+    def generate_signal(self, price: float, timestamp: datetime) -> Signal:
+        if self._pending is not None:
+            self._catch_up()
+        self._recent.append(price)
+        timestamp_ns = epoch_ns(timestamp) if self.bars else None
+        signal, strength = self._signal(*self._evaluator.step(price, timestamp_ns))
+        return Signal(timestamp, signal, strength, price)
+
+    def generate_signals(self, prices: np.ndarray, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self._evaluator.ticks or self._pending is not None:
+            # 已有历史状态时退回逐点实现
+            return super().generate_signals(prices, timestamps)
+
+        prices = np.asarray(prices, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        buy, sell = self.program.evaluate(prices, self.parameters, timestamps)
+        signals = np.zeros(len(prices), dtype=np.int8)
+        strengths = np.zeros(len(prices), dtype=np.float64)
+        buy_only = buy & ~sell
+        sell_only = sell & ~buy
+        signals[buy_only] = SIGNAL_BUY
+        strengths[buy_only] = self.strength
+        signals[sell_only] = SIGNAL_SELL
+        strengths[sell_only] = -self.strength
+        self._recent.extend(prices[-self._recent.maxlen :].tolist())
+        self._pending = (prices, timestamps)
+        return signals, strengths
+
+    def get_state(self) -> Dict[str, Any]:
+        if self._pending is not None and self.bars:
+            # K 线状态只能逐点建立
+            self._catch_up()
+        return {"prices": list(self._recent), "bars": self.bars.get_state()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        # 回放最近的价格重建指标状态：窗口类指标完全一致，指数平滑类只差可忽略的远端影响；
+        # K 线指标由恢复的 K 线重建，回放价格时不再重复聚合
+        self.reset()
+        self.bars.set_state(state.get("bars", {}))
+        for price in state.get("prices", ()):
+            self._recent.append(price)
+            self._evaluator.step(price, update_bars=False)
+
+    def log_state(self) -> str:
+        return f"history_len={len(self._recent)}"
+
+
+def build_rule_strategy(strategy_id: str, name: str, rules: str, description: str = "") -> Type[RuleStrategy]:
+    """Compile `rules` into a new `RuleStrategy` subclass; raises ValueError on invalid rules."""
+    program = compile_rules(rules)
+    if any(parameter.name == _STRENGTH.name for parameter in program.parameters):
+        raise ValueError(f"'{_STRENGTH.name}' is reserved and cannot name a rule parameter.")
+    attributes = {
+        "strategy_id": strategy_id,
+        "name": name,
+        "description": description or rules,
+        "fingerprint": config_hash({"rules": rules}),
+        "program": program,
+    }
+    return type(f"RuleStrategy_{strategy_id}", (RuleStrategy,), attributes)
+
+
+class RuleStrategyStore:
+    """Rule strategies defined at runtime, persisted to a JSON file and kept in `STRATEGY_REGISTRY`.
+
+    Changes made through this store apply immediately. Registry lookups re-check the
+    file's mtime at most every `RULE_SYNC_INTERVAL` seconds (and on a miss), so backtest
+    worker processes pick up strategies created or deleted through the API after they started.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.definitions: Dict[str, Dict[str, str]] = {}
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def sync(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < RULE_SYNC_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns == self._mtime_ns:
+            return
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            try:
+                with self.path.open("r", encoding="utf-8") as fp:
+                    definitions = json.load(fp).get("strategies", {})
+            except (OSError, json.JSONDecodeError):
+                definitions = {}
+            self._apply(definitions)
+            self._mtime_ns = mtime_ns
+
+    def _apply(self, definitions: Dict[str, Dict[str, str]]) -> None:
+        for strategy_id in set(self.definitions) - set(definitions):
+            STRATEGY_REGISTRY.unregister(strategy_id)
+        for strategy_id, definition in definitions.items():
+            if self.definitions.get(strategy_id) == definition:
+                continue
+            try:
+                STRATEGY_REGISTRY.register(build_rule_strategy(strategy_id, **definition))
+            except (TypeError, ValueError) as exc:
+                LOGGER.warning("Skipping invalid rule strategy %s: %s", strategy_id, exc)
+        self.definitions = dict(definitions)
+
+    def _save(self, definitions: Dict[str, Dict[str, str]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            json.dump({"version": 1, "strategies": definitions}, fp, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        # 本进程的修改直接生效，不必等下一次检查文件
+        with self._lock:
+            self._apply(definitions)
+            self._mtime_ns = self.path.stat().st_mtime_ns
+
+    def create(self, strategy_id: str, name: str, rules: str, description: str = "") -> Type[RuleStrategy]:
+        self.sync(force=True)
+        try:
+            STRATEGY_REGISTRY.get(strategy_id)
+        except KeyError:
+            pass
+        else:
+            raise ValueError(f"Strategy {strategy_id} already exists.")
+        strategy_cls = build_rule_strategy(strategy_id, name, rules, description)
+        definitions = dict(self.definitions)
+        definitions[strategy_id] = {"name": name, "rules": rules, "description": description}
+        self._save(definitions)
+        return strategy_cls
+
+    def delete(self, strategy_id: str) -> None:
+        self.sync(force=True)
+        if strategy_id not in self.definitions:
+            STRATEGY_REGISTRY.get(strategy_id)
+            raise ValueError(f"Strategy {strategy_id} is built in and cannot be deleted.")
+        definitions = dict(self.definitions)
+        definitions.pop(strategy_id)
+        self._save(definitions)
+
+
+RULE_STRATEGIES = RuleStrategyStore(CONFIG.data_storage_path / "rule_strategies.json")
+STRATEGY_REGISTRY.add_loader(RULE_STRATEGIES.sync)
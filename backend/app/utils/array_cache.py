@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+import numpy as np
+
+V = TypeVar("V")
+
+_FINGERPRINTS: Dict[int, Tuple[weakref.ref, str]] = {}
+
+
+def array_fingerprint(values: np.ndarray) -> str:
+    """Digest of an array's dtype and contents, remembered per array object.
+
+    Equal contents give equal digests, so slices and copies of one series share cache
+    entries; hashing a large array again is skipped while the same object is alive.
+    """
+    identifier = id(values)
+    cached = _FINGERPRINTS.get(identifier)
+    if cached is not None and cached[0]() is values:
+        return cached[1]
+    # 内存映射等 ndarray 子类按原对象缓存，连续化得到的视图每次都是新对象
+    contiguous = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(contiguous.dtype.str.encode("ascii"), digest_size=16)
+    digest.update(contiguous.tobytes())
+    fingerprint = digest.hexdigest()
+    try:
+        reference = weakref.ref(values, lambda _: _FINGERPRINTS.pop(identifier, None))
+    except TypeError:
+        return fingerprint
+    _FINGERPRINTS[identifier] = (reference, fingerprint)
+    return fingerprint
+
+
+class SizedLRUCache(Generic[V]):
+    """Thread-safe LRU mapping bounded by the total byte size of its values."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[V, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: V, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
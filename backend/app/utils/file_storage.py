@@ -1,10 +1,35 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import json
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, overload
+
+import numpy as np
+
+# 列式存储：数据文件按列连续存放，配置与列布局写在同名 .json 附属文件中
+CSV_SUFFIX = ".csv"
+COLUMNAR_SUFFIX = ".qbs"
+COLUMNAR_FORMAT = "qbox-columnar"
+COLUMNAR_VERSION = 1
+# utc_offset 列中表示时间戳不带时区
+NAIVE_OFFSET = np.iinfo(np.int32).min
+
+_COLUMN_DTYPES = {"timestamp": np.dtype("<i8"), "price": np.dtype("<f8"), "utc_offset": np.dtype("<i4")}
+_COLUMN_ALIGNMENT = 64
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+# 每个进程保持映射的列式文件数
+_MAPPED_LIMIT = 32
+# 流式读取时每块的行数
+SERIES_CHUNK_SIZE = 10000
 
 
 @dataclass(slots=True)
@@ -13,19 +38,125 @@ class StoredSeries:
     rows: List[Dict[str, Any]]
 
 
+@lru_cache(maxsize=64)
+def _offset_timezone(seconds: int) -> timezone:
+    return timezone.utc if seconds == 0 else timezone(timedelta(seconds=seconds))
+
+
+def format_timestamp(nanoseconds: int, utc_offset: int) -> str:
+    """ISO string of an epoch-ns timestamp in the given UTC offset (seconds, or `NAIVE_OFFSET`)."""
+    delta = timedelta(microseconds=nanoseconds // 1000)
+    if utc_offset == NAIVE_OFFSET:
+        return (_NAIVE_EPOCH + delta).isoformat()
+    return (_EPOCH + delta).astimezone(_offset_timezone(utc_offset)).isoformat()
+
+
+class TimestampLabels(Sequence[str]):
+    """Timestamp strings of a columnar series, formatted on access instead of up front."""
+
+    __slots__ = ("timestamps", "utc_offsets")
+
+    def __init__(self, timestamps: np.ndarray, utc_offsets: np.ndarray) -> None:
+        self.timestamps = timestamps
+        self.utc_offsets = utc_offsets
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TimestampLabels": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TimestampLabels(self.timestamps[index], self.utc_offsets[index])
+        return format_timestamp(int(self.timestamps[index]), int(self.utc_offsets[index]))
+
+
+@dataclass(slots=True)
+class ColumnarSeries:
+    config: Dict[str, Any]
+    timestamps: np.ndarray  # int64 epoch nanoseconds
+    prices: np.ndarray  # float64
+    utc_offsets: np.ndarray  # int32 seconds, NAIVE_OFFSET for naive timestamps
+
+    @property
+    def labels(self) -> TimestampLabels:
+        return TimestampLabels(self.timestamps, self.utc_offsets)
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rows in the shape `read_series` returns for CSV files (prices as floats)."""
+        return [
+            {"timestamp": format_timestamp(timestamp, offset), "price": price}
+            for timestamp, price, offset in zip(
+                self.timestamps[start:stop].tolist(),
+                self.prices[start:stop].tolist(),
+                self.utc_offsets[start:stop].tolist(),
+            )
+        ]
+
+
+def is_columnar(file_path: Path) -> bool:
+    return file_path.suffix == COLUMNAR_SUFFIX
+
+
+def columnar_sidecar(file_path: Path) -> Path:
+    return file_path.with_name(f"{file_path.name}.json")
+
+
+def find_series_file(directory: Path, data_id: str) -> Optional[Path]:
+    """The stored file of `data_id` in `directory`, in whichever format it was written."""
+    for suffix in (COLUMNAR_SUFFIX, CSV_SUFFIX):
+        path = directory / f"{data_id}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def series_checksum(file_path: Path) -> str:
+    """BLAKE2b digest of a stored series, including the sidecar of columnar files."""
+    digest = hashlib.blake2b(digest_size=16)
+    paths = [columnar_sidecar(file_path), file_path] if is_columnar(file_path) else [file_path]
+    for path in paths:
+        with path.open("rb") as fp:
+            while block := fp.read(1 << 20):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def delete_series_file(file_path: Path) -> None:
+    file_path.unlink()
+    if is_columnar(file_path):
+        columnar_sidecar(file_path).unlink(missing_ok=True)
+
+
 def write_series(
     file_path: Path,
     config: Dict[str, Any],
     rows: Sequence[Dict[str, Any]],
 ) -> None:
+    write_series_chunks(file_path, config, [rows])
+
+
+def write_series_chunks(
+    file_path: Path,
+    config: Dict[str, Any],
+    chunks: Iterable[Sequence[Dict[str, Any]]],
+) -> None:
+    """Like `write_series`, consuming the rows chunk by chunk."""
     file_path.parent.mkdir(parents=True, exist_ok=True)
     with file_path.open("w", newline="", encoding="utf-8") as fp:
         fp.write(json.dumps(config) + "\n")
-        if rows:
-            writer = csv.DictWriter(fp, fieldnames=list(rows[0].keys()))
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(row)
+        writer = None
+        for rows in chunks:
+            if not rows:
+                continue
+            if writer is None:
+                writer = csv.DictWriter(fp, fieldnames=list(rows[0].keys()))
+                writer.writeheader()
+            writer.writerows(rows)
 
 
 def append_series_row(
@@ -45,7 +176,123 @@ def append_series_row(
         writer.writerow(row)
 
 
+def write_columnar_series(
+    file_path: Path,
+    config: Dict[str, Any],
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    utc_offsets: np.ndarray,
+) -> None:
+    """Write a columnar series: the raw columns to `file_path`, config and layout to its sidecar."""
+    columns = {"timestamp": timestamps, "price": prices, "utc_offset": utc_offsets}
+    length = len(timestamps)
+    layout = []
+    offset = 0
+    for name, values in columns.items():
+        if len(values) != length:
+            raise ValueError(f"Column {name} has {len(values)} values, expected {length}.")
+        layout.append({"name": name, "dtype": _COLUMN_DTYPES[name].str, "offset": offset})
+        offset += -(-length * _COLUMN_DTYPES[name].itemsize // _COLUMN_ALIGNMENT) * _COLUMN_ALIGNMENT
+    sidecar = {
+        "format": COLUMNAR_FORMAT,
+        "version": COLUMNAR_VERSION,
+        "rows": length,
+        "columns": layout,
+        "config": config,
+    }
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+    with tmp_path.open("wb") as fp:
+        for entry, values in zip(layout, columns.values()):
+            fp.seek(entry["offset"])
+            fp.write(np.ascontiguousarray(values, dtype=entry["dtype"]).tobytes())
+        fp.truncate(offset)
+    sidecar_path = columnar_sidecar(file_path)
+    tmp_sidecar = sidecar_path.with_name(f"{sidecar_path.name}.tmp")
+    with tmp_sidecar.open("w", encoding="utf-8") as fp:
+        json.dump(sidecar, fp)
+    os.replace(tmp_path, file_path)
+    os.replace(tmp_sidecar, sidecar_path)
+
+
+class MappedColumn(np.memmap):
+    """Read-only column mapped from a columnar series file.
+
+    Pickling a whole column sends only its location, so process-pool workers map the
+    same file pages instead of receiving a copy; slices and other views pickle their data.
+    """
+
+    _location: Optional[Tuple[str, str, int, int, int]] = None
+
+    def __reduce__(self):
+        location = self._location
+        if location is None or self.shape != (location[3],):
+            return np.asarray(self).__reduce__()
+        return (_map_column, location)
+
+
+def _map_column(path: str, dtype: str, offset: int, length: int, mtime_ns: int) -> np.ndarray:
+    series = read_columnar_series(Path(path))
+    for column in (series.timestamps, series.prices, series.utc_offsets):
+        if isinstance(column, MappedColumn) and column._location == (path, dtype, offset, length, mtime_ns):
+            return column
+    raise ValueError(f"Series file {path} changed while it was in use.")
+
+
+_MAPPED: OrderedDict[str, Tuple[int, int, ColumnarSeries]] = OrderedDict()
+_MAPPED_LOCK = threading.Lock()
+
+
+def read_columnar_series(file_path: Path) -> ColumnarSeries:
+    """Open a columnar series as read-only memory-mapped arrays.
+
+    Mappings are shared within the process until the file changes, so concurrent
+    readers of one series use the same arrays (and the OS page cache) instead of copies.
+    """
+    key = str(file_path)
+    stat = file_path.stat()
+    with _MAPPED_LOCK:
+        cached = _MAPPED.get(key)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            _MAPPED.move_to_end(key)
+            return cached[2]
+
+    with columnar_sidecar(file_path).open("r", encoding="utf-8") as fp:
+        sidecar = json.load(fp)
+    if sidecar.get("format") != COLUMNAR_FORMAT or sidecar.get("version") != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported series format in {file_path}.")
+    length = int(sidecar["rows"])
+    columns: Dict[str, np.ndarray] = {}
+    for entry in sidecar["columns"]:
+        dtype = np.dtype(entry["dtype"])
+        if entry["offset"] + length * dtype.itemsize > stat.st_size:
+            raise ValueError(f"Series file {file_path} is shorter than its layout.")
+        if length == 0:
+            column = np.empty(0, dtype=dtype)
+            column.flags.writeable = False
+        else:
+            column = MappedColumn(file_path, dtype=dtype, mode="r", offset=entry["offset"], shape=(length,))
+            column._location = (key, dtype.str, entry["offset"], length, stat.st_mtime_ns)
+        columns[entry["name"]] = column
+    series = ColumnarSeries(
+        config=sidecar.get("config", {}),
+        timestamps=columns["timestamp"],
+        prices=columns["price"],
+        utc_offsets=columns["utc_offset"],
+    )
+    with _MAPPED_LOCK:
+        _MAPPED[key] = (stat.st_size, stat.st_mtime_ns, series)
+        _MAPPED.move_to_end(key)
+        while len(_MAPPED) > _MAPPED_LIMIT:
+            _MAPPED.popitem(last=False)
+    return series
+
+
 def read_series(file_path: Path) -> StoredSeries:
+    if is_columnar(file_path):
+        series = read_columnar_series(file_path)
+        return StoredSeries(config=series.config, rows=series.rows())
     with file_path.open("r", encoding="utf-8") as fp:
         config_line = fp.readline().strip()
         config = json.loads(config_line) if config_line else {}
@@ -53,3 +300,50 @@ def read_series(file_path: Path) -> StoredSeries:
         rows = list(reader)
     return StoredSeries(config=config, rows=rows)
 
+
+def read_series_config(file_path: Path) -> Dict[str, Any]:
+    """The config of a stored series, without reading its rows."""
+    if is_columnar(file_path):
+        with columnar_sidecar(file_path).open("r", encoding="utf-8") as fp:
+            return json.load(fp).get("config", {})
+    with file_path.open("r", encoding="utf-8") as fp:
+        config_line = fp.readline().strip()
+    return json.loads(config_line) if config_line else {}
+
+
+def count_series_rows(file_path: Path) -> int:
+    """Number of stored rows, counted without parsing them."""
+    if is_columnar(file_path):
+        with columnar_sidecar(file_path).open("r", encoding="utf-8") as fp:
+            return int(json.load(fp)["rows"])
+    lines = 0
+    last = b"\n"
+    with file_path.open("rb") as fp:
+        while block := fp.read(1 << 20):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    # 第一行为配置，第二行为表头
+    return max(lines - 2, 0)
+
+
+def iter_series_rows(file_path: Path, chunk_size: int = SERIES_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Rows of a stored series in lists of at most `chunk_size`, so only one chunk is in memory."""
+    if is_columnar(file_path):
+        series = read_columnar_series(file_path)
+        for start in range(0, len(series.timestamps), chunk_size):
+            yield series.rows(start, start + chunk_size)
+        return
+    with file_path.open("r", encoding="utf-8") as fp:
+        fp.readline()
+        reader = csv.DictReader(fp)
+        chunk: List[Dict[str, Any]] = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+
+def build_line_offsets(path: Path, skip_lines: int = 0) -> np.ndarray:
+    """Byte offsets of every line start after the first `skip_lines` lines.
+
+    The returned array has one extra trailing element holding the file size, so line
+    ``i`` spans ``offsets[i]:offsets[i + 1]``. Only newlines are scanned; nothing is parsed.
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return np.zeros(1, dtype=np.int64)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    starts = np.flatnonzero(buffer == ord("\n")).astype(np.int64) + 1
+    del buffer
+    starts = np.concatenate(([0], starts[starts < size]))
+    return np.concatenate((starts[skip_lines:], [size])).astype(np.int64)
+
+
+def load_line_offsets(path: Path, index_path: Path, skip_lines: int = 0) -> np.ndarray:
+    """Load the offsets cached in `index_path`, rebuilding them when `path` has changed."""
+    size = path.stat().st_size
+    try:
+        if index_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+            offsets = np.load(index_path)
+            if len(offsets) and int(offsets[-1]) == size:
+                return offsets
+    except (OSError, ValueError):
+        pass
+    offsets = build_line_offsets(path, skip_lines)
+    try:
+        with index_path.open("wb") as fp:
+            np.save(fp, offsets)
+    except OSError:
+        pass
+    return offsets
+
+
+def read_lines(path: Path, offsets: np.ndarray, start: int, stop: int) -> List[str]:
+    """Read lines ``start..stop`` (exclusive) using an offset array from `build_line_offsets`."""
+    count = len(offsets) - 1
+    start = max(0, min(start, count))
+    stop = max(start, min(stop, count))
+    if start == stop:
+        return []
+    with path.open("rb") as fp:
+        fp.seek(int(offsets[start]))
+        chunk = fp.read(int(offsets[stop] - offsets[start]))
+    return chunk.decode("utf-8").splitlines()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import IO, Dict, List, Optional
+
+
+class BufferedLogWriter:
+    """Append-only text log that keeps its handle open and writes in batches.
+
+    Lines are buffered in memory and written once `flush_rows` lines are pending or
+    `flush_interval` seconds have passed since the last write-out, whichever comes first.
+    `write` only sees the interval when a new line arrives, so the producer also calls
+    `flush_if_due` between chunks to bound how long a quiet log keeps lines pending.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        mode: str = "w",
+        flush_rows: int = 1000,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.flush_rows = max(flush_rows, 1)
+        self.flush_interval = flush_interval
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp: Optional[IO[str]] = path.open(mode, encoding="utf-8")
+        self._pending: List[str] = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def closed(self) -> bool:
+        return self._fp is None
+
+    def write(self, line: str) -> None:
+        self._pending.append(line)
+        if len(self._pending) >= self.flush_rows:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def writelines(self, lines: List[str]) -> None:
+        self._pending.extend(lines)
+        self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if self._fp is None:
+            return
+        if self._pending:
+            self._fp.write("".join(self._pending))
+            self._pending.clear()
+        self._fp.flush()
+
+    def close(self) -> None:
+        if self._fp is None:
+            return
+        self.flush()
+        self._fp.close()
+        self._fp = None
+
+
+class LogWriterRegistry:
+    """Tracks the open writers of each task so they can be flushed on pause/stop/completion."""
+
+    def __init__(self) -> None:
+        self._writers: Dict[str, Dict[str, BufferedLogWriter]] = {}
+
+    def open(self, task_id: str, name: str, path: Path, **options) -> BufferedLogWriter:
+        writers = self._writers.setdefault(task_id, {})
+        existing = writers.pop(name, None)
+        if existing is not None:
+            existing.close()
+        writer = BufferedLogWriter(path, **options)
+        writers[name] = writer
+        return writer
+
+    def get(self, task_id: str, name: str) -> Optional[BufferedLogWriter]:
+        return self._writers.get(task_id, {}).get(name)
+
+    def flush_task(self, task_id: str) -> None:
+        for writer in self._writers.get(task_id, {}).values():
+            writer.flush()
+
+    def flush_due(self, task_id: str) -> None:
+        """Write out the task's lines that have waited longer than their flush interval."""
+        for writer in self._writers.get(task_id, {}).values():
+            writer.flush_if_due()
+
+    def close_task(self, task_id: str) -> None:
+        for writer in self._writers.pop(task_id, {}).values():
+            writer.close()
+
+
+LOG_WRITERS = LogWriterRegistry()
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+
+import numpy as np
+
+
+def _exact_integers(values: np.ndarray) -> tuple[np.ndarray, int]:
+    """Scale float64 values to exact Python integers sharing one power-of-two exponent.
+
+    Returns ``(ints, exponent)`` such that ``values[i] == ints[i] * 2**exponent`` exactly.
+    """
+    mantissa, exponent = np.frexp(values)
+    ints = (mantissa * float(1 << 53)).astype(np.int64)
+    shifts = exponent.astype(np.int64) - 53
+    base = int(shifts.min()) if len(shifts) else 0
+    scaled = ints.astype(object) << (shifts - base).astype(object)
+    return scaled, base
+
+
+def rolling_mean(values: np.ndarray, window: int, exact: bool = False) -> np.ndarray:
+    """Trailing mean over ``window`` points; the first ``window - 1`` entries are NaN.
+
+    The default path uses block-local float64 cumulative sums and agrees with the scalar
+    `RollingWindow` to within rounding (flat windows return their value exactly).
+    ``exact=True`` accumulates exact integers instead, correctly rounded like
+    ``statistics.mean`` and bit-identical to `RollingWindow`, for sign-sensitive consumers
+    that must match the scalar strategies; it is roughly 10x slower.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return result
+
+    if exact:
+        ints, exponent = _exact_integers(values)
+        result[window - 1 :] = _divide(_window_sums(ints, window), window, exponent)
+        return result
+    references, sums = _local_window_sums(values, window)
+    means = references + sums / window
+    result[window - 1 :] = _settle_flat(values, window, means, values[window - 1 :])
+    return result
+
+
+def _window_sums(ints: np.ndarray, window: int) -> np.ndarray:
+    cumulative = np.empty(len(ints) + 1, dtype=object)
+    cumulative[0] = 0
+    np.cumsum(ints, out=cumulative[1:])
+    return cumulative[window:] - cumulative[:-window]
+
+
+def _divide(numerators: np.ndarray, denominator: int, exponent: int) -> np.ndarray:
+    """Correctly rounded ``numerators * 2**exponent / denominator`` as float64."""
+    if exponent < 0:
+        return (numerators / (denominator << -exponent)).astype(np.float64)
+    return ((numerators << exponent) / denominator).astype(np.float64)
+
+
+def _local_window_sums(values: np.ndarray, window: int, squares: bool = False) -> tuple[np.ndarray, ...]:
+    """Float64 window sums (and sums of squares) taken relative to a nearby reference.
+
+    Values are centred on the first value of their block of `window` points and summed
+    with a cumulative sum that restarts every block, so rounding only scales with the
+    local spread, never with the length of the series or how far it has moved. The
+    window starting at offset ``j`` of block ``k`` covers the tail of block ``k`` and the
+    first ``j`` points of block ``k + 1``, which are shifted onto block ``k``'s reference.
+    Returns ``(references, sums[, squares])`` for every full window.
+    """
+    count = len(values) - window + 1
+    blocks = -(-len(values) // window)
+    references = values[::window]
+    grid = np.zeros((blocks + 1, window))
+    grid.ravel()[: len(values)] = values
+    grid[:blocks] -= references[:, None]
+    # 下一分段的参考值相对当前分段的偏移；最后一个分段之后没有窗口跨越
+    shift = np.diff(references, append=references[-1])[:, None]
+    offsets = np.arange(window)
+
+    def window_sums(columns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        prefix = np.zeros((blocks + 1, window + 1))
+        np.cumsum(columns, axis=1, out=prefix[:, 1:])
+        head = prefix[:blocks, window:] - prefix[:blocks, :window]
+        return head, prefix[1:, :window]
+
+    head, tail = window_sums(grid)
+    sums = head + tail + offsets * shift
+    result = [np.repeat(references, window)[:count], sums.ravel()[:count]]
+    if squares:
+        head, tail_squares = window_sums(grid * grid)
+        result.append((head + tail_squares + 2.0 * shift * tail + offsets * shift * shift).ravel()[:count])
+    return tuple(result)
+
+
+def _settle_flat(values: np.ndarray, window: int, results: np.ndarray, flat_values: np.ndarray | float) -> np.ndarray:
+    """Replace results of constant windows with `flat_values`.
+
+    Float window sums leave rounding noise where the exact answer is a tie (a flat price
+    stretch), which would flip the sign of comparisons such as ``sma(5) > sma(20)``.
+    """
+    changes = np.concatenate(([0], np.cumsum(values[1:] != values[:-1])))
+    flat = changes[window - 1 :] == changes[: len(changes) - window + 1]
+    return np.where(flat, flat_values, results)
+
+
+def rolling_weighted_mean(values: np.ndarray, window: int, exact: bool = False) -> np.ndarray:
+    """Linearly weighted trailing mean (weights ``1..window``, newest heaviest).
+
+    The default path is a float64 convolution; ``exact=True`` matches `RollingWeightedWindow`
+    bit for bit like `rolling_mean`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return result
+
+    if exact:
+        ints, exponent = _exact_integers(values)
+        positions = np.arange(1, len(ints) + 1).astype(object)
+        sums = _window_sums(ints, window)
+        weighted = _window_sums(ints * positions, window)
+        # 窗口 [t-window+1, t] 内第 j 个点的权重为 j-(t-window+1)+1，展开后减去起点偏移
+        offsets = np.arange(len(sums)).astype(object)
+        result[window - 1 :] = _divide(weighted - offsets * sums, window * (window + 1) // 2, exponent)
+        return result
+    # 加权和的前缀和随位置平方增长，误差过大；直接卷积，每个窗口只累加 window 项
+    weighted = np.convolve(values, np.arange(window, 0, -1, dtype=np.float64), mode="valid")
+    means = weighted / (window * (window + 1) // 2)
+    result[window - 1 :] = _settle_flat(values, window, means, values[window - 1 :])
+    return result
+
+
+def rolling_variance(values: np.ndarray, window: int, ddof: int = 0, exact: bool = False) -> np.ndarray:
+    """Trailing variance from window sums of values and squares.
+
+    The default float64 path sums locally centred values, clamps rounding noise at zero
+    and returns exactly 0 for flat windows. ``exact=True`` uses exact integer sums and
+    matches `RollingMoments` bit for bit.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window <= ddof or len(values) < window:
+        return result
+
+    if exact:
+        ints, exponent = _exact_integers(values)
+        sums = _window_sums(ints, window)
+        squares = _window_sums(ints * ints, window)
+        result[window - 1 :] = _divide(window * squares - sums * sums, window * (window - ddof), 2 * exponent)
+        return result
+    _, sums, squares = _local_window_sums(values, window, squares=True)
+    variances = np.maximum(window * squares - sums * sums, 0.0) / (window * (window - ddof))
+    result[window - 1 :] = _settle_flat(values, window, variances, 0.0)
+    return result
+
+
+def rolling_extreme(values: np.ndarray, window: int, maximum: bool) -> np.ndarray:
+    """Trailing min or max in O(n) using block prefix/suffix scans (van Herk/Gil-Werman)."""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return result
+
+    accumulate = np.maximum.accumulate if maximum else np.minimum.accumulate
+    fill = -np.inf if maximum else np.inf
+    blocks = -(-len(values) // window)
+    padded = np.full(blocks * window, fill)
+    padded[: len(values)] = values
+    grid = padded.reshape(blocks, window)
+    prefix = accumulate(grid, axis=1).ravel()
+    suffix = accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    combine = np.maximum if maximum else np.minimum
+    count = len(values) - window + 1
+    result[window - 1 :] = combine(suffix[:count], prefix[window - 1 : window - 1 + count])
+    return result
+
+
+def exponential_smoothing(values: np.ndarray, alpha: float, initial: float, block: int = 128) -> np.ndarray:
+    """Evaluate ``y[t] = (1 - alpha) * y[t-1] + alpha * x[t]`` with ``y[-1] = initial``.
+
+    The recursion is solved block by block with a small triangular matrix product, so only
+    one Python iteration per `block` points remains. Results agree with the scalar
+    recursion to within floating point rounding.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.empty(len(values))
+    if len(values) == 0:
+        return result
+
+    beta = 1.0 - alpha
+    lags = np.arange(block)[:, None] - np.arange(block)[None, :]
+    kernel = np.where(lags >= 0, alpha * beta ** np.maximum(lags, 0), 0.0)
+    decay = beta ** np.arange(1, block + 1)
+    blocks = -(-len(values) // block)
+    padded = np.zeros(blocks * block)
+    padded[: len(values)] = values
+    partial = padded.reshape(blocks, block) @ kernel.T
+    carry = float(initial)
+    for index in range(blocks):
+        partial[index] += decay * carry
+        carry = float(partial[index, -1])
+    result[:] = partial.ravel()[: len(values)]
+    return result
+
+
+def seed_mean(values: np.ndarray) -> float:
+    """Mean used to seed recursive indicators; identical for the scalar and array paths."""
+    return math.fsum(values) / len(values)
+
+
+class RollingWindow:
+    """Fixed-size window of floats whose mean is updated in O(1) per value.
+
+    The running sum is kept as an exact integer scaled by a shared power of two, so
+    `mean()` is correctly rounded like ``statistics.mean`` and never drifts, no matter
+    how many values have passed through the window.
+    """
+
+    __slots__ = ("size", "_values", "_sum", "_shift")
+
+    def __init__(self, size: int) -> None:
+        if size <= 0:
+            raise ValueError("Window size must be positive.")
+        self.size = size
+        self._values: deque[float] = deque()
+        self._sum = 0
+        self._shift = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) >= self.size
+
+    def _scaled(self, value: float) -> int:
+        numerator, denominator = value.as_integer_ratio()
+        return numerator << (self._shift - denominator.bit_length() + 1)
+
+    def push(self, value: float) -> None:
+        value = float(value)
+        shift = value.as_integer_ratio()[1].bit_length() - 1
+        if shift > self._shift:
+            # 新值的精度更细：整体放大已有的和，保持精确
+            self._sum <<= shift - self._shift
+            self._shift = shift
+        self._sum += self._scaled(value)
+        self._values.append(value)
+        if len(self._values) > self.size:
+            self._sum -= self._scaled(self._values.popleft())
+
+    def values(self) -> list[float]:
+        return list(self._values)
+
+    def mean(self) -> float:
+        if not self._values:
+            raise ValueError("mean of an empty window")
+        return self._sum / (len(self._values) << self._shift)
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._sum = 0
+        self._shift = 0
+
+
+class RollingMoments(RollingWindow):
+    """`RollingWindow` that also tracks the exact sum of squares for O(1) variance."""
+
+    __slots__ = ("_squares",)
+
+    def __init__(self, size: int) -> None:
+        super().__init__(size)
+        self._squares = 0
+
+    def push(self, value: float) -> None:
+        value = float(value)
+        shift = self._shift
+        evicted = self._values[0] if self.full else None
+        super().push(value)
+        self._squares <<= 2 * (self._shift - shift)
+        scaled = self._scaled(value)
+        self._squares += scaled * scaled
+        if evicted is not None:
+            scaled = self._scaled(evicted)
+            self._squares -= scaled * scaled
+
+    def variance(self, ddof: int = 0) -> float:
+        count = len(self._values)
+        if count <= ddof:
+            raise ValueError("not enough values for the requested ddof")
+        numerator = count * self._squares - self._sum * self._sum
+        return numerator / ((count * (count - ddof)) << (2 * self._shift))
+
+    def clear(self) -> None:
+        super().clear()
+        self._squares = 0
+
+
+class RollingWeightedWindow(RollingWindow):
+    """`RollingWindow` that also tracks the linearly weighted sum (newest value heaviest)."""
+
+    __slots__ = ("_weighted",)
+
+    def __init__(self, size: int) -> None:
+        super().__init__(size)
+        self._weighted = 0
+
+    def push(self, value: float) -> None:
+        value = float(value)
+        shift = self._shift
+        previous_sum = self._sum
+        full = self.full
+        super().push(value)
+        delta = self._shift - shift
+        previous_sum <<= delta
+        self._weighted <<= delta
+        scaled = self._scaled(value)
+        if full:
+            # 所有旧值权重减一，最旧的值权重归零，新值权重为窗口大小
+            self._weighted += self.size * scaled - previous_sum
+        else:
+            self._weighted += len(self._values) * scaled
+
+    def weighted_mean(self) -> float:
+        count = len(self._values)
+        if not count:
+            raise ValueError("mean of an empty window")
+        return self._weighted / ((count * (count + 1) // 2) << self._shift)
+
+    def clear(self) -> None:
+        super().clear()
+        self._weighted = 0
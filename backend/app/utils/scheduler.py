@@ -25,22 +25,30 @@ class ScheduledTask:
     _task: Optional[asyncio.Task[Any]] = field(default=None, init=False, repr=False)
 
     def start(self) -> None:
-        if self._task is not None and not self._task.done():
+        previous = self._task
+        if previous is not None and not previous.done() and not previous.cancelling():
             return
         self.status = TaskStatus.RUNNING
-        self._task = asyncio.create_task(self._runner())
+        self._task = asyncio.create_task(self._runner(previous))
 
-    async def _runner(self) -> None:
+    async def _runner(self, previous: Optional[asyncio.Task[Any]] = None) -> None:
+        if previous is not None and not previous.done():
+            # 上一次运行已被取消但仍在收尾（例如等待写入检查点），等它结束后再开始
+            await asyncio.wait({previous})
+        current = asyncio.current_task()
         try:
             await self.coro_factory()
-            if self.status not in {TaskStatus.STOPPED, TaskStatus.PAUSED}:
+            if self._task is current and self.status not in {TaskStatus.STOPPED, TaskStatus.PAUSED}:
                 self.status = TaskStatus.COMPLETED
         except asyncio.CancelledError:
-            self.status = TaskStatus.STOPPED
+            # 暂停同样通过取消实现，此时保留 PAUSED 以便之后恢复
+            if self._task is current and self.status != TaskStatus.PAUSED:
+                self.status = TaskStatus.STOPPED
             raise
         except Exception as exc:  # noqa: BLE001
-            self.status = TaskStatus.FAILED
-            self.message = str(exc)
+            if self._task is current:
+                self.status = TaskStatus.FAILED
+                self.message = str(exc)
 
     def cancel(self) -> None:
         if self._task and not self._task.done():
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import csv
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.utils.file_storage import (
+    CSV_SUFFIX,
+    SERIES_CHUNK_SIZE,
+    append_series_row,
+    count_series_rows,
+    iter_series_rows,
+    read_series_config,
+)
+
+# 不限制点数时每个分段的行数
+SEGMENT_POINTS = 10000
+# 限制点数时分段不小于此行数，避免每个 tick 都新建或删除文件
+MIN_SEGMENT_POINTS = 256
+
+
+def segment_points(max_points: Optional[int]) -> int:
+    """Rows per segment; with retention about an eighth of `max_points`, which bounds the extra rows kept on disk."""
+    if max_points is None:
+        return SEGMENT_POINTS
+    return min(SEGMENT_POINTS, max(max_points // 8, MIN_SEGMENT_POINTS))
+
+
+class SegmentedSeries:
+    """A live series stored as numbered CSV segments in one directory.
+
+    Each segment is a complete series file (config line, header, rows), so appending a
+    row only touches the newest segment. Retention with `max_points` is applied when a
+    segment fills up, by deleting whole old segments; readers skip the few surplus rows
+    still on disk, so the series always shows at most `max_points` rows.
+    """
+
+    def __init__(self, directory: Path, max_points: Optional[int] = None) -> None:
+        self.directory = directory
+        self.max_points = max_points
+        self.segment_size = segment_points(max_points)
+        # 各分段行数，只由本对象追加，按需统计一次
+        self._counts: Dict[Path, int] = {}
+        self._active: Optional[Path] = None
+
+    def segment_path(self, index: int) -> Path:
+        return self.directory / f"{index:08d}{CSV_SUFFIX}"
+
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"*{CSV_SUFFIX}"))
+
+    def exists(self) -> bool:
+        return bool(self.segments())
+
+    def _rows(self, path: Path) -> int:
+        count = self._counts.get(path)
+        if count is None:
+            count = self._counts[path] = count_series_rows(path)
+        return count
+
+    def _start_segment(self, path: Path, config: Dict[str, Any], header: Iterable[str]) -> None:
+        with path.open("w", newline="", encoding="utf-8") as fp:
+            fp.write(json.dumps(config) + "\n")
+            csv.DictWriter(fp, fieldnames=list(header)).writeheader()
+        self._counts[path] = 0
+        self._active = path
+
+    def create(self, config: Dict[str, Any], header: Iterable[str]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._start_segment(self.segment_path(0), config, header)
+
+    def read_config(self) -> Dict[str, Any]:
+        segments = self.segments()
+        if not segments:
+            raise FileNotFoundError(f"No segments in {self.directory}.")
+        return read_series_config(segments[-1])
+
+    def append(self, row: Dict[str, Any]) -> None:
+        active = self._active
+        if active is None:
+            segments = self.segments()
+            if not segments:
+                raise FileNotFoundError(f"No segments in {self.directory}.")
+            active = self._active = segments[-1]
+        if self._rows(active) >= self.segment_size:
+            config = read_series_config(active)
+            self._start_segment(self.segment_path(int(active.stem) + 1), config, row.keys())
+            active = self._active
+            self.apply_retention()
+        append_series_row(active, row, row.keys())
+        self._counts[active] += 1
+
+    def apply_retention(self) -> None:
+        """Delete the oldest segments whose rows are all beyond `max_points`."""
+        if self.max_points is None:
+            return
+        segments = self.segments()
+        total = sum(self._rows(path) for path in segments)
+        while len(segments) > 1 and total - self._rows(segments[0]) >= self.max_points:
+            oldest = segments.pop(0)
+            total -= self._counts.pop(oldest)
+            oldest.unlink(missing_ok=True)
+
+    def _visible(self, segments: List[Path]) -> tuple[int, int]:
+        total = sum(self._rows(path) for path in segments)
+        count = total if self.max_points is None else min(total, self.max_points)
+        return count, total - count
+
+    def count(self) -> int:
+        return self._visible(self.segments())[0]
+
+    def iter_rows(self, chunk_size: int = SERIES_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """Rows of the series in lists of at most `chunk_size`, oldest first."""
+        segments = self.segments()
+        skip = self._visible(segments)[1]
+        for path in segments:
+            if skip >= self._rows(path):
+                skip -= self._rows(path)
+                continue
+            try:
+                for rows in iter_series_rows(path, chunk_size):
+                    if skip:
+                        dropped = min(skip, len(rows))
+                        skip -= dropped
+                        rows = rows[dropped:]
+                    if rows:
+                        yield rows
+            except FileNotFoundError:
+                # 读取期间分段被保留策略删除
+                continue
+
+    def delete(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._counts.clear()
+        self._active = None
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, List, Tuple
+
+MAGIC = b"QBS1"
+
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+
+
+def _encode(value: Any, out: List[bytes]) -> None:
+    if value is None:
+        out.append(b"N")
+    elif value is True:
+        out.append(b"T")
+    elif value is False:
+        out.append(b"F")
+    elif isinstance(value, int):
+        if -(1 << 63) <= value < (1 << 63):
+            out.append(b"i" + _INT.pack(value))
+        else:
+            text = str(value).encode("ascii")
+            out.append(b"I" + _LENGTH.pack(len(text)) + text)
+    elif isinstance(value, float):
+        out.append(b"d" + _FLOAT.pack(value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(b"s" + _LENGTH.pack(len(data)) + data)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(b"b" + _LENGTH.pack(len(value)) + bytes(value))
+    elif isinstance(value, (list, tuple)):
+        if value and all(type(item) is float for item in value):
+            out.append(b"a" + _LENGTH.pack(len(value)) + struct.pack(f"<{len(value)}d", *value))
+            return
+        out.append(b"l" + _LENGTH.pack(len(value)))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out.append(b"m" + _LENGTH.pack(len(value)))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"State keys must be strings, got {type(key).__name__}")
+            data = key.encode("utf-8")
+            out.append(_LENGTH.pack(len(data)) + data)
+            _encode(item, out)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} in strategy state")
+
+
+def _decode(data: bytes, offset: int) -> Tuple[Any, int]:
+    tag = data[offset : offset + 1]
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag == b"T":
+        return True, offset
+    if tag == b"F":
+        return False, offset
+    if tag == b"i":
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b"d":
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag not in (b"I", b"s", b"b", b"a", b"l", b"m"):
+        raise ValueError(f"Unknown state tag {tag!r} at offset {offset - 1}")
+
+    (length,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    if tag == b"I":
+        return int(data[offset : offset + length].decode("ascii")), offset + length
+    if tag == b"s":
+        return data[offset : offset + length].decode("utf-8"), offset + length
+    if tag == b"b":
+        return bytes(data[offset : offset + length]), offset + length
+    if tag == b"a":
+        size = length * _FLOAT.size
+        return list(struct.unpack_from(f"<{length}d", data, offset)), offset + size
+    if tag == b"l":
+        items = []
+        for _ in range(length):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return items, offset
+    result: Dict[str, Any] = {}
+    for _ in range(length):
+        (key_length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        key = data[offset : offset + key_length].decode("utf-8")
+        result[key], offset = _decode(data, offset + key_length)
+    return result, offset
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """Encode a strategy state dict in a compact, versioned binary format.
+
+    Supports None, bool, int, float, str, bytes, lists and string-keyed dicts. Lists made
+    only of floats are stored as one packed float64 block. Unlike pickle, decoding never
+    runs code and does not depend on class layouts.
+    """
+    out = [MAGIC]
+    _encode(state, out)
+    return b"".join(out)
+
+
+def decode_state(data: bytes) -> Dict[str, Any]:
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError("Not an encoded strategy state.")
+    try:
+        state, offset = _decode(data, len(MAGIC))
+    except (struct.error, UnicodeDecodeError) as exc:
+        raise ValueError(f"Corrupt strategy state: {exc}") from exc
+    if offset != len(data) or not isinstance(state, dict):
+        raise ValueError("Corrupt strategy state.")
+    return state
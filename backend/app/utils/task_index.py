@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+_ENTRY_FIELDS = ("status", "created_at", "started_at", "finished_at", "config_hash", "metrics", "message")
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Stable hash of a task configuration (key order does not matter)."""
+    encoded = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class TaskIndex:
+    """Compact summary of every persisted task, kept in a SQLite table.
+
+    The per-task files remain the source of truth; the index only lets startup skip
+    reading them. A state change rewrites the task's own row, which holds only the
+    config hash; each distinct configuration is stored once in a separate table.
+    Writes with `save=False` stay in the open transaction until `save`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._known_configs: Set[str] = set()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at TEXT,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    config_hash TEXT NOT NULL,
+                    metrics TEXT,
+                    message TEXT
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_config_hash ON tasks (config_hash)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS configs (config_hash TEXT PRIMARY KEY, config TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Every indexed task as ``{task_id: entry}``, with its configuration joined in."""
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                f"""
+                SELECT task_id, {", ".join(f"tasks.{name}" for name in _ENTRY_FIELDS)}, configs.config
+                FROM tasks LEFT JOIN configs ON configs.config_hash = tasks.config_hash
+                """
+            ).fetchall()
+            self._known_configs = {row[0] for row in conn.execute("SELECT config_hash FROM configs")}
+        entries: Dict[str, Dict[str, Any]] = {}
+        for task_id, *values, config in rows:
+            entry = dict(zip(_ENTRY_FIELDS, values))
+            entry["metrics"] = json.loads(entry["metrics"]) if entry["metrics"] else None
+            entry["config"] = json.loads(config) if config else None
+            entries[task_id] = entry
+        return entries
+
+    def put(self, task_id: str, entry: Dict[str, Any], save: bool = True) -> None:
+        """Store the summary of one task; `entry` carries the config, only its hash goes in the row."""
+        config = entry.get("config")
+        digest = entry.get("config_hash") or config_hash(config or {})
+        metrics = entry.get("metrics")
+        row = (
+            task_id,
+            entry.get("status"),
+            entry.get("created_at"),
+            entry.get("started_at"),
+            entry.get("finished_at"),
+            digest,
+            json.dumps(metrics) if metrics is not None else None,
+            entry.get("message"),
+        )
+        with self._lock:
+            conn = self._connection()
+            if digest not in self._known_configs and config is not None:
+                conn.execute("INSERT OR IGNORE INTO configs VALUES (?, ?)", (digest, json.dumps(config)))
+                self._known_configs.add(digest)
+            conn.execute("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+            if save:
+                conn.commit()
+
+    def remove(self, task_id: str, save: bool = True) -> None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT config_hash FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return
+            conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            # 没有其他任务引用的配置一并删除
+            if conn.execute("SELECT 1 FROM tasks WHERE config_hash = ? LIMIT 1", row).fetchone() is None:
+                conn.execute("DELETE FROM configs WHERE config_hash = ?", row)
+                self._known_configs.discard(row[0])
+            if save:
+                conn.commit()
+
+    def save(self) -> None:
+        with self._lock:
+            self._connection().commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
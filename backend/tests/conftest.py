@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+# 在导入 app 之前把存储目录指向临时目录，测试不写入仓库中的 storage
+_STORAGE = tempfile.mkdtemp(prefix="qbox-tests-")
+os.environ.setdefault("DATA_STORAGE_PATH", os.path.join(_STORAGE, "data"))
+os.environ.setdefault("LOG_STORAGE_PATH", os.path.join(_STORAGE, "logs"))
+os.environ.setdefault("BACKTEST_WORKERS", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.backtest_engine import read_trade_log
+from app.services.backtesting import BACKTEST_MANAGER
+from app.utils import line_index
+from app.utils.line_index import build_line_offsets, load_line_offsets, read_lines
+
+
+def create_data(client: TestClient, seed: int, points: int = 3000) -> str:
+    response = client.post(
+        "/data/simulated",
+        json={"symbol": f"API{seed}", "data_points": points, "seed": seed, "volatility_magnitude": 3.0},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["data_id"]
+
+
+def wait_for(client: TestClient, task_id: str) -> Dict[str, Any]:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        info = client.get(f"/backtests/{task_id}").json()
+        if info["status"] not in ("running", "waiting"):
+            return info
+        time.sleep(0.02)
+    raise AssertionError(f"backtest {task_id} did not finish")
+
+
+def run_backtest(client: TestClient, data_id: str, **overrides: Any) -> Dict[str, Any]:
+    body = {"data_id": data_id, "strategy_id": "ma_crossover", "engine": "vectorized", **overrides}
+    response = client.post("/backtests", json=body)
+    assert response.status_code == 200, response.text
+    return wait_for(client, response.json()["task_id"])
+
+
+def list_all(client: TestClient, limit: int, **filters: Any) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        params = {"limit": limit, **filters, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/backtests", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= limit
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.fixture(scope="module")
+def tasks(client: TestClient) -> Dict[str, Any]:
+    first, second = create_data(client, 31), create_data(client, 32)
+    created = [
+        run_backtest(client, first, strategy_params={"short_window": window, "long_window": 30})
+        for window in (2, 3, 4, 5, 6)
+    ]
+    created += [run_backtest(client, second, strategy_params={"short_window": window}) for window in (2, 3)]
+    # 一个失败的任务用于状态筛选
+    created.append(run_backtest(client, first, strategy_params={"short_window": "bad"}))
+    return {"first": first, "second": second, "tasks": created}
+
+
+def test_describe_omits_trades(client: TestClient, tasks: Dict[str, Any]) -> None:
+    info = client.get(f"/backtests/{tasks['tasks'][0]['task_id']}").json()
+    assert info["status"] == "completed"
+    assert "trades" not in info
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 500])
+def test_cursor_pages_are_continuous(client: TestClient, tasks: Dict[str, Any], limit: int) -> None:
+    items = list_all(client, limit, data_id=tasks["first"])
+    ids = [item["task_id"] for item in items]
+    assert len(ids) == len(set(ids)) == 6
+    keys = [(item["created_at"], item["task_id"]) for item in items]
+    assert keys == sorted(keys, reverse=True)
+    assert set(ids) == {task["task_id"] for task in tasks["tasks"] if task["config"]["data_id"] == tasks["first"]}
+
+
+def test_new_tasks_do_not_shift_pages(client: TestClient, tasks: Dict[str, Any]) -> None:
+    page = client.get("/backtests", params={"limit": 2, "data_id": tasks["second"]}).json()
+    assert page["next_cursor"] is None
+    run_backtest(client, tasks["second"], strategy_params={"short_window": 4})
+    first_page = client.get("/backtests", params={"limit": 2, "data_id": tasks["second"]}).json()
+    rest = client.get(
+        "/backtests", params={"limit": 2, "data_id": tasks["second"], "cursor": first_page["next_cursor"]}
+    ).json()
+    # 游标之后仍是较早创建的任务，不会重复或遗漏
+    assert [item["task_id"] for item in rest["items"]] == [page["items"][1]["task_id"]]
+
+
+def test_filters(client: TestClient, tasks: Dict[str, Any]) -> None:
+    failed = list_all(client, 50, status="failed", data_id=tasks["first"])
+    assert [item["task_id"] for item in failed] == [tasks["tasks"][-1]["task_id"]]
+    completed = list_all(client, 50, status="completed", data_id=tasks["first"])
+    assert len(completed) == 5 and all(item["status"] == "completed" for item in completed)
+    assert list_all(client, 50, strategy_id="missing_strategy") == []
+    by_strategy = list_all(client, 50, strategy_id="ma_crossover", data_id=tasks["second"])
+    assert {item["config"]["data_id"] for item in by_strategy} == {tasks["second"]}
+    assert all("trades" not in item for item in by_strategy)
+
+
+def test_invalid_cursor(client: TestClient) -> None:
+    assert client.get("/backtests", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_trade_pages_match_log(client: TestClient, tasks: Dict[str, Any], monkeypatch) -> None:
+    task_id = tasks["tasks"][0]["task_id"]
+    log_path = Path(tasks["tasks"][0]["log_path"])
+    expected = [entry.__dict__ for entry in read_trade_log(log_path)]
+    assert len(expected) > 10
+
+    # 清除内存中的交易列表，强制从日志按偏移读取
+    BACKTEST_MANAGER._resident_trades.pop(task_id, None)
+    offsets_path = log_path.with_name(f"{task_id}.offsets.npy")
+    offsets_path.unlink(missing_ok=True)
+    builds = []
+    original = line_index.build_line_offsets
+    monkeypatch.setattr(line_index, "build_line_offsets", lambda *args, **kwargs: builds.append(1) or original(*args, **kwargs))
+
+    pages = []
+    offset = 0
+    while True:
+        page = client.get(f"/backtests/{task_id}/trades", params={"offset": offset, "limit": 7}).json()
+        assert page["total"] == len(expected)
+        if not page["trades"]:
+            break
+        pages.extend(page["trades"])
+        offset += len(page["trades"])
+    assert pages == expected
+    # 偏移索引只建立一次，之后的页复用缓存文件
+    assert offsets_path.exists()
+    assert len(builds) == 1
+
+    tail = client.get(f"/backtests/{task_id}/trades", params={"offset": len(expected) - 3, "limit": 10}).json()
+    assert tail["trades"] == expected[-3:]
+    past = client.get(f"/backtests/{task_id}/trades", params={"offset": len(expected) + 5, "limit": 10}).json()
+    assert past["trades"] == [] and past["total"] == len(expected)
+    assert client.get("/backtests/missing/trades").status_code == 404
+
+
+def test_line_offsets(tmp_path: Path) -> None:
+    path = tmp_path / "log.csv"
+    path.write_text('{"config": 1}\nheader\na\nbb\n\nccc\n', encoding="utf-8")
+    offsets = build_line_offsets(path, skip_lines=2)
+    assert read_lines(path, offsets, 0, 10) == ["a", "bb", "", "ccc"]
+    assert read_lines(path, offsets, 3, 4) == ["ccc"]
+    assert read_lines(path, offsets, 4, 10) == []
+    assert read_lines(path, offsets, 9, 12) == []
+
+    index_path = tmp_path / "log.offsets.npy"
+    assert load_line_offsets(path, index_path, skip_lines=2).tolist() == offsets.tolist()
+    # 文件追加后重新建立索引
+    with path.open("a", encoding="utf-8") as fp:
+        fp.write("dddd")
+    rebuilt = load_line_offsets(path, index_path, skip_lines=2)
+    assert read_lines(path, rebuilt, 4, 5) == ["dddd"]
+
+    empty = tmp_path / "empty.csv"
+    empty.write_text("", encoding="utf-8")
+    assert read_lines(empty, build_line_offsets(empty), 0, 5) == []
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import itertools
+import json
+from dataclasses import astuple
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from app.models import BacktestRequest, SimulatedDataRequest
+from app.services import backtest_cache
+from app.services.backtest_cache import BacktestResultCache
+from app.services.backtest_engine import TradeLogEntry
+from app.services.data_generation import DATA_REPOSITORY
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[BacktestResultCache]:
+    cache = BacktestResultCache(tmp_path / "cache.sqlite3", max_bytes=1 << 20)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def data_id() -> str:
+    return DATA_REPOSITORY.create_simulated(
+        SimulatedDataRequest(symbol="CACHE", data_points=200, seed=5, storage_format="csv")
+    ).data_id
+
+
+@pytest.fixture
+def clock(monkeypatch) -> None:
+    # 每次取时间都递增，使最近使用顺序确定
+    ticks = itertools.count(1_700_000_000)
+    monkeypatch.setattr(backtest_cache.time, "time", lambda: float(next(ticks)))
+
+
+def trades(count: int) -> List[TradeLogEntry]:
+    return [
+        TradeLogEntry(f"2025-01-01T00:00:{index:02d}", "buy", 100.0, 1.0, 900.0, 1.0, 1000.0) for index in range(count)
+    ]
+
+
+def request(data_id: str, **overrides) -> BacktestRequest:
+    return BacktestRequest(data_id=data_id, strategy_id="ma_crossover", **overrides)
+
+
+def test_key_normalizes_defaults_and_non_result_fields(cache: BacktestResultCache, data_id: str) -> None:
+    key = cache.key_for(request(data_id))
+    assert key is not None
+    explicit = {"short_window": 5, "long_window": 20, "min_strength": 0.05}
+    assert cache.key_for(request(data_id, strategy_params=explicit)) == key
+    assert cache.key_for(request(data_id, strategy_params={"long_window": 20, "unknown": 1})) == key
+    assert cache.key_for(request(data_id, engine="vectorized", signal_log_interval=0)) == key
+
+    assert cache.key_for(request(data_id, strategy_params={"short_window": 6})) != key
+    assert cache.key_for(request(data_id, commission_value=1.0)) != key
+    assert cache.key_for(request("data_missing")) is None
+    assert cache.key_for(BacktestRequest(data_id=data_id, strategy_id="missing_strategy")) is None
+    assert BacktestResultCache(cache.path, max_bytes=0).key_for(request(data_id)) is None
+
+
+def test_rewritten_series_gets_a_new_key(cache: BacktestResultCache, data_id: str) -> None:
+    key = cache.key_for(request(data_id))
+    cache.put(key, request(data_id), {"total_return": 0.1}, trades(3))
+    assert cache.get(key) is not None
+
+    # 修改数据文件后校验和变化，旧结果不再命中
+    path = DATA_REPOSITORY.series_path(data_id)
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    timestamp, price = lines[-1].rstrip("\n").split(",")
+    lines[-1] = f"{timestamp},{float(price) + 1.0}\n"
+    path.write_text("".join(lines), encoding="utf-8")
+    new_key = cache.key_for(request(data_id))
+    assert new_key is not None and new_key != key
+    assert cache.get(new_key) is None
+
+
+def test_metrics_only_entries(cache: BacktestResultCache) -> None:
+    cache.put_many([("metrics_only", "data_a", "ma_crossover", {"total_return": 0.2}, None)])
+    # 只有指标的条目满足扫描查询，但不满足需要交易记录的回测
+    assert cache.get("metrics_only") is None
+    assert cache.get_many(["metrics_only"])["metrics_only"].metrics == {"total_return": 0.2}
+    cache.put_many([("metrics_only", "data_a", "ma_crossover", {"total_return": 0.3}, trades(2))])
+    assert cache.get("metrics_only").trades == trades(2)
+
+    cache.put_many([("full", "data_a", "ma_crossover", {"total_return": 0.4}, trades(4))])
+    before = {item.key: item for item in cache.describe().items}["full"]
+    cache.put_many([("full", "data_a", "ma_crossover", {"total_return": 0.4}, None)])
+    # 只有指标的写入不会覆盖已有的交易记录
+    assert cache.get("full").trades == trades(4)
+    after = {item.key: item for item in cache.describe().items}["full"]
+    assert after.has_trades and after.size_bytes == before.size_bytes
+
+
+def test_size_bounded_lru_eviction(tmp_path: Path, clock: None) -> None:
+    entry_size = len(json.dumps({"n": 0})) + len(json.dumps([astuple(item) for item in trades(5)]))
+    cache = BacktestResultCache(tmp_path / "lru.sqlite3", max_bytes=entry_size * 3)
+    for index in range(3):
+        cache.put(f"key_{index}", request("data_lru"), {"n": index}, trades(5))
+    assert cache.describe().size_bytes == entry_size * 3
+
+    # key_0 刚被使用，超出上限时淘汰最久未用的 key_1
+    assert cache.get("key_0") is not None
+    cache.put("key_3", request("data_lru"), {"n": 3}, trades(5))
+    info = cache.describe()
+    assert info.size_bytes <= cache.max_bytes
+    assert sorted(item.key for item in info.items) == ["key_0", "key_2", "key_3"]
+
+    # 超过总上限的单个结果不保存
+    cache.put("huge", request("data_lru"), {"n": 4}, trades(500))
+    assert cache.get("huge") is None
+    assert cache.describe().entries == 3
+    cache.close()
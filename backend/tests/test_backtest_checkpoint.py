@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from app.models import BacktestRequest, SimulatedDataRequest
+from app.services.backtest_cache import BACKTEST_CACHE
+from app.services.backtest_engine import (
+    CHECKPOINT_VERSION,
+    TickBacktest,
+    TradeLogEntry,
+    checkpoint_path_for,
+    load_checkpoint,
+    save_checkpoint,
+    slice_arrays,
+    write_trade_log,
+)
+from app.services import backtesting
+from app.services.backtest_workers import BacktestWorkerPool
+from app.services.backtesting import BacktestManager
+from app.services.data_generation import DATA_REPOSITORY
+from app.services.series_store import read_price_arrays, write_series_file
+from app.services.strategies import STRATEGY_REGISTRY
+from app.utils.file_storage import find_series_file
+from app.utils.scheduler import SCHEDULER, TaskStatus
+
+from tests.test_backtest_engine import seeded_series
+
+
+def make_request(data_id: str = "data_test", **overrides) -> BacktestRequest:
+    return BacktestRequest(
+        data_id=data_id,
+        strategy_id="ma_crossover",
+        strategy_params={"short_window": 3, "long_window": 15, "min_strength": 0.0005},
+        commission_value=1.0,
+        lot_size=10,
+        signal_frequency_seconds=60,
+        **overrides,
+    )
+
+
+def run_uninterrupted(request: BacktestRequest, arrays) -> Tuple[List[TradeLogEntry], dict]:
+    simulation = TickBacktest(request, STRATEGY_REGISTRY.get(request.strategy_id)(**request.strategy_params))
+    trades = simulation.advance(arrays)
+    return trades, simulation.metrics()
+
+
+@pytest.mark.parametrize("pause_at", [1, 700, 2333, 4999])
+def test_resume_from_checkpoint_matches_uninterrupted_run(tmp_path: Path, pause_at: int) -> None:
+    arrays = seeded_series(5)
+    request = make_request()
+    expected_trades, expected_metrics = run_uninterrupted(request, arrays)
+    assert len(expected_trades) > 20
+
+    simulation = TickBacktest(request, STRATEGY_REGISTRY.get(request.strategy_id)(**request.strategy_params))
+    trades = []
+    for start in range(0, pause_at, 500):
+        trades.extend(simulation.advance(slice_arrays(arrays, start, min(start + 500, pause_at))))
+    path = checkpoint_path_for(tmp_path / "task.log")
+    save_checkpoint(path, simulation)
+
+    checkpoint = load_checkpoint(path)
+    assert checkpoint is not None and checkpoint["cursor"] == pause_at
+    resumed = TickBacktest.from_checkpoint(request, checkpoint)
+    for start in range(resumed.cursor, len(arrays.prices), 500):
+        trades.extend(resumed.advance(slice_arrays(arrays, start, start + 500)))
+
+    assert trades == expected_trades
+    assert resumed.metrics() == expected_metrics
+
+
+def test_checkpoint_of_other_version_is_ignored(tmp_path: Path) -> None:
+    simulation = TickBacktest(make_request(), STRATEGY_REGISTRY.get("ma_crossover")())
+    simulation.advance(slice_arrays(seeded_series(1, 100), 0, 100))
+    path = tmp_path / "task.checkpoint.json"
+    save_checkpoint(path, simulation)
+    assert load_checkpoint(path)["version"] == CHECKPOINT_VERSION == 1
+
+    path.write_text(path.read_text(encoding="utf-8").replace('"version": 1', '"version": 0'), encoding="utf-8")
+    assert load_checkpoint(path) is None
+    path.write_text("{", encoding="utf-8")
+    assert load_checkpoint(path) is None
+    assert load_checkpoint(tmp_path / "missing.json") is None
+
+
+@pytest.fixture(scope="module")
+def stored_data_id() -> str:
+    info = DATA_REPOSITORY.create_simulated(
+        SimulatedDataRequest(symbol="CKPT", data_points=10000, seed=17, volatility_magnitude=3.0)
+    )
+    return info.data_id
+
+
+async def wait_until(predicate, timeout: float = 60.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.001)
+
+
+async def pause_and_resume(manager: BacktestManager, request: BacktestRequest) -> Tuple[str, float]:
+    """Run a loop-engine backtest, pause it part way, then resume it to the end."""
+    task_id = manager.create_task(request).task_id
+    state = manager.tasks[task_id]
+    await wait_until(lambda: (state.progress or 0.0) >= 0.3)
+    manager.pause(task_id)
+    await wait_until(lambda: SCHEDULER.get(task_id)._task.done())
+
+    paused_at = state.progress
+    assert state.status == TaskStatus.PAUSED and paused_at < 1.0
+    assert checkpoint_path_for(state.log_path).exists()
+
+    manager.resume(task_id)
+    await wait_until(lambda: state.status != TaskStatus.RUNNING)
+    await wait_until(lambda: SCHEDULER.get(task_id)._task.done())
+    return task_id, paused_at
+
+
+def test_paused_task_resumes_to_same_result(tmp_path: Path, stored_data_id: str, monkeypatch) -> None:
+    # 不让结果缓存替代回测
+    monkeypatch.setattr(BACKTEST_CACHE, "max_bytes", 0)
+    request = make_request(stored_data_id, signal_log_interval=0)
+    arrays = read_price_arrays(find_series_file(DATA_REPOSITORY.base_path, stored_data_id))
+    expected_trades, expected_metrics = run_uninterrupted(request, arrays)
+
+    manager = BacktestManager(tmp_path)
+    task_id, paused_at = asyncio.run(pause_and_resume(manager, request))
+    state = manager.tasks[task_id]
+    assert 0.0 < paused_at < 1.0
+    assert state.status == TaskStatus.COMPLETED
+    assert state.metrics == expected_metrics
+    assert manager.get_trades(task_id, limit=10_000).trades == [entry.__dict__ for entry in expected_trades]
+    # 恢复后追加写入的交易日志与一次写出的日志逐字节相同
+    expected_log = tmp_path / "expected.log"
+    write_trade_log(expected_log, request, expected_trades)
+    assert state.log_path.read_bytes() == expected_log.read_bytes()
+    assert not checkpoint_path_for(state.log_path).exists()
+    SCHEDULER.remove(task_id)
+
+
+@pytest.fixture(scope="module")
+def long_data_id() -> str:
+    """A series long enough that the worker is still running when the pause arrives."""
+    rng = np.random.default_rng(23)
+    prices = np.maximum(100 + np.cumsum(rng.normal(0, 1.0, 200_000)), 1.0).round(4)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {"timestamp": (start + timedelta(seconds=15 * index)).isoformat(), "price": float(price)}
+        for index, price in enumerate(prices.tolist())
+    ]
+    data_id = "data_ckptpool"
+    write_series_file(DATA_REPOSITORY.base_path, data_id, {"symbol": "POOL", "source": "test"}, rows, "csv")
+    return data_id
+
+
+def test_pool_task_pauses_and_resumes(tmp_path: Path, long_data_id: str, monkeypatch) -> None:
+    monkeypatch.setattr(BACKTEST_CACHE, "max_bytes", 0)
+    pool = BacktestWorkerPool(1)
+    monkeypatch.setattr(backtesting, "BACKTEST_POOL", pool)
+    request = make_request(long_data_id, signal_log_interval=0)
+    arrays = read_price_arrays(find_series_file(DATA_REPOSITORY.base_path, long_data_id))
+    expected_trades, expected_metrics = run_uninterrupted(request, arrays)
+
+    manager = BacktestManager(tmp_path)
+    try:
+        # 工作进程在分块边界看到取消标志，写检查点后退出；剩余的进度事件在暂停前转发
+        task_id, paused_at = asyncio.run(pause_and_resume(manager, request))
+    finally:
+        pool.shutdown()
+    state = manager.tasks[task_id]
+    assert 0.0 < paused_at < 1.0
+    assert state.status == TaskStatus.COMPLETED
+    assert state.metrics == expected_metrics
+    assert manager.get_trades(task_id, limit=100_000).trades == [entry.__dict__ for entry in expected_trades]
+    expected_log = tmp_path / "expected.log"
+    write_trade_log(expected_log, request, expected_trades)
+    assert state.log_path.read_bytes() == expected_log.read_bytes()
+    assert not checkpoint_path_for(state.log_path).exists()
+    SCHEDULER.remove(task_id)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from app.models import BacktestRequest, CommissionType
+from app.services.backtest_engine import PriceArrays, TickBacktest, load_price_arrays, run_vectorized_backtest, slice_arrays
+from app.services.strategies import STRATEGY_REGISTRY
+
+
+def seeded_series(seed: int, points: int = 5000) -> PriceArrays:
+    """A random walk around 100 with time steps of 1 to 90 seconds."""
+    rng = np.random.default_rng(seed)
+    prices = np.maximum(100 + np.cumsum(rng.normal(0, 1.0, points)), 1.0).round(4)
+    offsets = np.cumsum(rng.integers(1, 91, points))
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {"timestamp": (start + timedelta(seconds=int(offset))).isoformat(), "price": float(price)}
+        for offset, price in zip(offsets, prices)
+    ]
+    return load_price_arrays(rows)
+
+
+EXECUTION = [
+    {"commission_type": CommissionType.FIXED, "commission_value": 5.0, "commission_max": 3.0},
+    {"commission_type": CommissionType.RATIO, "commission_value": 0.002, "commission_max": 8.0},
+    {"commission_type": CommissionType.RATIO, "commission_value": 0.001, "lot_size": 10, "max_position": 0.5},
+    {
+        "commission_type": CommissionType.FIXED,
+        "commission_value": 1.0,
+        "lot_size": 10,
+        "min_position": 0.05,
+        "max_position": 0.6,
+        "signal_frequency_seconds": 60,
+    },
+]
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("execution", EXECUTION)
+def test_vectorized_engine_matches_tick_engine(seed: int, execution: Dict[str, Any]) -> None:
+    arrays = seeded_series(seed)
+    request = BacktestRequest(
+        data_id="data_test",
+        strategy_id="ma_crossover",
+        strategy_params={"short_window": 3, "long_window": 15, "min_strength": 0.0005},
+        **execution,
+    )
+    strategy_cls = STRATEGY_REGISTRY.get(request.strategy_id)
+
+    simulation = TickBacktest(request, strategy_cls(**request.strategy_params))
+    trades = []
+    # 分块推进，与回测任务的调用方式一致
+    for start in range(0, len(arrays.prices), 700):
+        trades.extend(simulation.advance(slice_arrays(arrays, start, start + 700)))
+
+    result = run_vectorized_backtest(request, strategy_cls(**request.strategy_params), arrays)
+    assert trades, "the series should produce trades"
+    assert result.trades == trades
+    assert result.metrics == simulation.metrics()
+
+
+def test_metrics_only_run_matches_full_run() -> None:
+    arrays = seeded_series(11)
+    request = BacktestRequest(data_id="data_test", strategy_id="ma_crossover", lot_size=5, max_position=0.8)
+    strategy_cls = STRATEGY_REGISTRY.get(request.strategy_id)
+    full = run_vectorized_backtest(request, strategy_cls(), arrays)
+    metrics_only = run_vectorized_backtest(
+        request, strategy_cls(), PriceArrays(arrays.timestamps, arrays.prices, labels=[]), collect_trades=False
+    )
+    assert metrics_only.trades == []
+    assert metrics_only.metrics == full.metrics
+    assert np.isfinite(full.metrics["total_return"])
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from app.services.bars import BAR_FIELDS, BarAggregator, resample_bars
+
+_SECOND = 1_000_000_000
+
+
+def random_ticks(seed: int, length: int = 3000, seconds: int = 300) -> Tuple[np.ndarray, np.ndarray]:
+    """Ticks with mixed steps: some gaps span several bars and some ticks fall exactly on a bar boundary."""
+    rng = np.random.default_rng(seed)
+    prices = np.round(100.0 + np.cumsum(rng.normal(0.0, 0.5, length)), 2)
+    gaps = rng.choice([0, 1, 13, 45, 120, seconds * 3 + 7], size=length, p=[0.05, 0.3, 0.3, 0.2, 0.1, 0.05])
+    offsets = np.cumsum(gaps).astype(np.int64)
+    # 部分 tick 对齐到 K 线起点
+    aligned = rng.random(length) < 0.05
+    offsets[aligned] = offsets[aligned] // seconds * seconds
+    offsets = np.maximum.accumulate(offsets)
+    return prices, (1_735_689_600 + offsets) * _SECOND
+
+
+@pytest.mark.parametrize("seconds", [60, 300, 3600])
+@pytest.mark.parametrize("seed", range(3))
+def test_resample_matches_aggregator(seconds: int, seed: int) -> None:
+    prices, timestamps = random_ticks(seed, seconds=seconds)
+    series = resample_bars(prices, timestamps, seconds)
+    seen = {field: series.at_ticks(getattr(series, field)) for field in BAR_FIELDS}
+    aggregator = BarAggregator(seconds, history=len(prices))
+
+    for index, (price, timestamp) in enumerate(zip(prices.tolist(), timestamps.tolist())):
+        aggregator.update(price, timestamp)
+        last = aggregator.last
+        for field in BAR_FIELDS:
+            if last is None:
+                assert np.isnan(seen[field][index])
+            else:
+                assert seen[field][index] == getattr(last, field)
+        # 进行中的 K 线与批量结果中该 tick 所在的 K 线一致
+        bar = series.tick_bar[index]
+        current = aggregator.current
+        assert current.start == series.start[bar]
+        assert current.open == series.open[bar]
+        assert current.close == price
+        assert current.count == index - np.searchsorted(series.tick_bar, bar) + 1
+
+    assert list(aggregator.history) == [
+        (start, open_, high, low, close, count)
+        for start, open_, high, low, close, count in zip(
+            series.start[:-1].tolist(),
+            series.open[:-1].tolist(),
+            series.high[:-1].tolist(),
+            series.low[:-1].tolist(),
+            series.close[:-1].tolist(),
+            series.count[:-1].tolist(),
+        )
+    ]
+
+
+def test_tick_on_boundary_starts_a_new_bar() -> None:
+    start = 1_735_689_600 * _SECOND
+    timestamps = np.array([start + 59 * _SECOND, start + 60 * _SECOND, start + 119 * _SECOND, start + 120 * _SECOND])
+    prices = np.array([1.0, 2.0, 3.0, 4.0])
+    series = resample_bars(prices, timestamps, 60)
+    assert series.tick_bar.tolist() == [0, 1, 1, 2]
+    assert series.close.tolist() == [1.0, 3.0, 4.0]
+    # 边界 tick 看到的是刚完成的 K 线
+    assert series.at_ticks(series.close)[1:].tolist() == [1.0, 1.0, 3.0]
+
+    aggregator = BarAggregator(60)
+    assert aggregator.update(1.0, int(timestamps[0])) is None
+    assert aggregator.update(2.0, int(timestamps[1])).close == 1.0
+    assert aggregator.update(3.0, int(timestamps[2])) is None
+    assert aggregator.update(4.0, int(timestamps[3])).close == 3.0
+
+
+def test_gap_spanning_several_bars_completes_one_bar() -> None:
+    start = 1_735_689_600 * _SECOND
+    timestamps = np.array([start, start + 10 * _SECOND, start + 1000 * _SECOND])
+    series = resample_bars(np.array([5.0, 6.0, 7.0]), timestamps, 60)
+    # 空白区间不产生 K 线
+    assert series.count.tolist() == [2, 1]
+    assert series.start.tolist() == [start, start + 960 * _SECOND]
+    assert np.isnan(series.at_ticks(series.close)[:2]).all()
+    assert series.at_ticks(series.close)[2] == 6.0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_no_look_ahead(seed: int) -> None:
+    prices, timestamps = random_ticks(seed)
+    full = resample_bars(prices, timestamps, 300)
+    rng = np.random.default_rng(seed)
+    for cut in rng.integers(1, len(prices), 20).tolist():
+        # 截断后的数据与完整数据在截断前的每个 tick 上给出相同的值
+        prefix = resample_bars(prices[:cut], timestamps[:cut], 300)
+        for field in BAR_FIELDS:
+            np.testing.assert_array_equal(
+                prefix.at_ticks(getattr(prefix, field)), full.at_ticks(getattr(full, field))[:cut]
+            )
+        # 修改之后的价格不影响之前的值
+        changed = prices.copy()
+        changed[cut:] += 50.0
+        altered = resample_bars(changed, timestamps, 300)
+        np.testing.assert_array_equal(altered.at_ticks(altered.close)[:cut], full.at_ticks(full.close)[:cut])
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Iterator, Tuple
+
+import numpy as np
+import pytest
+
+from app.services.strategies.base import STRATEGY_REGISTRY, restore_strategy
+from app.services.strategies.dsl import RuleSyntaxError, compile_rules
+from app.services.strategies.rule_based import RuleStrategyStore, build_rule_strategy
+
+
+def random_series(seed: int, length: int = 4000) -> Tuple[np.ndarray, np.ndarray]:
+    """Random walk with mixed time steps (epoch nanoseconds), some spanning several bars."""
+    rng = np.random.default_rng(seed)
+    prices = np.maximum(np.round(100.0 + np.cumsum(rng.normal(0.0, 0.5, length)), 2), 1.0)
+    gaps = rng.choice([1, 7, 30, 60, 300, 5400], size=length, p=[0.3, 0.2, 0.2, 0.2, 0.08, 0.02])
+    timestamps = (1_735_689_600 + np.cumsum(gaps)) * 1_000_000_000
+    return prices, timestamps.astype(np.int64)
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        "buy when price > sma=10",
+        "buy when price > sma(5) and not > 3",
+        "buy when price > 1 ; sell when price > 2 and",
+        "buy when price > sma(price=5)",
+        "buy when price > sma(and=5)",
+        "buy when rsi(period=14) < 30; sell when sma(period=20) > price",
+        "buy when price > sma(50)@0",
+        "buy when price > sma(50)@1.5s",
+        "buy when price > sma(50)@-1h",
+        "buy when price > close",
+        "buy when sma(2.5) > 1",
+        "hold when price > 1",
+        "",
+    ],
+)
+def test_invalid_rules_raise(rules: str) -> None:
+    with pytest.raises(RuleSyntaxError):
+        compile_rules(rules)
+
+
+def test_strength_is_reserved_for_rule_strategies() -> None:
+    with pytest.raises(ValueError):
+        build_rule_strategy("rule_strength", "Strength", "buy when price > strength=5")
+
+
+def test_parameters_are_named_after_function_and_argument() -> None:
+    program = compile_rules("buy when sma(5) crosses_above sma(20)\nsell when sma(5) crosses_below sma(20) or rsi() > ob=80")
+    assert [(item.name, item.default) for item in program.parameters] == [
+        ("sma_period", 5),
+        ("sma_period_2", 20),
+        ("rsi_period", 14),
+        ("ob", 80.0),
+    ]
+    # 相同数值共用参数与指标
+    assert len(program.slots) == 3
+
+
+def test_reused_parameter_name_shares_value() -> None:
+    program = compile_rules("buy when price > sma(n=10); sell when price < ema(n=10)")
+    assert [item.name for item in program.parameters] == ["n"]
+
+
+RULES = [
+    "buy when sma(5) crosses_above sma(20) and rsi(14) < 70\nsell when sma(5) crosses_below sma(20) or rsi() > 80",
+    "buy when macd() crosses_above macd_signal(); sell when macd_hist() < -0.2",
+    "buy when price < bb_lower(20, 2) ; sell when price > bb_upper(20, 2) or price crosses_below bb_middle(20, 2)",
+    "buy when zscore(30) < -1.5 and not (std(30) > 3)\nsell when not zscore(30) < 1.5",
+    "buy when (ema(10) - wma(10)) / std(10) crosses_above 0.1\nsell when -ema(10) * 2 + 1 > -wma(3) * 2 or ema(10) / 0 > 1",
+    "buy when price > highest(50) - 0.5 ; sell when price <= lowest(50) + 0.5",
+    "buy when sma(3)@5m crosses_above sma(10)@5m and price > close@5m\nsell when price < sma(20)@1h or rsi(5)@5m > 75",
+    "buy when macd()@5m > macd_signal()@5m and price > bb_middle(10, 2)@1h\nsell when high@1h - low@1h > 4 or open@5m > price + 2",
+]
+
+
+@pytest.mark.parametrize("rules", RULES)
+@pytest.mark.parametrize("seed", range(2))
+def test_vector_matches_scalar(rules: str, seed: int) -> None:
+    prices, timestamps = random_series(seed)
+    program = compile_rules(rules)
+    parameters = {item.name: item.default for item in program.parameters}
+    buy, sell = program.evaluate(prices, parameters, timestamps)
+
+    evaluator = program.evaluator(parameters)
+    steps = [evaluator.step(price, timestamp) for price, timestamp in zip(prices.tolist(), timestamps.tolist())]
+    assert buy.any() or sell.any()
+    assert buy.tolist() == [item[0] for item in steps]
+    assert sell.tolist() == [item[1] for item in steps]
+
+
+@pytest.fixture
+def registered() -> Iterator[list]:
+    strategy_ids: list = []
+    yield strategy_ids
+    for strategy_id in strategy_ids:
+        STRATEGY_REGISTRY.unregister(strategy_id)
+
+
+@pytest.mark.parametrize("index", range(len(RULES)))
+def test_state_round_trip(index: int, registered: list) -> None:
+    strategy_cls = build_rule_strategy(f"rule_state_{index}", "State", RULES[index])
+    STRATEGY_REGISTRY.register(strategy_cls)
+    registered.append(strategy_cls.strategy_id)
+    prices, timestamps = random_series(index)
+    times = [datetime.fromtimestamp(value / 1e9, tz=timezone.utc) for value in timestamps.tolist()]
+    split = 2500
+
+    reference = strategy_cls()
+    expected = [reference.generate_signal(price, time) for price, time in zip(prices.tolist(), times)]
+
+    # 先批量计算再保存，检验批量路径留下的状态
+    first = strategy_cls()
+    first.generate_signals(prices[:split], timestamps[:split])
+    restored = restore_strategy(first.dump_state(), strategy_cls.strategy_id)
+    resumed = [restored.generate_signal(price, time) for price, time in zip(prices[split:].tolist(), times[split:])]
+    assert resumed == expected[split:]
+
+
+def test_store_create_and_delete(tmp_path, registered: list) -> None:
+    path = tmp_path / "rule_strategies.json"
+    store = RuleStrategyStore(path)
+    rules = "buy when price < bb_lower(20, 2); sell when price > bb_upper(20, 2)"
+    registered.append("rule_store_test")
+
+    strategy_cls = store.create("rule_store_test", "Bollinger", rules, description="test")
+    assert path.exists()
+    assert STRATEGY_REGISTRY.get("rule_store_test").program.source == rules
+    assert [item.name for item in strategy_cls.parameter_definitions()] == ["bb_period", "bb_width", "strength"]
+    assert store.definitions["rule_store_test"] == {"name": "Bollinger", "rules": rules, "description": "test"}
+    with pytest.raises(ValueError):
+        store.create("rule_store_test", "Again", rules)
+    with pytest.raises(ValueError):
+        store.create("ma_crossover", "Taken", rules)
+    with pytest.raises(ValueError):
+        store.create("rule_store_bad", "Bad", "buy when")
+
+    # 另一个进程中的存储从文件读取同样的定义
+    other = RuleStrategyStore(path)
+    other.sync(force=True)
+    assert other.definitions == store.definitions
+
+    store.delete("rule_store_test")
+    with pytest.raises(KeyError):
+        STRATEGY_REGISTRY.get("rule_store_test")
+    other.sync(force=True)
+    assert other.definitions == {}
+    with pytest.raises(ValueError):
+        store.delete("ma_crossover")
+    with pytest.raises(KeyError):
+        store.delete("rule_store_missing")
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+import numpy as np
+import pytest
+
+from app.services.indicators import (
+    ATR,
+    EMA,
+    MACD,
+    RSI,
+    SMA,
+    WMA,
+    BollingerBands,
+    Indicator,
+    RollingMax,
+    RollingMin,
+    RollingStd,
+    ZScore,
+)
+
+
+def random_walk(seed: int, length: int = 2000) -> np.ndarray:
+    """Random walk with flat stretches, so zero ranges and zero variance occur."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.5, length)
+    steps[rng.random(length) < 0.25] = 0.0
+    steps[500:540] = 0.0
+    return np.round(100.0 + np.cumsum(steps), 2)
+
+
+def _streamed(values: List[Optional[Any]], outputs: int) -> List[np.ndarray]:
+    """Per-output arrays of `update()` results, with NaN where the indicator was not ready."""
+    columns = [np.full(len(values), np.nan) for _ in range(outputs)]
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        for column, item in zip(columns, value if isinstance(value, tuple) else (value,)):
+            column[index] = item
+    return columns
+
+
+def _assert_same(streamed: List[np.ndarray], computed: Any) -> None:
+    computed = computed if isinstance(computed, tuple) else (computed,)
+    assert len(streamed) == len(computed)
+    for expected, actual in zip(computed, streamed):
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+INDICATORS = [
+    lambda: SMA(1),
+    lambda: SMA(20),
+    lambda: EMA(12),
+    lambda: EMA(5, alpha=0.3),
+    lambda: WMA(10),
+    lambda: RSI(14),
+    lambda: RSI(2),
+    lambda: MACD(12, 26, 9),
+    lambda: MACD(26, 12, 5),
+    lambda: RollingStd(20),
+    lambda: RollingStd(10, ddof=1),
+    lambda: ZScore(30),
+    lambda: BollingerBands(20, 2.0),
+    lambda: RollingMax(15),
+    lambda: RollingMin(15),
+    lambda: ATR(14),
+]
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("factory", INDICATORS)
+def test_update_matches_compute(factory, seed: int) -> None:
+    prices = random_walk(seed)
+    indicator: Indicator = factory()
+    computed = factory().compute(prices)
+    outputs = len(computed) if isinstance(computed, tuple) else 1
+    streamed = _streamed([indicator.update(price) for price in prices.tolist()], outputs)
+    _assert_same(streamed, computed)
+    # 第一个输出出现在第 warmup 个值
+    assert np.flatnonzero(~np.isnan(streamed[0]))[0] == indicator.warmup - 1
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_atr_bars_update_matches_compute(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    close = random_walk(seed, 1500)
+    high = close + np.round(rng.random(len(close)) * 2.0, 2)
+    low = close - np.round(rng.random(len(close)) * 2.0, 2)
+    # 跳空：最高价低于前一收盘价、最低价高于前一收盘价
+    high[700], low[700] = close[699] - 5.0, close[699] - 6.0
+    high[701], low[701] = close[700] + 6.0, close[700] + 5.0
+
+    indicator = ATR(14)
+    streamed = _streamed(
+        [indicator.update(h, l, c) for h, l, c in zip(high.tolist(), low.tolist(), close.tolist())], 1
+    )
+    _assert_same(streamed, ATR(14).compute(high, low, close))
+
+
+def test_reset_restarts_warm_up() -> None:
+    prices = random_walk(9, 300)
+    indicator = MACD()
+    for price in prices.tolist():
+        indicator.update(price)
+    indicator.reset()
+    assert indicator.value is None
+    streamed = _streamed([indicator.update(price) for price in prices.tolist()], 3)
+    _assert_same(streamed, MACD().compute(prices))
+
+
+@pytest.mark.parametrize(
+    "factory", [lambda: SMA(20, exact=True), lambda: WMA(10, exact=True), lambda: RollingStd(10, ddof=1, exact=True)]
+)
+def test_exact_compute_is_bit_identical_to_update(factory) -> None:
+    prices = random_walk(4)
+    indicator: Indicator = factory()
+    streamed = _streamed([indicator.update(price) for price in prices.tolist()], 1)
+    np.testing.assert_array_equal(streamed[0], factory().compute(prices))
+
+
+def test_float_compute_tracks_exact_on_long_drifting_series() -> None:
+    rng = np.random.default_rng(5)
+    steps = rng.normal(0.0, 0.5, 200_000)
+    steps[rng.random(len(steps)) < 0.5] = 0.0
+    prices = 1000.0 + np.cumsum(steps)
+    for factory in (SMA, WMA, RollingStd, ZScore):
+        fast, exact = factory(20).compute(prices), factory(20, exact=True).compute(prices)
+        np.testing.assert_allclose(fast, exact, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    # 平坦区间与精确结果逐位一致：均线相等、波动为零，比较不会被舍入翻转
+    flat = random_walk(6)[480:600]
+    short, long = SMA(5).compute(flat), SMA(20).compute(flat)
+    np.testing.assert_array_equal(short[38:60], flat[38:60])
+    np.testing.assert_array_equal(long[38:60], flat[38:60])
+    assert (RollingStd(20).compute(flat)[38:60] == 0.0).all()
+    assert (ZScore(20).compute(flat)[38:60] == 0.0).all()
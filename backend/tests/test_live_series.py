@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from app.services.data_tasks import DataTaskManager
+from app.utils import segmented_series
+from app.utils.file_storage import count_series_rows, write_series
+from app.utils.segmented_series import MIN_SEGMENT_POINTS, SegmentedSeries, segment_points
+
+HEADER = ["timestamp", "price"]
+
+
+def row(index: int) -> Dict[str, Any]:
+    return {"timestamp": f"2025-01-01T00:{index // 60 % 60:02d}:{index % 60:02d}+00:00", "price": str(100 + index)}
+
+
+def read_all(series: SegmentedSeries, chunk_size: int = 100) -> List[Dict[str, Any]]:
+    return [item for rows in series.iter_rows(chunk_size) for item in rows]
+
+
+def test_segment_points() -> None:
+    assert segment_points(None) == segmented_series.SEGMENT_POINTS
+    assert segment_points(100) == MIN_SEGMENT_POINTS
+    assert segment_points(8000) == 1000
+    assert segment_points(10**9) == segmented_series.SEGMENT_POINTS
+
+
+@pytest.mark.parametrize("max_points", [1, 300, 1000, 2049])
+def test_retained_window_matches_max_points_across_rollovers(tmp_path: Path, max_points: int) -> None:
+    series = SegmentedSeries(tmp_path / "task", max_points)
+    series.create({"task_id": "task"}, HEADER)
+    total = max_points * 3 + series.segment_size + 7
+    for index in range(total):
+        series.append(row(index))
+        appended = index + 1
+        if appended % 97 and appended != total:
+            continue
+        visible = min(appended, max_points)
+        assert series.count() == visible
+        assert read_all(series) == [row(item) for item in range(appended - visible, appended)]
+        # 保留策略只在分段写满时执行：磁盘上多保留的行少于两个分段
+        on_disk = sum(count_series_rows(path) for path in series.segments())
+        assert on_disk < visible + 2 * series.segment_size
+
+    assert len(series.segments()) > 1
+    # 重启后从磁盘统计，看到的窗口不变
+    reopened = SegmentedSeries(tmp_path / "task", max_points)
+    assert reopened.count() == max_points
+    assert read_all(reopened, chunk_size=max_points) == [row(item) for item in range(total - max_points, total)]
+    reopened.append(row(total))
+    assert read_all(reopened)[-1] == row(total) and reopened.count() == max_points
+
+
+def test_unbounded_series_keeps_every_row(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(segmented_series, "SEGMENT_POINTS", 50)
+    series = SegmentedSeries(tmp_path / "task")
+    series.create({"task_id": "task"}, HEADER)
+    for index in range(230):
+        series.append(row(index))
+    assert [path.name for path in series.segments()] == [f"{index:08d}.csv" for index in range(5)]
+    assert series.count() == 230
+    assert read_all(series, chunk_size=33) == [row(index) for index in range(230)]
+    assert series.read_config() == {"task_id": "task"}
+
+
+def legacy_config(task_id: str, max_points: int | None = None) -> Dict[str, Any]:
+    return {
+        "task_id": task_id,
+        "symbol": "LEGACY.US",
+        "session": "regular",
+        "is_permanent": True,
+        "max_points": max_points,
+        "status": "running",
+        "created_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+def test_legacy_single_file_capture_is_migrated(tmp_path: Path) -> None:
+    live_dir = tmp_path / "live"
+    live_dir.mkdir()
+    rows = [row(index) for index in range(25_000)]
+    write_series(live_dir / "task_legacy.csv", legacy_config("task_legacy"), rows)
+    write_series(live_dir / "task_bounded.csv", legacy_config("task_bounded", max_points=500), rows[:800])
+
+    manager = DataTaskManager(tmp_path)
+    assert not list(live_dir.glob("task_*.csv"))
+    state = manager.tasks["task_legacy"]
+    assert state.data_dir == live_dir / "task_legacy"
+    assert [path.name for path in state.series.segments()] == ["00000000.csv"]
+    assert state.series.count() == len(rows)
+    assert read_all(state.series, chunk_size=5000) == rows
+    assert state.config.symbol == "LEGACY.US" and state.status.value == "paused"
+
+    # 迁移后的采集继续追加到新的分段
+    state.series.append(row(25_000))
+    assert len(state.series.segments()) == 2
+    assert read_all(state.series, chunk_size=5000) == [*rows, row(25_000)]
+
+    bounded = manager.tasks["task_bounded"]
+    assert bounded.series.count() == 500
+    assert read_all(bounded.series) == rows[300:800]
+
+    # 再次启动不重复迁移
+    restarted = DataTaskManager(tmp_path)
+    assert restarted.tasks["task_legacy"].series.count() == len(rows) + 1
+
+
+def test_migration_does_not_overwrite_existing_segments(tmp_path: Path) -> None:
+    live_dir = tmp_path / "live"
+    existing = SegmentedSeries(live_dir / "task_both")
+    existing.create(legacy_config("task_both"), HEADER)
+    existing.append(row(0))
+    write_series(live_dir / "task_both.csv", legacy_config("task_both"), [row(1), row(2)])
+
+    manager = DataTaskManager(tmp_path)
+    assert read_all(manager.tasks["task_both"].series) == [row(0)]
+    assert (live_dir / "task_both.csv").exists()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.utils import log_writer
+from app.utils.log_writer import BufferedLogWriter, LogWriterRegistry
+
+
+@pytest.fixture
+def clock(monkeypatch) -> List[float]:
+    now = [1000.0]
+    monkeypatch.setattr(log_writer.time, "monotonic", lambda: now[0])
+    return now
+
+
+def read(path: Path) -> str:
+    return path.read_text(encoding="utf-8")
+
+
+def test_flushes_when_row_threshold_is_reached(tmp_path: Path, clock: List[float]) -> None:
+    path = tmp_path / "rows.log"
+    writer = BufferedLogWriter(path, flush_rows=3, flush_interval=60.0)
+    writer.write("a\n")
+    writer.write("b\n")
+    assert read(path) == ""
+    writer.write("c\n")
+    assert read(path) == "a\nb\nc\n"
+    writer.write("d\n")
+    assert read(path) == "a\nb\nc\n"
+    writer.close()
+    assert read(path) == "a\nb\nc\nd\n"
+    assert writer.closed
+
+
+def test_flushes_when_interval_has_passed(tmp_path: Path, clock: List[float]) -> None:
+    path = tmp_path / "interval.log"
+    writer = BufferedLogWriter(path, flush_rows=100, flush_interval=1.0)
+    writer.write("a\n")
+    clock[0] += 0.5
+    writer.write("b\n")
+    assert read(path) == ""
+    clock[0] += 0.5
+    writer.write("c\n")
+    assert read(path) == "a\nb\nc\n"
+
+    # 没有新行写入时，由生产者在分块之间检查间隔
+    writer.write("d\n")
+    writer.flush_if_due()
+    assert read(path) == "a\nb\nc\n"
+    clock[0] += 1.0
+    writer.flush_if_due()
+    assert read(path) == "a\nb\nc\nd\n"
+    writer.close()
+
+
+def test_append_mode_keeps_existing_lines(tmp_path: Path) -> None:
+    path = tmp_path / "append.log"
+    path.write_text("header\n", encoding="utf-8")
+    writer = BufferedLogWriter(path, mode="a")
+    writer.writelines(["a\n", "b\n"])
+    assert read(path) == "header\na\nb\n"
+    writer.close()
+    writer.close()
+
+
+def test_registry_flushes_and_closes_task_writers(tmp_path: Path, clock: List[float]) -> None:
+    registry = LogWriterRegistry()
+    trades = registry.open("task_a", "trades", tmp_path / "a_trades.log", flush_interval=1.0)
+    signals = registry.open("task_a", "signals", tmp_path / "a_signals.log", flush_interval=1.0)
+    other = registry.open("task_b", "trades", tmp_path / "b_trades.log", flush_interval=1.0)
+    for writer in (trades, signals, other):
+        writer.write("line\n")
+    assert registry.get("task_a", "trades") is trades
+    assert registry.get("task_a", "missing") is None
+
+    registry.flush_due("task_a")
+    assert read(tmp_path / "a_trades.log") == ""
+    clock[0] += 1.0
+    registry.flush_due("task_a")
+    assert read(tmp_path / "a_trades.log") == read(tmp_path / "a_signals.log") == "line\n"
+
+    trades.write("more\n")
+    registry.flush_task("task_a")
+    assert read(tmp_path / "a_trades.log") == "line\nmore\n"
+    # 其他任务的缓冲不受影响
+    assert read(tmp_path / "b_trades.log") == ""
+
+    signals.write("last\n")
+    registry.close_task("task_a")
+    assert trades.closed and signals.closed and not other.closed
+    assert read(tmp_path / "a_signals.log") == "line\nlast\n"
+    assert registry.get("task_a", "trades") is None
+    registry.flush_task("task_a")
+    registry.close_task("task_a")
+
+    # 重新打开同名日志时关闭旧的写入器
+    reopened = registry.open("task_b", "trades", tmp_path / "b_trades.log", mode="a")
+    assert other.closed and read(tmp_path / "b_trades.log") == "line\n"
+    reopened.close()
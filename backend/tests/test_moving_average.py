@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from statistics import mean
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from app.models import SignalType
+from app.services.strategies.base import SIGNAL_CODES
+from app.services.strategies.moving_average import MovingAverageStrategy
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def random_series(seed: int, length: int = 3000) -> Tuple[np.ndarray, List[datetime]]:
+    """Random walk with flat stretches, rounded prices and mixed time steps."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.4, length)
+    steps[rng.random(length) < 0.3] = 0.0
+    prices = np.round(100.0 + np.cumsum(steps), 2)
+    prices = np.maximum(prices, 1.0)
+    gaps = rng.choice([1, 1, 5, 60, 3600], size=length)
+    start = datetime(2025, 1, 2, 14, 30, tzinfo=timezone.utc)
+    timestamps = [start + timedelta(seconds=int(offset)) for offset in np.cumsum(gaps)]
+    return prices, timestamps
+
+
+def baseline_signals(prices: np.ndarray, short_window: int, long_window: int, min_strength: float) -> List[Tuple[int, float]]:
+    """The original statistics.mean formulation of the strategy."""
+    history: deque = deque(maxlen=long_window)
+    previous_spread = None
+    result = []
+    for price in prices.tolist():
+        history.append(price)
+        if len(history) < long_window:
+            result.append((SIGNAL_CODES[SignalType.HOLD], 0.0))
+            continue
+        short_avg = mean(list(history)[-short_window:])
+        long_avg = mean(list(history))
+        spread = short_avg - long_avg
+        normalized = max(min(spread / long_avg, 1.0), -1.0)
+        if abs(normalized) < min_strength:
+            signal, strength = SignalType.HOLD, 0.0
+        elif spread > 0:
+            signal, strength = SignalType.BUY, normalized
+        else:
+            signal, strength = SignalType.SELL, normalized
+        if previous_spread is not None:
+            if spread > 0 >= previous_spread:
+                signal = SignalType.BUY
+                strength = min_strength if abs(normalized) < min_strength else normalized
+            elif spread < 0 <= previous_spread:
+                signal = SignalType.SELL
+                strength = -min_strength if abs(normalized) < min_strength else normalized
+        previous_spread = spread
+        result.append((SIGNAL_CODES[signal], strength))
+    return result
+
+
+PARAMETERS = [
+    (5, 20, 0.0),
+    (5, 20, 0.001),
+    (2, 5, 0.0005),
+    (12, 60, 0.002),
+    (50, 200, 0.0),
+    # 短窗口大于长窗口时按长窗口计算
+    (30, 10, 0.001),
+]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("short_window,long_window,min_strength", PARAMETERS)
+def test_matches_statistics_mean_baseline(seed: int, short_window: int, long_window: int, min_strength: float) -> None:
+    prices, timestamps = random_series(seed)
+    expected = baseline_signals(prices, short_window, long_window, min_strength)
+    parameters = {"short_window": short_window, "long_window": long_window, "min_strength": min_strength}
+
+    strategy = MovingAverageStrategy(**parameters)
+    scalar = [strategy.generate_signal(price, timestamp) for price, timestamp in zip(prices.tolist(), timestamps)]
+    assert [(SIGNAL_CODES[signal.signal], signal.strength) for signal in scalar] == expected
+
+    epoch_ns = np.array([(timestamp - _EPOCH) // timedelta(microseconds=1) * 1000 for timestamp in timestamps])
+    signals, strengths = MovingAverageStrategy(**parameters).generate_signals(prices, epoch_ns)
+    assert list(zip(signals.tolist(), strengths.tolist())) == expected
+
+
+def test_batch_then_scalar_continues_the_series() -> None:
+    prices, timestamps = random_series(7, 1000)
+    parameters = {"short_window": 5, "long_window": 20, "min_strength": 0.001}
+    expected = baseline_signals(prices, 5, 20, 0.001)
+
+    strategy = MovingAverageStrategy(**parameters)
+    epoch_ns = np.arange(600, dtype=np.int64)
+    signals, strengths = strategy.generate_signals(prices[:600], epoch_ns)
+    tail = [strategy.generate_signal(price, timestamp) for price, timestamp in zip(prices[600:].tolist(), timestamps[600:])]
+    combined = list(zip(signals.tolist(), strengths.tolist())) + [(SIGNAL_CODES[s.signal], s.strength) for s in tail]
+    assert combined == expected
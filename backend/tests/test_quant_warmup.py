@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import LiveDataTaskRequest, QuantTaskRequest
+from app.services import quant_trading
+from app.services.data_tasks import DATA_TASKS, LiveDataTaskState
+from app.services.quant_trading import QuantTaskState, QuantTradingManager
+from app.services.series_store import read_price_arrays
+from app.services.strategies.base import restore_strategy
+from app.services.strategies.moving_average import MovingAverageStrategy
+
+_START = datetime(2025, 1, 2, 14, 30, tzinfo=timezone.utc)
+_PARAMS = {"short_window": 5, "long_window": 40, "min_strength": 0.0}
+
+
+def random_prices(seed: int, length: int) -> List[float]:
+    rng = np.random.default_rng(seed)
+    return np.round(100.0 + np.cumsum(rng.normal(0.0, 0.4, length)), 2).tolist()
+
+
+def signals_of(strategy: MovingAverageStrategy, prices: List[float]) -> List[tuple]:
+    results = []
+    for index, price in enumerate(prices):
+        signal = strategy.generate_signal(price, _START + timedelta(seconds=index))
+        results.append((signal.signal, signal.strength))
+    return results
+
+
+def request(**overrides) -> QuantTaskRequest:
+    values = {"strategy_id": "ma_crossover", "strategy_params": _PARAMS, "symbol": "WARM.US", "session": "regular"}
+    return QuantTaskRequest(**{**values, **overrides})
+
+
+@pytest.fixture
+def manager(tmp_path: Path) -> QuantTradingManager:
+    return QuantTradingManager(tmp_path / "quant")
+
+
+@pytest.fixture
+def live_task() -> Iterator[LiveDataTaskState]:
+    """A live capture task with stored rows, as left behind by the capture runner."""
+    config = LiveDataTaskRequest(symbol="WARM.US", session="regular", is_permanent=True)
+    state = LiveDataTaskState(task_id="task_warmup", config=config, data_dir=DATA_TASKS.live_dir / "task_warmup")
+    state.series.create({**config.dict(), "task_id": state.task_id}, ["timestamp", "price"])
+    for index, price in enumerate(random_prices(7, 900)):
+        state.series.append({"timestamp": (_START + timedelta(seconds=index)).isoformat(), "price": price})
+    DATA_TASKS.tasks[state.task_id] = state
+    yield state
+    DATA_TASKS.delete_task(state.task_id)
+
+
+def assert_warmed_like_replay(strategy: MovingAverageStrategy, history: List[float]) -> None:
+    # 预热后的策略与逐个输入同样历史价格的策略给出相同的后续信号
+    replay = MovingAverageStrategy(**_PARAMS)
+    signals_of(replay, history)
+    following = random_prices(99, 300)
+    assert signals_of(strategy, following) == signals_of(replay, following)
+
+
+def test_warm_up_from_data_id(client: TestClient, manager: QuantTradingManager) -> None:
+    response = client.post("/data/simulated", json={"symbol": "WARM.US", "data_points": 2000, "seed": 3})
+    data_id = response.json()["data_id"]
+    prices = read_price_arrays(DATA_TASKS.series_path(data_id)).prices.tolist()
+
+    strategy = MovingAverageStrategy(**_PARAMS)
+    assert manager._warm_up(strategy, request(warmup_data_id=data_id, warmup_points=600)) == 600
+    assert_warmed_like_replay(strategy, prices[-600:])
+
+    # 请求的点数超过序列长度时使用全部数据
+    strategy = MovingAverageStrategy(**_PARAMS)
+    assert manager._warm_up(strategy, request(warmup_data_id=data_id, warmup_points=10_000)) == len(prices)
+    assert_warmed_like_replay(strategy, prices)
+
+
+def test_warm_up_from_snapshot(manager: QuantTradingManager, live_task: LiveDataTaskState) -> None:
+    snapshot = DATA_TASKS.create_snapshot(live_task.task_id, start_index=100, end_index=699)
+    prices = random_prices(7, 900)[100:700]
+
+    strategy = MovingAverageStrategy(**_PARAMS)
+    assert manager._warm_up(strategy, request(warmup_data_id=snapshot.data_id, warmup_points=250)) == 250
+    assert_warmed_like_replay(strategy, prices[-250:])
+    DATA_TASKS.delete_snapshot_data(snapshot.data_id)
+
+
+def test_warm_up_from_live_capture(manager: QuantTradingManager, live_task: LiveDataTaskState) -> None:
+    prices = random_prices(7, 900)
+    manager._ensure_warmup_source(request(warmup_from_live=True))
+
+    strategy = MovingAverageStrategy(**_PARAMS)
+    assert manager._warm_up(strategy, request(warmup_from_live=True, warmup_points=333)) == 333
+    assert_warmed_like_replay(strategy, prices[-333:])
+
+    strategy = MovingAverageStrategy(**_PARAMS)
+    assert manager._warm_up(strategy, request(warmup_from_live=True)) == len(prices)
+    assert_warmed_like_replay(strategy, prices)
+
+
+def test_warm_up_source_errors(manager: QuantTradingManager) -> None:
+    with pytest.raises(FileNotFoundError):
+        manager._ensure_warmup_source(request(warmup_data_id="data_missing"))
+    with pytest.raises(ValueError):
+        manager._ensure_warmup_source(request(warmup_from_live=True, symbol="NONE.US"))
+    with pytest.raises(ValueError):
+        request(warmup_data_id="data_x", warmup_from_live=True)
+    assert manager._warm_up(MovingAverageStrategy(**_PARAMS), request()) == 0
+
+
+def run_ticks(manager: QuantTradingManager, state: QuantTaskState, prices: List[float], monkeypatch) -> None:
+    """Run the trading loop over `prices`; the feed fails afterwards, which ends the task."""
+    feed = iter(prices)
+
+    async def fetch_price(*args):
+        price = next(feed, None)
+        if price is None:
+            raise RuntimeError("feed exhausted")
+        return price, _START
+
+    async def fetch_amount(*args):
+        return 0.0
+
+    async def no_sleep(delay):
+        await original_sleep(0)
+
+    original_sleep = asyncio.sleep
+    monkeypatch.setattr(manager, "_fetch_symbol_price", fetch_price)
+    monkeypatch.setattr(manager, "_fetch_available_cash", fetch_amount)
+    monkeypatch.setattr(manager, "_fetch_position", fetch_amount)
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    asyncio.run(manager._run_quant(state))
+
+
+@pytest.mark.parametrize("interval, saves", [(3600.0, 1), (0.0, 51)])
+def test_state_saves_are_throttled(manager: QuantTradingManager, monkeypatch, interval: float, saves: int) -> None:
+    state = QuantTaskState(
+        task_id="quant_throttle",
+        request=request(),
+        log_path=manager.log_dir / "quant_throttle.log",
+        state_path=manager.log_dir / "quant_throttle.state",
+    )
+    writes = []
+    original = QuantTradingManager._write_strategy_state
+    monkeypatch.setattr(quant_trading, "STATE_SAVE_INTERVAL", interval)
+    monkeypatch.setattr(
+        QuantTradingManager,
+        "_write_strategy_state",
+        staticmethod(lambda path, data: writes.append(1) or original(path, data)),
+    )
+    prices = random_prices(11, 50)
+    run_ticks(manager, state, prices, monkeypatch)
+
+    # 间隔内不写文件，任务结束时保存一次
+    assert len(writes) == saves
+    restored = restore_strategy(state.state_path.read_bytes(), "ma_crossover")
+    assert_warmed_like_replay(restored, prices)
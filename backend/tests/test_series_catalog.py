@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from app.services import series_catalog
+from app.services.series_catalog import SeriesCatalog
+from app.services.series_store import convert_series_file, write_series_file
+from app.utils.file_storage import series_checksum
+
+
+def rows(count: int, price: float = 100.0) -> List[dict]:
+    return [{"timestamp": f"2025-01-01T00:00:{index:02d}+00:00", "price": price + index} for index in range(count)]
+
+
+def store(directory: Path, data_id: str, count: int, price: float = 100.0, storage_format: str = "csv") -> Path:
+    return write_series_file(directory, data_id, {"symbol": "CAT", "source": "test"}, rows(count, price), storage_format)
+
+
+def touch_later(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def catalog(tmp_path: Path) -> Iterator[SeriesCatalog]:
+    catalog = SeriesCatalog(tmp_path / "catalog.sqlite3")
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture
+def hashed(monkeypatch) -> List[Path]:
+    calls: List[Path] = []
+    monkeypatch.setattr(series_catalog, "series_checksum", lambda path: calls.append(path) or series_checksum(path))
+    return calls
+
+
+def test_register_defers_the_checksum(tmp_path: Path, catalog: SeriesCatalog, hashed: List[Path]) -> None:
+    path = store(tmp_path, "data_a", 5)
+    entry = catalog.register("data_a", path, {"symbol": "CAT", "source": "test"}, rows(5))
+    assert (entry.symbol, entry.data_points, entry.end_time) == ("CAT", 5, "2025-01-01T00:00:04+00:00")
+    # 写入时不读取整个文件
+    assert hashed == []
+
+    digest = catalog.checksum("data_a")
+    assert digest == series_checksum(path)
+    assert catalog.checksum("data_a") == digest and catalog.get("data_a").checksum == digest
+    assert hashed == [path]
+
+    store(tmp_path, "data_a", 5, price=200.0)
+    touch_later(path)
+    assert catalog.checksum("data_a") not in (None, digest)
+    assert len(hashed) == 2
+    assert catalog.checksum("data_missing") is None
+
+
+def test_get_refreshes_on_size_or_mtime_change(tmp_path: Path, catalog: SeriesCatalog) -> None:
+    path = store(tmp_path, "data_b", 5)
+    catalog.refresh("data_b", path)
+
+    store(tmp_path, "data_b", 8)
+    entry = catalog.get("data_b")
+    assert entry.data_points == 8 and entry.size == path.stat().st_size
+
+    # 大小相同、修改时间不同的改写同样刷新
+    size = path.stat().st_size
+    store(tmp_path, "data_b", 8, price=300.0)
+    touch_later(path)
+    assert path.stat().st_size == size
+    entry = catalog.get("data_b")
+    assert entry.mtime_ns == path.stat().st_mtime_ns
+    assert catalog.checksum("data_b") == series_checksum(path)
+
+
+def test_get_removes_entries_of_deleted_files(tmp_path: Path, catalog: SeriesCatalog) -> None:
+    path = store(tmp_path, "data_c", 3)
+    catalog.refresh("data_c", path)
+    path.unlink()
+    assert catalog.get("data_c") is None
+    assert catalog.in_directory(tmp_path) == []
+
+
+def test_get_relocates_converted_series(tmp_path: Path, catalog: SeriesCatalog) -> None:
+    path = store(tmp_path, "data_d", 6)
+    catalog.refresh("data_d", path)
+
+    columnar = convert_series_file(path, "columnar")
+    entry = catalog.get("data_d")
+    assert entry.path == str(columnar)
+    assert (entry.data_points, entry.start_time, entry.symbol) == (6, "2025-01-01T00:00:00+00:00", "CAT")
+
+    back = convert_series_file(columnar, "csv")
+    assert catalog.get("data_d").path == str(back)
+
+
+def test_scan_syncs_files_changed_outside_the_service(tmp_path: Path, monkeypatch) -> None:
+    directory = tmp_path / "series"
+    directory.mkdir()
+    kept = store(directory, "data_kept", 4)
+    removed = store(directory, "data_removed", 4)
+    changed = store(directory, "data_changed", 4, storage_format="columnar")
+    (directory / "other_file.csv").write_text("{}\n", encoding="utf-8")
+
+    catalog = SeriesCatalog(tmp_path / "catalog.sqlite3")
+    assert [entry.data_id for entry in catalog.scan(directory)] == ["data_changed", "data_kept", "data_removed"]
+    catalog.close()
+
+    # 服务停止期间新增、删除与改写的文件
+    removed.unlink()
+    store(directory, "data_added", 2)
+    store(directory, "data_changed", 9, storage_format="columnar")
+    touch_later(changed)
+
+    refreshed: List[str] = []
+    original = SeriesCatalog.refresh
+
+    def counting_refresh(self, data_id, *args, **kwargs):
+        refreshed.append(data_id)
+        return original(self, data_id, *args, **kwargs)
+
+    monkeypatch.setattr(SeriesCatalog, "refresh", counting_refresh)
+    restarted = SeriesCatalog(tmp_path / "catalog.sqlite3")
+    entries = {entry.data_id: entry for entry in restarted.scan(directory)}
+    assert sorted(entries) == ["data_added", "data_changed", "data_kept"]
+    assert entries["data_changed"].data_points == 9 and entries["data_added"].data_points == 2
+    assert entries["data_kept"].path == str(kept)
+    # 未变化的文件不再解析
+    assert sorted(refreshed) == ["data_added", "data_changed"]
+    assert restarted.get("data_removed") is None
+    restarted.close()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from app.models import SimulatedDataRequest
+from app.services import convert_series
+from app.services.data_generation import DATA_REPOSITORY
+from app.services.series_catalog import SERIES_CATALOG
+from app.services.series_store import convert_series_file, iter_series, read_price_arrays, write_series_file
+from app.utils.file_storage import MappedColumn, columnar_sidecar, find_series_file, iter_series_rows
+
+ROWS = [
+    {"timestamp": "2025-01-01T00:00:00+08:00", "price": 100.5},
+    {"timestamp": "2025-01-01T00:00:01.250000+08:00", "price": 101.0},
+    {"timestamp": "not-a-time", "price": 1.0},
+    {"timestamp": "2025-01-01T00:00:02+08:00", "price": 0.0},
+    {"timestamp": "2025-01-01T00:00:03-05:00", "price": 99.25},
+    {"timestamp": "2025-01-01T00:00:04", "price": 98.0},
+    {"timestamp": "2025-01-01T00:00:05.000001", "price": 98.125},
+]
+# 列式格式只保留有效时间戳与正价格的行
+VALID_ROWS = [row for index, row in enumerate(ROWS) if index not in (2, 3)]
+
+
+def stored_rows(path: Path) -> List[Dict[str, Any]]:
+    return [
+        {"timestamp": row["timestamp"], "price": float(row["price"])}
+        for chunk in iter_series_rows(path)
+        for row in chunk
+    ]
+
+
+def assert_same_arrays(left, right) -> None:
+    assert left.timestamps.tolist() == right.timestamps.tolist()
+    assert left.prices.tolist() == right.prices.tolist()
+    assert list(left.labels) == list(right.labels)
+
+
+def long_rows(count: int) -> List[Dict[str, Any]]:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"timestamp": (start + timedelta(seconds=index)).isoformat(), "price": 100.0 + index / 8}
+        for index in range(count)
+    ]
+
+
+def test_csv_columnar_csv_round_trip(tmp_path: Path) -> None:
+    path = write_series_file(tmp_path, "data_rt", {"symbol": "RT"}, ROWS, "csv")
+    csv_arrays = read_price_arrays(path)
+
+    columnar = convert_series_file(path, "columnar")
+    assert columnar == tmp_path / "data_rt.qbs"
+    assert not path.exists() and columnar_sidecar(columnar).exists()
+    assert stored_rows(columnar) == VALID_ROWS
+    assert_same_arrays(read_price_arrays(columnar), csv_arrays)
+
+    back = convert_series_file(columnar, "csv")
+    assert back == path and not columnar.exists() and not columnar_sidecar(columnar).exists()
+    assert stored_rows(back) == VALID_ROWS
+    assert back.read_text(encoding="utf-8").splitlines()[0] == '{"symbol": "RT"}'
+    assert convert_series_file(back, "csv") == back
+
+
+def test_read_price_arrays_parity_across_formats(tmp_path: Path) -> None:
+    rows = long_rows(2500)
+    csv_arrays = read_price_arrays(write_series_file(tmp_path, "data_csv", {}, rows, "csv"))
+    columnar_arrays = read_price_arrays(write_series_file(tmp_path, "data_col", {}, rows, "columnar"))
+    assert isinstance(columnar_arrays.prices, MappedColumn)
+    assert columnar_arrays.timestamps.dtype == np.int64 and columnar_arrays.prices.dtype == np.float64
+    assert_same_arrays(columnar_arrays, csv_arrays)
+
+    empty = read_price_arrays(write_series_file(tmp_path, "data_empty", {}, [], "columnar"))
+    assert len(empty.prices) == 0 and len(empty.labels) == 0
+
+
+@pytest.mark.parametrize("storage_format", ["csv", "columnar"])
+@pytest.mark.parametrize("start", [0, 1, 999, 1000, 1001, 2499, 2500, 3000])
+def test_iter_series_start_and_chunk_boundaries(tmp_path: Path, storage_format: str, start: int) -> None:
+    path = write_series_file(tmp_path, "data_chunks", {}, long_rows(2500), storage_format)
+    full = read_price_arrays(path)
+    chunks = list(iter_series(path, chunk_size=1000, start=start))
+    assert all(0 < len(chunk.prices) <= 1000 for chunk in chunks)
+    if storage_format == "columnar":
+        # 列式文件从 start 开始按固定大小切分
+        assert [len(chunk.prices) for chunk in chunks[:-1]] == [1000] * (len(chunks) - 1)
+    timestamps = [value for chunk in chunks for value in chunk.timestamps.tolist()]
+    labels = [label for chunk in chunks for label in chunk.labels]
+    assert timestamps == full.timestamps[start:].tolist()
+    assert labels == list(full.labels)[start:]
+
+
+def _column_in_worker(column: np.ndarray) -> Tuple[str, bool, float, int]:
+    return type(column).__name__, column.flags.writeable, float(column.sum()), len(column)
+
+
+def test_mapped_column_pickles_its_location(tmp_path: Path) -> None:
+    path = write_series_file(tmp_path, "data_pickle", {}, long_rows(20_000), "columnar")
+    prices = read_price_arrays(path).prices
+    # 整列只传文件位置，切片传数据
+    assert len(pickle.dumps(prices)) < 1000
+    assert len(pickle.dumps(prices[:5000])) > 5000 * 8
+    assert pickle.loads(pickle.dumps(prices)) is prices
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        name, writeable, total, length = executor.submit(_column_in_worker, prices).result(timeout=120)
+    assert (name, writeable, length) == ("MappedColumn", False, 20_000)
+    assert total == float(prices.sum())
+
+    # 文件被改写后不再映射旧位置
+    stale = pickle.dumps(prices)
+    write_series_file(tmp_path, "data_pickle", {}, long_rows(10), "columnar")
+    with pytest.raises(ValueError):
+        pickle.loads(stale)
+
+
+def test_conversion_cli(caplog) -> None:
+    first = DATA_REPOSITORY.create_simulated(
+        SimulatedDataRequest(symbol="CLI", data_points=300, seed=3, storage_format="csv")
+    ).data_id
+    second = DATA_REPOSITORY.create_simulated(
+        SimulatedDataRequest(symbol="CLI", data_points=200, seed=4, storage_format="csv")
+    ).data_id
+    base = DATA_REPOSITORY.base_path
+    before = read_price_arrays(find_series_file(base, first))
+
+    assert convert_series.main(["--to", "columnar", first]) == 0
+    path = find_series_file(base, first)
+    assert path == base / f"{first}.qbs"
+    assert_same_arrays(read_price_arrays(path), before)
+    # 目录登记了新文件，未指定的序列保持原格式
+    assert SERIES_CATALOG.get(first).path == str(path)
+    assert SERIES_CATALOG.get(first).data_points == 300
+    assert find_series_file(base, second).suffix == ".csv"
+
+    with caplog.at_level(logging.ERROR, logger=convert_series.__name__):
+        assert convert_series.main(["--to", "csv", first, "data_missing"]) == 1
+    assert "data_missing" in caplog.text
+    assert find_series_file(base, first) == base / f"{first}.csv"
+    assert_same_arrays(read_price_arrays(base / f"{first}.csv"), before)
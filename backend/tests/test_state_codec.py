@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, List
+
+import numpy as np
+import pytest
+
+from app.services.strategies.base import STRATEGY_REGISTRY, restore_strategy
+from app.services.strategies.moving_average import MovingAverageStrategy
+from app.services.strategies.rule_based import build_rule_strategy
+from app.utils.state_codec import MAGIC, decode_state, encode_state
+
+_START = datetime(2025, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+SAMPLE = {
+    "none": None,
+    "true": True,
+    "false": False,
+    "int": -42,
+    "int_max": (1 << 63) - 1,
+    "big": 1 << 80,
+    "negative_big": -(1 << 70),
+    "float": 1.5,
+    "inf": float("inf"),
+    "text": "价格 price",
+    "empty_text": "",
+    "bytes": b"\x00\xffQBS1",
+    "floats": [1.0, -2.5, 1e300],
+    "mixed": [1, 2.0, "three", None, [4.0], {"five": 5}],
+    "empty_list": [],
+    "nested": {"a": {"b": {"c": [True, False]}}},
+    "empty_dict": {},
+}
+
+
+@pytest.mark.parametrize("key", list(SAMPLE))
+def test_round_trip_each_type(key: str) -> None:
+    state = {key: SAMPLE[key]}
+    decoded = decode_state(encode_state(state))
+    assert decoded == state
+    assert type(decoded[key]) is type(SAMPLE[key])
+
+
+def test_round_trip_all_types_and_special_floats() -> None:
+    state = {**SAMPLE, "nan": float("nan"), "tuple": (1.0, 2.0), "bytearray": bytearray(b"ab")}
+    decoded = decode_state(encode_state(state))
+    assert math.isnan(decoded.pop("nan"))
+    # 元组按列表、bytearray 按 bytes 读回
+    assert decoded.pop("tuple") == [1.0, 2.0]
+    assert decoded.pop("bytearray") == b"ab"
+    assert decoded == SAMPLE
+
+
+def test_float_lists_are_packed() -> None:
+    packed = encode_state({"values": [float(index) for index in range(100)]})
+    # 魔数、字典头、键、数组标记与长度之后是 100 个 float64
+    assert len(packed) == len(MAGIC) + 5 + 4 + len("values") + 5 + 100 * 8
+    # 含 bool 或整数的列表不能按浮点块存储
+    assert decode_state(encode_state({"values": [1.0, True]})) == {"values": [1.0, True]}
+
+
+@pytest.mark.parametrize("value", [{1: "a"}, object(), {1.5}, datetime(2025, 1, 1)])
+def test_unencodable_values_raise(value: Any) -> None:
+    with pytest.raises(TypeError):
+        encode_state({"value": value})
+
+
+@pytest.mark.parametrize("data", [b"", b"QBS", b"QBS2\x6d\x00\x00\x00\x00", b"\x80\x04}\x94.", b"N"])
+def test_bad_magic_is_rejected(data: bytes) -> None:
+    with pytest.raises(ValueError):
+        decode_state(data)
+
+
+def test_truncated_input_is_rejected() -> None:
+    data = encode_state(SAMPLE)
+    for size in range(len(MAGIC), len(data)):
+        with pytest.raises(ValueError):
+            decode_state(data[:size])
+
+
+def test_trailing_bytes_and_non_dict_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        decode_state(encode_state({"a": 1}) + b"N")
+    with pytest.raises(ValueError):
+        decode_state(MAGIC + b"N")
+    with pytest.raises(ValueError):
+        decode_state(MAGIC + b"x")
+
+
+def random_prices(seed: int, length: int = 3000) -> List[float]:
+    rng = np.random.default_rng(seed)
+    return np.maximum(np.round(100.0 + np.cumsum(rng.normal(0.0, 0.5, length)), 2), 1.0).tolist()
+
+
+def run(strategy, prices: List[float], start: int = 0) -> List[tuple]:
+    results = []
+    for index, price in enumerate(prices, start):
+        signal = strategy.generate_signal(price, _START + timedelta(seconds=7 * index))
+        results.append((signal.signal, signal.strength))
+    return results
+
+
+@pytest.fixture
+def rule_strategy() -> Iterator[type]:
+    strategy_cls = build_rule_strategy(
+        "rule_codec_test",
+        "Codec",
+        "buy when sma(5) crosses_above sma(30)@1m and rsi(14) < 70\nsell when price < bb_lower(20, 2)",
+    )
+    STRATEGY_REGISTRY.register(strategy_cls)
+    yield strategy_cls
+    STRATEGY_REGISTRY.unregister(strategy_cls.strategy_id)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("split", [1, 25, 1500])
+def test_restored_strategies_continue_with_same_signals(rule_strategy: type, seed: int, split: int) -> None:
+    prices = random_prices(seed)
+    for strategy_cls, parameters in (
+        (MovingAverageStrategy, {"short_window": 5, "long_window": 30, "min_strength": 0.0}),
+        (rule_strategy, {}),
+    ):
+        expected = run(strategy_cls(**parameters), prices)
+        assert any(signal != "hold" for signal, _ in expected[split:])
+        strategy = strategy_cls(**parameters)
+        run(strategy, prices[:split])
+        restored = restore_strategy(strategy.dump_state(), strategy_cls.strategy_id)
+        assert restored.parameters == strategy.parameters
+        assert run(restored, prices[split:], split) == expected[split:]
+
+
+def test_restore_rejects_other_strategy() -> None:
+    data = MovingAverageStrategy().dump_state()
+    with pytest.raises(ValueError):
+        restore_strategy(data, "rule_codec_test")
+    assert isinstance(restore_strategy(data), MovingAverageStrategy)
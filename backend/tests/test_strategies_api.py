@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.strategies import RULE_STRATEGIES, STRATEGY_REGISTRY, rule_based
+from app.services.strategies.rule_based import RuleStrategyStore
+
+RULES = "buy when sma(5) crosses_above sma(20); sell when sma(5) crosses_below sma(20)"
+
+
+class CountingPath(type(Path())):
+    stats: List[str] = []
+
+    def stat(self, *args, **kwargs):
+        CountingPath.stats.append(self.name)
+        return super().stat(*args, **kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> List[float]:
+    now = [5000.0]
+    monkeypatch.setattr(rule_based.time, "monotonic", lambda: now[0])
+    return now
+
+
+def stored_definitions() -> dict:
+    with RULE_STRATEGIES.path.open("r", encoding="utf-8") as fp:
+        return json.load(fp)["strategies"]
+
+
+def test_rule_strategy_persists_and_reloads(client: TestClient) -> None:
+    body = {"strategy_id": "rule_api_cross", "name": "Cross", "description": "api", "rules": RULES}
+    response = client.post("/strategies/rules", json=body)
+    assert response.status_code == 200, response.text
+    metadata = response.json()
+    assert metadata["strategy_id"] == "rule_api_cross"
+    assert client.get("/strategies/rule_api_cross").json() == metadata
+    assert "rule_api_cross" in [item["strategy_id"] for item in client.get("/strategies/").json()]
+    assert stored_definitions()["rule_api_cross"] == {"name": "Cross", "rules": RULES, "description": "api"}
+
+    assert client.post("/strategies/rules", json=body).status_code == 400
+    invalid = {**body, "strategy_id": "rule_api_bad", "rules": "buy when"}
+    assert client.post("/strategies/rules", json=invalid).status_code == 400
+
+    # 模拟重启：新的存储从文件重新注册同样的策略
+    fingerprint = STRATEGY_REGISTRY.get("rule_api_cross").fingerprint
+    STRATEGY_REGISTRY.unregister("rule_api_cross")
+    reloaded = RuleStrategyStore(RULE_STRATEGIES.path)
+    reloaded.sync()
+    assert reloaded.definitions == RULE_STRATEGIES.definitions
+    assert STRATEGY_REGISTRY.get("rule_api_cross").fingerprint == fingerprint
+
+    assert client.delete("/strategies/rule_api_cross").status_code == 204
+    assert client.get("/strategies/rule_api_cross").status_code == 404
+    assert "rule_api_cross" not in stored_definitions()
+
+
+def test_built_in_strategies_cannot_be_deleted(client: TestClient) -> None:
+    response = client.delete("/strategies/ma_crossover")
+    assert response.status_code == 400
+    assert "built in" in response.json()["detail"]
+    assert client.get("/strategies/ma_crossover").status_code == 200
+    assert client.delete("/strategies/rule_api_missing").status_code == 404
+
+
+def test_lookups_check_the_file_at_most_once_per_interval(tmp_path: Path, clock: List[float]) -> None:
+    CountingPath.stats = []
+    store = RuleStrategyStore(CountingPath(tmp_path / "rules.json"))
+    for _ in range(5):
+        store.sync()
+    assert len(CountingPath.stats) == 1
+    clock[0] += rule_based.RULE_SYNC_INTERVAL
+    store.sync()
+    store.sync()
+    assert len(CountingPath.stats) == 2
+    store.sync(force=True)
+    assert len(CountingPath.stats) == 3
+
+
+def test_lookup_miss_picks_up_other_process_changes(clock: List[float]) -> None:
+    STRATEGY_REGISTRY.get("ma_crossover")
+    # 另一个进程写入新策略：本进程刚检查过文件，查找未命中时强制重新检查
+    other = RuleStrategyStore(RULE_STRATEGIES.path)
+    other.create("rule_api_other", "Other", RULES)
+    STRATEGY_REGISTRY.unregister("rule_api_other")
+    assert "rule_api_other" not in RULE_STRATEGIES.definitions
+    try:
+        assert STRATEGY_REGISTRY.get("rule_api_other").strategy_id == "rule_api_other"
+        assert "rule_api_other" in RULE_STRATEGIES.definitions
+    finally:
+        RULE_STRATEGIES.delete("rule_api_other")
+    with pytest.raises(KeyError):
+        STRATEGY_REGISTRY.get("rule_api_other")
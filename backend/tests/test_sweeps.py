@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import BacktestRequest, BacktestSweepRequest, ParameterRange
+from app.services import backtest_sweeps, backtest_workers
+from app.services.backtest_engine import run_vectorized_backtest
+from app.services.backtest_sweeps import (
+    SWEEP_MANAGER,
+    build_request,
+    expand_grid,
+    expand_values,
+    metric_sort_key,
+    validate_grid,
+)
+from app.services.backtesting import BACKTEST_MANAGER
+from app.services.series_store import write_series_file
+from app.services.strategies import STRATEGY_REGISTRY
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        (ParameterRange(start=2, stop=10, step=4), [2, 6, 10]),
+        (ParameterRange(start=2, stop=11, step=4), [2, 6, 10]),
+        (ParameterRange(start=0.1, stop=0.3, step=0.1), [0.1, 0.2, 0.3]),
+        (ParameterRange(start=5, stop=5), [5]),
+        (ParameterRange(start=5, stop=4), []),
+        ([3, "a", None], [3, "a", None]),
+    ],
+)
+def test_expand_values(spec: Any, expected: List[Any]) -> None:
+    values = expand_values(spec)
+    assert values == expected
+    assert all(type(value) is type(item) for value, item in zip(values, expected))
+
+
+def test_expand_grid_is_a_product_in_order() -> None:
+    grid = {"a": [1, 2], "b": ParameterRange(start=0, stop=2), "c": ["x"]}
+    assert expand_grid(grid) == [
+        {"a": a, "b": b, "c": "x"} for a in (1, 2) for b in (0, 1, 2)
+    ]
+    assert expand_grid({}) == [{}]
+    assert expand_grid({"a": [1], "b": []}) == []
+
+
+def test_validate_grid() -> None:
+    validate_grid("max_drawdown", {"commission_value": [0.0, 1.0], "lot_size": [1, 10]})
+    with pytest.raises(ValueError):
+        validate_grid("sharpe", {})
+    for name in ("data_id", "strategy_params", "engine", "not_a_field"):
+        with pytest.raises(ValueError):
+            validate_grid("total_return", {name: [1]})
+
+
+def test_build_request_merges_template() -> None:
+    template = BacktestRequest(data_id="data_x", strategy_id="ma_crossover", strategy_params={"long_window": 30})
+    payload = build_request(template, ({"short_window": 4}, {"lot_size": 10}))
+    assert payload["strategy_params"] == {"long_window": 30, "short_window": 4}
+    assert payload["lot_size"] == 10 and payload["data_id"] == "data_x"
+    assert template.strategy_params == {"long_window": 30}
+
+
+def test_metric_sort_key_ranks_best_first_and_missing_last() -> None:
+    rows = [{"m": 1.0}, None, {"m": float("nan")}, {"m": 3.0}, {}, {"m": -2.0}]
+    descending = sorted(rows, key=lambda item: metric_sort_key(item, "m", False))
+    assert descending[:3] == [{"m": 3.0}, {"m": 1.0}, {"m": -2.0}]
+    ascending = sorted(rows, key=lambda item: metric_sort_key(item, "m", True))
+    assert ascending[:3] == [{"m": -2.0}, {"m": 1.0}, {"m": 3.0}]
+    assert all(metric_sort_key(item, "m", False)[0] == 1 for item in descending[3:])
+
+
+def test_combination_limit(client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(backtest_sweeps, "MAX_SWEEP_COMBINATIONS", 6)
+    template = BacktestRequest(data_id="data_x", strategy_id="ma_crossover")
+    request = BacktestSweepRequest(
+        template=template,
+        strategy_param_grid={"short_window": [2, 3, 4]},
+        execution_param_grid={"lot_size": [1, 10, 100]},
+    )
+    with pytest.raises(ValueError, match="limit is 6"):
+        SWEEP_MANAGER.create_sweep(request)
+    with pytest.raises(ValueError, match="empty"):
+        SWEEP_MANAGER.create_sweep(BacktestSweepRequest(template=template, strategy_param_grid={"short_window": []}))
+    response = client.post("/backtests/sweeps", json=request.dict())
+    assert response.status_code == 400 and "limit is 6" in response.json()["detail"]
+
+
+def wait_for(client: TestClient, sweep_id: str) -> Dict[str, Any]:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        info = client.get(f"/backtests/sweeps/{sweep_id}").json()
+        if info["status"] not in ("running", "waiting"):
+            return info
+        time.sleep(0.02)
+    raise AssertionError(f"sweep {sweep_id} did not finish")
+
+
+@pytest.fixture(scope="module")
+def data_id(client: TestClient) -> str:
+    response = client.post(
+        "/data/simulated", json={"symbol": "SWEEP", "data_points": 3000, "seed": 41, "volatility_magnitude": 3.0}
+    )
+    return response.json()["data_id"]
+
+
+def sweep_body(data_id: str) -> Dict[str, Any]:
+    return {
+        "template": {"data_id": data_id, "strategy_id": "ma_crossover", "strategy_params": {"long_window": 25}},
+        "strategy_param_grid": {"short_window": [3, 5, "bad", 8]},
+        "execution_param_grid": {"commission_value": {"start": 0, "stop": 2, "step": 1}},
+        "metric": "total_return",
+    }
+
+
+def test_sweep_results_rank_and_match_single_runs(client: TestClient, data_id: str, monkeypatch) -> None:
+    payloads: List[tuple] = []
+    original = backtest_workers.BACKTEST_POOL.map
+
+    async def recording_map(fn, batch, on_result=None):
+        payloads.extend(batch)
+        return await original(fn, batch, on_result=on_result)
+
+    monkeypatch.setattr(backtest_sweeps.BACKTEST_POOL, "map", recording_map)
+    response = client.post("/backtests/sweeps", json=sweep_body(data_id))
+    assert response.status_code == 200, response.text
+    info = wait_for(client, response.json()["sweep_id"])
+    assert info["status"] == "completed"
+    assert info["total_combinations"] == info["completed_combinations"] == 12
+
+    # 批次只携带数据文件路径，不携带价格数组
+    assert payloads and all(isinstance(payload[0], str) for payload in payloads)
+    assert all(len(payload) == 2 for payload in payloads)
+
+    results = info["results"]
+    assert [item["rank"] for item in results] == list(range(1, 13))
+    errors = [item for item in results if item["metrics"] is None]
+    # 无法构造策略的参数作为错误行排在最后
+    assert len(errors) == 3 and results[-3:] == errors
+    assert all(item["strategy_params"] == {"short_window": "bad"} and item["message"] for item in errors)
+    returns = [item["metrics"]["total_return"] for item in results[:-3]]
+    assert returns == sorted(returns, reverse=True)
+
+    arrays = BACKTEST_MANAGER.load_series_arrays(data_id)
+    for item in results[:-3]:
+        request = BacktestRequest(
+            data_id=data_id,
+            strategy_id="ma_crossover",
+            strategy_params={"long_window": 25, **item["strategy_params"]},
+            **item["execution_params"],
+        )
+        strategy = STRATEGY_REGISTRY.get("ma_crossover")(**request.strategy_params)
+        expected = run_vectorized_backtest(request, strategy, arrays, collect_trades=False).metrics
+        for name, value in expected.items():
+            assert item["metrics"][name] == pytest.approx(value) or (math.isinf(value) and item["metrics"][name] == value)
+
+    top = client.get(f"/backtests/sweeps/{info['sweep_id']}", params={"top_n": 2}).json()["results"]
+    assert top == results[:2]
+
+
+def test_repeated_sweep_is_filled_from_cache(client: TestClient, data_id: str, monkeypatch) -> None:
+    first = wait_for(client, client.post("/backtests/sweeps", json=sweep_body(data_id)).json()["sweep_id"])
+
+    batches: List[tuple] = []
+    original = backtest_workers.BACKTEST_POOL.map
+
+    async def recording_map(fn, batch, on_result=None):
+        batches.extend(batch)
+        return await original(fn, batch, on_result=on_result)
+
+    monkeypatch.setattr(backtest_sweeps.BACKTEST_POOL, "map", recording_map)
+    second = wait_for(client, client.post("/backtests/sweeps", json=sweep_body(data_id)).json()["sweep_id"])
+    # 只有失败的组合没有缓存，需要重新计算
+    assert [request["strategy_params"]["short_window"] for batch in batches for request in batch[1]] == ["bad"] * 3
+    assert second["results"] == first["results"]
+
+
+def test_worker_series_is_loaded_once(tmp_path: Path, monkeypatch) -> None:
+    loads: List[Path] = []
+    original = backtest_workers.read_price_arrays
+    monkeypatch.setattr(backtest_workers, "read_price_arrays", lambda path: loads.append(path) or original(path))
+    monkeypatch.setattr(backtest_workers, "_worker_series", OrderedDict())
+    rows = [{"timestamp": f"2025-01-01T00:00:{index:02d}", "price": 100.0 + index} for index in range(10)]
+    paths = [
+        str(write_series_file(tmp_path, f"data_w{index}", {"symbol": "W"}, rows, "csv")) for index in range(3)
+    ]
+
+    first = backtest_workers.load_worker_series(paths[0])
+    assert backtest_workers.load_worker_series(paths[0]) is first
+    assert len(loads) == 1 and first.prices.tolist() == [row["price"] for row in rows]
+
+    # 文件被改写后重新读取
+    write_series_file(tmp_path, "data_w0", {"symbol": "W"}, rows[:5], "csv")
+    assert len(backtest_workers.load_worker_series(paths[0]).prices) == 5
+    assert len(loads) == 2
+
+    # 缓存按最近使用淘汰
+    backtest_workers.load_worker_series(paths[1])
+    backtest_workers.load_worker_series(paths[2])
+    assert len(backtest_workers._worker_series) == backtest_workers.WORKER_SERIES_LIMIT
+    assert [key[0] for key in backtest_workers._worker_series] == paths[1:]
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.models import BacktestRequest
+from app.services import backtesting
+from app.services.backtest_engine import TradeLogEntry, checkpoint_path_for, write_trade_log
+from app.services.backtesting import BacktestManager, BacktestTaskState
+from app.utils.scheduler import TaskStatus
+from app.utils.task_index import TaskIndex, config_hash
+
+_CREATED = datetime(2025, 3, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def trade(index: int) -> TradeLogEntry:
+    return TradeLogEntry(f"2025-03-01T10:{index:02d}:00+00:00", "buy", 100.0 + index, 1.0, 1000.0, 1.0, 1100.0 + index)
+
+
+def add_task(
+    manager: BacktestManager,
+    task_id: str,
+    status: TaskStatus,
+    trades: int = 3,
+    short_window: int = 5,
+    write_log: bool = True,
+) -> BacktestTaskState:
+    request = BacktestRequest(
+        data_id="data_index", strategy_id="ma_crossover", strategy_params={"short_window": short_window}
+    )
+    state = BacktestTaskState(
+        task_id=task_id,
+        request=request,
+        status=status,
+        created_at=_CREATED + timedelta(minutes=len(manager.tasks)),
+        started_at=_CREATED,
+        finished_at=_CREATED if status == TaskStatus.COMPLETED else None,
+        metrics={"total_return": 0.1, "profit_factor": float("inf")} if status == TaskStatus.COMPLETED else None,
+        message="done" if status == TaskStatus.COMPLETED else None,
+        log_path=manager.log_dir / f"{task_id}.log",
+    )
+    if write_log:
+        write_trade_log(state.log_path, request, [trade(index) for index in range(trades)])
+    manager.tasks[task_id] = state
+    manager._persist_task_state(state)
+    return state
+
+
+def restart(manager: BacktestManager) -> BacktestManager:
+    manager.index.close()
+    return BacktestManager(manager.log_dir)
+
+
+def test_reload_after_restart(tmp_path: Path) -> None:
+    manager = BacktestManager(tmp_path)
+    completed = add_task(manager, "test_done", TaskStatus.COMPLETED)
+    add_task(manager, "test_same_config", TaskStatus.COMPLETED)
+    add_task(manager, "test_paused", TaskStatus.PAUSED, trades=0, short_window=7)
+    add_task(manager, "test_stopped", TaskStatus.STOPPED, short_window=8)
+
+    reloaded = restart(manager)
+    assert set(reloaded.tasks) == {"test_done", "test_same_config", "test_paused", "test_stopped"}
+    state = reloaded.tasks["test_done"]
+    assert state.request == completed.request
+    assert (state.status, state.created_at, state.started_at, state.finished_at) == (
+        TaskStatus.COMPLETED,
+        completed.created_at,
+        completed.started_at,
+        completed.finished_at,
+    )
+    assert state.metrics == completed.metrics and state.message == "done"
+    assert reloaded.tasks["test_paused"].status == TaskStatus.PAUSED
+    assert reloaded.tasks["test_stopped"].status == TaskStatus.STOPPED
+    # 索引不再写 meta.json
+    assert not list(tmp_path.glob("*.meta.json"))
+
+
+def test_index_rows_store_only_the_config_hash(tmp_path: Path) -> None:
+    manager = BacktestManager(tmp_path)
+    state = add_task(manager, "test_a", TaskStatus.COMPLETED)
+    add_task(manager, "test_b", TaskStatus.COMPLETED)
+    add_task(manager, "test_c", TaskStatus.COMPLETED, short_window=9)
+    for status in (TaskStatus.RUNNING, TaskStatus.PAUSED, TaskStatus.COMPLETED):
+        state.status = status
+        manager._persist_task_state(state)
+
+    with sqlite3.connect(tmp_path / "index.sqlite3") as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(tasks)")]
+        hashes = [row[0] for row in conn.execute("SELECT config_hash FROM tasks WHERE task_id = 'test_a'")]
+        configs = conn.execute("SELECT COUNT(*) FROM configs").fetchone()[0]
+    assert "config" not in columns
+    assert hashes == [config_hash(state.request.dict())]
+    # 相同配置只保存一份
+    assert configs == 2
+
+    manager.delete("test_a")
+    manager.delete("test_c")
+    with sqlite3.connect(tmp_path / "index.sqlite3") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM configs").fetchone()[0] == 1
+    assert set(restart(manager).tasks) == {"test_b"}
+
+
+def test_startup_reconciles_files(tmp_path: Path) -> None:
+    manager = BacktestManager(tmp_path)
+    add_task(manager, "test_gone", TaskStatus.COMPLETED)
+    add_task(manager, "test_crashed", TaskStatus.RUNNING)
+    add_task(manager, "test_checkpointed", TaskStatus.RUNNING, trades=0)
+    checkpoint_path_for(tmp_path / "test_checkpointed.log").write_text("{}", encoding="utf-8")
+    add_task(manager, "test_no_log", TaskStatus.RUNNING, write_log=False)
+    (tmp_path / "test_gone.log").unlink()
+
+    # 索引之外的日志与旧版本的 meta.json 在启动时导入
+    request = BacktestRequest(data_id="data_index", strategy_id="ma_crossover")
+    write_trade_log(tmp_path / "test_external.log", request, [trade(0), trade(1)])
+    (tmp_path / "test_legacy.meta.json").write_text(
+        json.dumps(
+            {
+                "task_id": "test_legacy",
+                "status": "completed",
+                "created_at": _CREATED.isoformat(),
+                "config": request.dict(),
+                "metrics": {"total_return": 0.5},
+                "message": None,
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    reloaded = restart(manager)
+    tasks = reloaded.tasks
+    assert "test_gone" not in tasks and "test_no_log" not in tasks
+    assert tasks["test_crashed"].status == TaskStatus.COMPLETED
+    assert tasks["test_checkpointed"].status == TaskStatus.PAUSED
+    assert tasks["test_external"].status == TaskStatus.COMPLETED
+    assert tasks["test_external"].metrics["total_trades"] == 2
+    assert tasks["test_legacy"].metrics == {"total_return": 0.5}
+
+    # 导入结果写入了索引，再次启动不再解析文件
+    entries = TaskIndex(tmp_path / "index.sqlite3").load()
+    assert entries["test_external"]["config"] == request.dict()
+    assert entries["test_crashed"]["status"] == "completed"
+    assert set(restart(reloaded).tasks) == set(tasks)
+
+
+def test_resident_trade_lists_are_bounded(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(backtesting, "MAX_RESIDENT_TRADE_LISTS", 4)
+    manager = BacktestManager(tmp_path)
+    for index in range(6):
+        state = add_task(manager, f"test_{index}", TaskStatus.COMPLETED, trades=index + 1)
+        state.trades = [trade(item) for item in range(index + 1)]
+        manager._release_trades(state)
+        assert state.trades is None
+    assert list(manager._resident_trades) == ["test_2", "test_3", "test_4", "test_5"]
+
+    # 读取交易页会刷新最近使用顺序
+    assert manager.get_trades("test_2", limit=10).total == 3
+    state = add_task(manager, "test_6", TaskStatus.COMPLETED)
+    state.trades = [trade(0)]
+    manager._release_trades(state)
+    assert list(manager._resident_trades) == ["test_4", "test_5", "test_2", "test_6"]
+
+    # 被淘汰的任务从日志读取，结果不变
+    page = manager.get_trades("test_1", limit=10)
+    assert page.total == 2 and page.trades == [trade(0).__dict__, trade(1).__dict__]
+    assert "test_1" not in manager._resident_trades
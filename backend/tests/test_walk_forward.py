@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.backtest_workers import BACKTEST_POOL
+
+
+def _wait(client: TestClient, walk_id: str) -> Dict[str, Any]:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        info = client.get(f"/backtests/walk-forward/{walk_id}").json()
+        if info["status"] != "running":
+            return info
+        time.sleep(0.05)
+    raise AssertionError(f"walk-forward run {walk_id} did not finish")
+
+
+def _walk_forward(client: TestClient, strategy_param_grid: Dict[str, Any]) -> Dict[str, Any]:
+    data = client.post("/data/simulated", json={"symbol": "WF", "data_points": 2000, "seed": 5}).json()
+    body = {
+        "template": {"data_id": data["data_id"], "strategy_id": "ma_crossover"},
+        "strategy_param_grid": strategy_param_grid,
+        "in_sample_size": 600,
+        "out_of_sample_size": 200,
+    }
+    response = client.post("/backtests/walk-forward", json=body)
+    assert response.status_code == 200, response.text
+    return _wait(client, response.json()["walk_id"])
+
+
+def test_completes_with_stitched_metrics(client: TestClient, monkeypatch) -> None:
+    payloads: List[tuple] = []
+    original = BACKTEST_POOL.map
+
+    async def recording_map(fn, batch, on_result=None):
+        payloads.extend(batch)
+        return await original(fn, batch, on_result=on_result)
+
+    monkeypatch.setattr(BACKTEST_POOL, "map", recording_map)
+    info = _walk_forward(client, {"short_window": [3, 5], "long_window": [20]})
+    # 批次只携带数据文件路径
+    assert payloads and all(isinstance(payload[0], str) for payload in payloads)
+    assert info["status"] == "completed"
+    assert info["completed_windows"] == info["total_windows"] == 7
+    assert info["metrics"] is not None
+
+
+def test_fails_when_no_window_produces_a_result(client: TestClient) -> None:
+    # 无法构造策略的参数使每个窗口都没有结果
+    info = _walk_forward(client, {"short_window": ["not-a-number"]})
+    assert info["status"] == "failed"
+    assert info["metrics"] is None
+    assert info["message"] == "No out-of-sample window produced a result."
+
+
+def test_stitched_metrics_compound_out_of_sample_windows(client: TestClient) -> None:
+    info = _walk_forward(client, {"short_window": [3, 5, 8], "long_window": [20, 40]})
+    assert info["status"] == "completed"
+    capital = info["config"]["template"]["initial_capital"]
+
+    # 每个样本外窗口从初始资金起步，按收益率依次复利
+    equity = capital
+    trades = 0
+    wins = 0.0
+    worst_drawdown = 0.0
+    for window in info["windows"]:
+        metrics = window["out_of_sample_metrics"]
+        assert metrics is not None
+        equity *= metrics["final_equity"] / capital
+        trades += metrics["total_trades"]
+        wins += metrics["win_rate"] * metrics["total_trades"]
+        worst_drawdown = max(worst_drawdown, metrics["max_drawdown"])
+
+    stitched = info["metrics"]
+    assert stitched["final_equity"] == pytest.approx(equity, rel=1e-12)
+    assert stitched["total_return"] == pytest.approx((equity - capital) / capital, rel=1e-9, abs=1e-12)
+    assert stitched["total_trades"] == trades
+    assert stitched["win_rate"] == pytest.approx(wins / trades if trades else 0.0)
+    # 缩放不改变单个窗口内的回撤，拼接后的回撤不小于任何一个窗口
+    assert stitched["max_drawdown"] >= worst_drawdown - 1e-12
+    assert info["equity_curve"][0]["equity"] == pytest.approx(capital)
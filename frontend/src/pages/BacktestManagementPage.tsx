@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useRef, useState } from "react";
-import { useMutation, useQueries, useQuery, useQueryClient } from "@tanstack/react-query";
+import { useInfiniteQuery, useMutation, useQueries, useQuery, useQueryClient } from "@tanstack/react-query";
 import api from "../api/client";
 import { Dialog } from "../components/Dialog";
 import { StatusBadge } from "../components/StatusBadge";
@@ -30,11 +30,43 @@ interface BacktestTask {
     strategy_id: string;
     initial_capital: number;
   };
-  trades?: TradeLogEntry[];
   message?: string;
   created_at?: string;
 }
 
+interface BacktestTaskPage {
+  items: BacktestTask[];
+  next_cursor?: string | null;
+}
+
+interface BacktestTradePage {
+  task_id: string;
+  offset: number;
+  limit: number;
+  total: number;
+  trades: TradeLogEntry[];
+}
+
+interface BacktestListFilters {
+  status: string;
+  strategy_id: string;
+  data_id: string;
+}
+
+// 回测任务列表每页条数
+const BACKTEST_PAGE_SIZE = 50;
+// 回测详情中每次加载的交易条数
+const TRADE_PAGE_SIZE = 500;
+
+const BACKTEST_STATUS_OPTIONS: Array<{ value: string; label: string }> = [
+  { value: "waiting", label: "等待中" },
+  { value: "running", label: "运行中" },
+  { value: "paused", label: "已暂停" },
+  { value: "stopped", label: "已停止" },
+  { value: "completed", label: "已完成" },
+  { value: "failed", label: "失败" }
+];
+
 interface StrategyParameter {
   name: string;
   parameter_type: string;
@@ -137,6 +169,7 @@ export function BacktestManagementPage() {
     direction: "desc"
   });
   const [selectedTags, setSelectedTags] = useState<Set<string>>(new Set());
+  const [listFilters, setListFilters] = useState<BacktestListFilters>({ status: "", strategy_id: "", data_id: "" });
   const [form, setForm] = useState({
     data_id: "",
     strategy_id: "",
@@ -158,12 +191,20 @@ export function BacktestManagementPage() {
   const [isStrategyDropdownOpen, setIsStrategyDropdownOpen] = useState(false);
   const strategyDropdownRef = useRef<HTMLDivElement>(null);
 
-  const tasksQuery = useQuery({
-    queryKey: ["backtests"],
-    queryFn: async () => {
-      const { data } = await api.get<BacktestTask[]>("/backtests");
+  // 按页加载回测任务，筛选条件交给后端，"加载更多"按 next_cursor 取下一页
+  const tasksQuery = useInfiniteQuery({
+    queryKey: ["backtests", listFilters],
+    initialPageParam: null as string | null,
+    queryFn: async ({ pageParam }) => {
+      const params: Record<string, string | number> = { limit: BACKTEST_PAGE_SIZE };
+      if (listFilters.status) params.status = listFilters.status;
+      if (listFilters.strategy_id) params.strategy_id = listFilters.strategy_id;
+      if (listFilters.data_id) params.data_id = listFilters.data_id;
+      if (pageParam) params.cursor = pageParam;
+      const { data } = await api.get<BacktestTaskPage>("/backtests", { params });
       return data;
-    }
+    },
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? null
   });
 
   const strategiesQuery = useQuery({
@@ -285,7 +326,26 @@ export function BacktestManagementPage() {
     }
   });
 
-  const tasks = tasksQuery.data ?? [];
+  const tasks = useMemo(() => tasksQuery.data?.pages.flatMap((page) => page.items) ?? [], [tasksQuery.data]);
+
+  // 详情中的交易记录按页从 /backtests/{id}/trades 读取
+  const tradesQuery = useInfiniteQuery({
+    queryKey: ["backtestTrades", selectedTask?.task_id],
+    enabled: !!selectedTask,
+    initialPageParam: 0,
+    queryFn: async ({ pageParam }) => {
+      const { data } = await api.get<BacktestTradePage>(`/backtests/${selectedTask?.task_id}/trades`, {
+        params: { offset: pageParam, limit: TRADE_PAGE_SIZE }
+      });
+      return data;
+    },
+    getNextPageParam: (lastPage) => {
+      const next = lastPage.offset + lastPage.trades.length;
+      return lastPage.trades.length > 0 && next < lastPage.total ? next : undefined;
+    }
+  });
+  const selectedTrades = useMemo(() => tradesQuery.data?.pages.flatMap((page) => page.trades) ?? [], [tradesQuery.data]);
+  const totalTrades = tradesQuery.data?.pages[tradesQuery.data.pages.length - 1]?.total ?? 0;
   const dataOptions = [...simulatedDataOptions, ...snapshotDataOptions];
   const activeStrategy = useMemo(
     () => strategies.find((item) => item.strategy_id === form.strategy_id),
@@ -583,17 +643,14 @@ export function BacktestManagementPage() {
   const visibleTimestamps = useMemo(() => new Set(chartData.map((point) => point.timestamp)), [chartData]);
 
   const chartTrades = useMemo((): ChartTrade[] => {
-    if (!selectedTask?.trades) {
-      return [];
-    }
-    return selectedTask.trades
+    return selectedTrades
       .filter((trade) => visibleTimestamps.has(trade.timestamp))
       .map((trade): ChartTrade => ({
         timestamp: trade.timestamp,
         price: trade.price,
         action: trade.action === "buy" ? "buy" : "sell"
       }));
-  }, [selectedTask, visibleTimestamps]);
+  }, [selectedTrades, visibleTimestamps]);
 
   const visibleStartPoint = chartData.length > 0 ? chartData[0] : null;
   const visibleEndPoint = chartData.length > 0 ? chartData[chartData.length - 1] : null;
@@ -777,12 +834,12 @@ export function BacktestManagementPage() {
   }, [selectedTask]);
 
   const tradeTimeline = useMemo<EnhancedTradeEntry[]>(() => {
-    if (!selectedTask?.trades || selectedTask.trades.length === 0) {
+    if (!selectedTask || selectedTrades.length === 0) {
       return [];
     }
     const initialEquity =
       typeof selectedTask.config.initial_capital === "number" ? selectedTask.config.initial_capital : 0;
-    const sorted = selectedTask.trades
+    const sorted = selectedTrades
       .slice()
       .sort(
         (a, b) =>
@@ -801,7 +858,7 @@ export function BacktestManagementPage() {
       };
     });
     return enhanced.reverse();
-  }, [selectedTask]);
+  }, [selectedTask, selectedTrades]);
 
   const startPercent = sliderMax > 0 ? (chartRange.start / sliderMax) * 100 : 0;
   const endPercent = sliderMax > 0 ? (chartRange.end / sliderMax) * 100 : 100;
@@ -825,6 +882,45 @@ export function BacktestManagementPage() {
       </header>
 
       <section className="space-y-4">
+        {/* 列表筛选（由后端过滤） */}
+        <div className="flex flex-wrap items-center gap-3">
+          <select
+            className="rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2 text-sm"
+            value={listFilters.status}
+            onChange={(e) => setListFilters((prev) => ({ ...prev, status: e.target.value }))}
+          >
+            <option value="">全部状态</option>
+            {BACKTEST_STATUS_OPTIONS.map((option) => (
+              <option key={option.value} value={option.value}>
+                {option.label}
+              </option>
+            ))}
+          </select>
+          <select
+            className="rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2 text-sm"
+            value={listFilters.strategy_id}
+            onChange={(e) => setListFilters((prev) => ({ ...prev, strategy_id: e.target.value }))}
+          >
+            <option value="">全部策略</option>
+            {strategies.map((strategy) => (
+              <option key={strategy.strategy_id} value={strategy.strategy_id}>
+                {strategy.name}
+              </option>
+            ))}
+          </select>
+          <select
+            className="rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2 text-sm"
+            value={listFilters.data_id}
+            onChange={(e) => setListFilters((prev) => ({ ...prev, data_id: e.target.value }))}
+          >
+            <option value="">全部数据</option>
+            {dataOptions.map((option) => (
+              <option key={option.data_id} value={option.data_id}>
+                {option.symbol} · {option.data_id}
+              </option>
+            ))}
+          </select>
+        </div>
         {/* 筛选Tags */}
         {(categorizedTags.dataTypeTags.length > 0 || categorizedTags.strategyTags.length > 0 || categorizedTags.profitTags.length > 0) && (
           <div className="flex flex-wrap items-center gap-2">
@@ -1035,6 +1131,18 @@ export function BacktestManagementPage() {
                 )}
               </tbody>
             </table>
+            {tasksQuery.hasNextPage && (
+              <div className="flex justify-center py-4">
+                <button
+                  type="button"
+                  onClick={() => void tasksQuery.fetchNextPage()}
+                  disabled={tasksQuery.isFetchingNextPage}
+                  className="px-4 py-2 rounded-full text-sm bg-slate-800/60 hover:bg-slate-700/60 text-slate-300 transition disabled:opacity-50"
+                >
+                  {tasksQuery.isFetchingNextPage ? "加载中..." : "加载更多"}
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </section>
@@ -1474,7 +1582,14 @@ export function BacktestManagementPage() {
             )}
 
             <div>
-              <h4 className="text-sm uppercase tracking-widest text-slate-400 mb-3">交易日志</h4>
+              <div className="flex items-center justify-between mb-3">
+                <h4 className="text-sm uppercase tracking-widest text-slate-400">交易日志</h4>
+                {totalTrades > 0 && (
+                  <span className="text-xs text-slate-500">
+                    已加载 {selectedTrades.length} / {totalTrades} 笔
+                  </span>
+                )}
+              </div>
               <div className="trade-log-wrapper">
                 <table className="trade-log-table">
                   <thead>
@@ -1526,6 +1641,18 @@ export function BacktestManagementPage() {
                   </tbody>
                 </table>
                   </div>
+              {tradesQuery.hasNextPage && (
+                <div className="flex justify-center pt-3">
+                  <button
+                    type="button"
+                    onClick={() => void tradesQuery.fetchNextPage()}
+                    disabled={tradesQuery.isFetchingNextPage}
+                    className="px-4 py-2 rounded-full text-sm bg-slate-800/60 hover:bg-slate-700/60 text-slate-300 transition disabled:opacity-50"
+                  >
+                    {tradesQuery.isFetchingNextPage ? "加载中..." : "加载更多交易"}
+                  </button>
+                </div>
+              )}
               {/* keep legacy fallback */}
               <div className="sr-only">
                 {tradeTimeline.map((trade) => {
@@ -40,7 +40,9 @@ export function QuantTradingPage() {
     account_mode: "paper",
     interval_seconds: 30,
     lot_size: 1,
-    strategy_params: {}
+    strategy_params: {},
+    warmup_data_id: "",
+    warmup_from_live: false
   });
 
   const tasksQuery = useQuery({
@@ -62,7 +64,7 @@ export function QuantTradingPage() {
 
   const createTask = useMutation({
     mutationFn: async () => {
-      await api.post("/quant/tasks", form);
+      await api.post("/quant/tasks", { ...form, warmup_data_id: form.warmup_data_id || null });
     },
     onSuccess: async () => {
       await client.invalidateQueries({ queryKey: ["quantTasks"] });
@@ -241,6 +243,25 @@ export function QuantTradingPage() {
                 onChange={(e) => setForm((prev) => ({ ...prev, lot_size: Number(e.target.value) }))}
               />
             </label>
+            <label className="text-sm space-y-2">
+              预热数据ID（可选）
+              <input
+                className="w-full rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2"
+                value={form.warmup_data_id}
+                disabled={form.warmup_from_live}
+                onChange={(e) => setForm((prev) => ({ ...prev, warmup_data_id: e.target.value }))}
+              />
+            </label>
+            <label className="text-sm flex items-center gap-2 pt-7">
+              <input
+                type="checkbox"
+                checked={form.warmup_from_live}
+                onChange={(e) =>
+                  setForm((prev) => ({ ...prev, warmup_from_live: e.target.checked, warmup_data_id: "" }))
+                }
+              />
+              使用同一股票的实时采集数据预热策略
+            </label>
           </div>
           <button
             type="submit"
@@ -1,5 +1,7 @@
-import { useQuery } from "@tanstack/react-query";
+import { useState } from "react";
+import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 import api from "../api/client";
+import { Dialog } from "../components/Dialog";
 
 interface StrategyParameter {
   name: string;
@@ -15,9 +17,17 @@ interface StrategyMetadata {
   name: string;
   description: string;
   parameters: StrategyParameter[];
+  rules?: string | null;
 }
 
+const ruleExample = "buy when sma(5) crosses_above sma(20) and rsi(14) < 70\nsell when sma(5) crosses_below sma(20)";
+
 export function StrategyManagementPage() {
+  const [isCreating, setIsCreating] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  const [form, setForm] = useState({ strategy_id: "", name: "", description: "", rules: ruleExample });
+  const client = useQueryClient();
+
   const { data } = useQuery({
     queryKey: ["strategies"],
     queryFn: async () => {
@@ -26,13 +36,43 @@ export function StrategyManagementPage() {
     }
   });
 
+  const createStrategy = useMutation({
+    mutationFn: async () => {
+      await api.post("/strategies/rules", form);
+    },
+    onSuccess: async () => {
+      await client.invalidateQueries({ queryKey: ["strategies"] });
+      setIsCreating(false);
+      setError(null);
+    },
+    onError: (err: any) => setError(err?.response?.data?.detail ?? "创建失败")
+  });
+
+  const deleteStrategy = useMutation({
+    mutationFn: async (strategyId: string) => {
+      await api.delete(`/strategies/${strategyId}`);
+    },
+    onSuccess: async () => {
+      await client.invalidateQueries({ queryKey: ["strategies"] });
+    }
+  });
+
   const strategies = data ?? [];
 
   return (
     <div className="space-y-10">
-      <header>
-        <h2 className="text-3xl font-semibold">策略管理</h2>
-        <p className="text-slate-400 mt-2">统一管理策略库，浏览策略逻辑与参数说明。</p>
+      <header className="flex items-center justify-between">
+        <div>
+          <h2 className="text-3xl font-semibold">策略管理</h2>
+          <p className="text-slate-400 mt-2">统一管理策略库，浏览策略逻辑与参数说明。</p>
+        </div>
+        <button
+          type="button"
+          className="bg-blue-500/80 hover:bg-blue-500 transition px-5 py-2 rounded-full text-sm font-medium"
+          onClick={() => setIsCreating(true)}
+        >
+          新建规则策略
+        </button>
       </header>
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
         {strategies.map((strategy) => (
@@ -42,9 +82,27 @@ export function StrategyManagementPage() {
                 <h3 className="text-xl font-semibold tracking-wide">{strategy.name}</h3>
                 <p className="text-slate-500 text-sm mt-2">{strategy.strategy_id}</p>
               </div>
-              <span className="status-chip bg-blue-500/20 text-blue-200">内置</span>
+              {strategy.rules ? (
+                <div className="flex items-center gap-2">
+                  <span className="status-chip bg-emerald-500/20 text-emerald-200">规则</span>
+                  <button
+                    type="button"
+                    className="px-3 py-1 rounded-full text-xs bg-red-500/20 text-red-200 hover:bg-red-500/30"
+                    onClick={() => deleteStrategy.mutate(strategy.strategy_id)}
+                  >
+                    删除
+                  </button>
+                </div>
+              ) : (
+                <span className="status-chip bg-blue-500/20 text-blue-200">内置</span>
+              )}
             </div>
             <p className="text-slate-300 leading-relaxed">{strategy.description}</p>
+            {strategy.rules && (
+              <pre className="bg-slate-900/50 rounded-2xl p-4 border border-white/5 text-xs text-slate-300 whitespace-pre-wrap">
+                {strategy.rules}
+              </pre>
+            )}
             <div className="space-y-3">
               <h4 className="text-sm uppercase tracking-widest text-slate-400">参数</h4>
               {strategy.parameters.map((param) => (
@@ -53,8 +111,8 @@ export function StrategyManagementPage() {
                   <p className="text-xs text-slate-400 mt-1">{param.description}</p>
                   <p className="text-xs text-slate-500 mt-2">
                     类型：{param.parameter_type} · 默认值：{String(param.default)}
-                    {param.minimum !== undefined && ` · 最小值：${param.minimum}`}
-                    {param.maximum !== undefined && ` · 最大值：${param.maximum}`}
+                    {param.minimum != null && ` · 最小值：${param.minimum}`}
+                    {param.maximum != null && ` · 最大值：${param.maximum}`}
                   </p>
                 </div>
               ))}
@@ -63,7 +121,65 @@ export function StrategyManagementPage() {
         ))}
         {strategies.length === 0 && <div className="text-slate-500">暂无可用策略。</div>}
       </div>
+
+      <Dialog open={isCreating} title="新建规则策略" onClose={() => setIsCreating(false)}>
+        <form
+          className="space-y-4"
+          onSubmit={(event) => {
+            event.preventDefault();
+            createStrategy.mutate();
+          }}
+        >
+          <div className="grid grid-cols-2 gap-4">
+            <label className="text-sm space-y-2">
+              策略ID
+              <input
+                className="w-full rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2"
+                value={form.strategy_id}
+                placeholder="rsi_reversal"
+                onChange={(e) => setForm((prev) => ({ ...prev, strategy_id: e.target.value }))}
+              />
+            </label>
+            <label className="text-sm space-y-2">
+              名称
+              <input
+                className="w-full rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2"
+                value={form.name}
+                onChange={(e) => setForm((prev) => ({ ...prev, name: e.target.value }))}
+              />
+            </label>
+          </div>
+          <label className="text-sm space-y-2 block">
+            描述
+            <input
+              className="w-full rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2"
+              value={form.description}
+              onChange={(e) => setForm((prev) => ({ ...prev, description: e.target.value }))}
+            />
+          </label>
+          <label className="text-sm space-y-2 block">
+            规则（每行一条：buy when … / sell when …）
+            <textarea
+              rows={6}
+              className="w-full rounded-xl bg-slate-900/60 border border-white/10 px-3 py-2 font-mono text-xs"
+              value={form.rules}
+              onChange={(e) => setForm((prev) => ({ ...prev, rules: e.target.value }))}
+            />
+          </label>
+          <p className="text-xs text-slate-500">
+            可用指标：sma、ema、wma、rsi、std、zscore、highest、lowest、macd、macd_signal、macd_hist、bb_upper、bb_middle、bb_lower；
+            指标中的数字会成为策略参数，也可写作 name=value 自定义参数名；
+            指标后加 @5m / @1h 等周期即在该周期 K 线收盘价上计算，open@1h、high@1h、low@1h、close@1h 读取最近一根已完成 K 线。
+          </p>
+          {error && <p className="text-sm text-red-300">{error}</p>}
+          <button
+            type="submit"
+            className="bg-blue-500/80 hover:bg-blue-500 transition px-5 py-2 rounded-full text-sm font-medium"
+          >
+            创建
+          </button>
+        </form>
+      </Dialog>
     </div>
   );
 }
-